@@ -1,34 +1,97 @@
-from flask import Flask, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Flask, Response, request, jsonify
+from flask_jwt_extended import JWTManager, jwt_required, get_jwt_identity
+from pydantic import TypeAdapter, ValidationError
+from typing import List
 from models.models_dto import WODRequest, WODResponse
-from services.wod_service import WODService
+from services.batch_service import BatchWODService, WOD_BATCH_MAX_SIZE
+from services.catalog_store import CatalogStore
+from services.health_checks import HealthMonitor
+from services.wod_service import CatalogUnavailable, WODService
+import os
 
 app = Flask(__name__)
-app.config['JWT_SECRET_KEY'] = 'your-secret-key'  # In production, use environment variable
+app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'your-secret-key')
 
-wod_service = WODService()
+jwt = JWTManager(app)
+
+# Catalog snapshot exported by the fit app, shared through a volume
+CATALOG_SNAPSHOT_PATH = os.environ.get('CATALOG_SNAPSHOT_PATH', '/data/catalog/catalog.bin')
+
+catalog_store = CatalogStore(CATALOG_SNAPSHOT_PATH)
+wod_service = WODService(catalog_store)
+batch_service = BatchWODService(wod_service, CATALOG_SNAPSHOT_PATH)
+
+wod_batch_adapter = TypeAdapter(List[WODRequest])
+
+def check_catalog():
+    # Also picks up a new snapshot off the request path
+    index = catalog_store.get()
+    if index is None:
+        return {"status": "DOWN", "error": "Catalog snapshot not loaded"}
+    return {"status": "UP", "version": index.version, "exercises": len(index.ids)}
+
+def check_batch_workers():
+    return {"status": "UP", **batch_service.stats()}
+
+health_monitor = HealthMonitor({"catalog": check_catalog, "batch_workers": check_batch_workers})
+
+@app.route('/health/live', methods=['GET'])
+def health_live():
+    return jsonify({"status": "UP"}), 200
 
 @app.route('/health', methods=['GET'])
-def health_check():
-    return jsonify({"status": "healthy"}), 200
+@app.route('/health/ready', methods=['GET'])
+def health_ready():
+    return health_monitor.readiness()
 
 @app.route('/wod', methods=['POST'])
+@app.route('/fitness/wod', methods=['GET', 'POST'])
 @jwt_required()
 def generate_wod():
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({"error": "Expected a JSON object"}), 400
+        equipment = data.get('equipment_available')
+        if equipment is None and 'equipment' in request.args:
+            equipment = [name.strip() for value in request.args.getlist('equipment') for name in value.split(',') if name.strip()]
         wod_request = WODRequest(
             user_id=get_jwt_identity(),
             fitness_level=data.get('fitness_level', 'beginner'),
             goals=data.get('goals', []),
-            equipment_available=data.get('equipment_available', [])
+            equipment_available=equipment,
+            excluded_exercise_ids=data.get('excluded_exercise_ids', [])
         )
         
         wod_response = wod_service.generate_wod(wod_request)
-        return jsonify(wod_response.dict()), 200
+        return Response(wod_response.model_dump_json(), mimetype='application/json')
         
+    except CatalogUnavailable as e:
+        return jsonify({"error": str(e)}), 503
+    except ValidationError as e:
+        return jsonify({"error": "Invalid WOD request", "details": e.errors(include_input=False, include_url=False)}), 400
     except Exception as e:
-        return jsonify({"error": str(e)}), 400
+        print(f"WOD generation failed: {type(e).__name__}: {e}")
+        return jsonify({"error": "WOD generation failed"}), 500
+
+@app.route('/wod/batch', methods=['POST'])
+@jwt_required()
+def generate_wod_batch():
+    try:
+        # One validation pass over the whole body, straight from the raw JSON
+        wod_requests = wod_batch_adapter.validate_json(request.get_data())
+    except ValidationError as e:
+        return jsonify({"error": "Invalid WOD batch", "details": e.errors(include_input=False)}), 400
+    if len(wod_requests) > WOD_BATCH_MAX_SIZE:
+        return jsonify({"error": f"Batch too large, at most {WOD_BATCH_MAX_SIZE} requests"}), 413
+    if catalog_store.get() is None:
+        return jsonify({"error": "Catalog snapshot not loaded"}), 503
+
+    # One JSON document per line, in request order, streamed as chunks complete
+    return Response(batch_service.generate(wod_requests), mimetype='application/x-ndjson')
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5003) 
\ No newline at end of file
+    # Load the snapshot before serving traffic
+    catalog_store.reload_if_changed()
+    health_monitor.start()
+    app.run(host='0.0.0.0', port=5003)
@@ -0,0 +1,210 @@
+"""
+ASGI serving mode for the coach microservice:
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5003
+
+An event loop holds the connections (thousands of idle keep-alive
+connections from nginx cost no thread each) and only does the cheap parts of
+a request: routing, JWT verification and request validation. WOD generation
+is CPU bound, so it runs in a process pool sized to the cores, through
+`run_in_executor`, and never blocks the loop.
+"""
+import asyncio
+import json
+import os
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import parse_qs
+import jwt
+from pydantic import ValidationError
+from models.models_dto import WODRequest
+from services.batch_service import create_pool, generate_wod_json
+from services.health_checks import HEALTH_CHECK_INTERVAL
+from services.wod_service import CatalogUnavailable
+
+JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'your-secret-key')
+CATALOG_SNAPSHOT_PATH = os.environ.get('CATALOG_SNAPSHOT_PATH', '/data/catalog/catalog.bin')
+COACH_WORKERS = int(os.environ.get('COACH_WORKERS', str(os.cpu_count() or 1)))
+MAX_BODY_BYTES = 64 * 1024
+
+_pool = None
+# WOD requests waiting for or running in the pool
+_pending = 0
+# Last results of the readiness checks, refreshed by _monitor()
+_checks = None
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = create_pool(CATALOG_SNAPSHOT_PATH, COACH_WORKERS)
+    return _pool
+
+
+async def _send_json(send, status: int, body, headers=()):
+    payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(payload)).encode()),
+            *headers
+        ]
+    })
+    await send({"type": "http.response.body", "body": payload})
+
+
+async def _read_body(receive) -> bytes:
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise ConnectionError("Client disconnected")
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise OverflowError("Request body too large")
+        chunks.append(chunk)
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+def _identity(scope) -> str:
+    """
+    User identity of the request's bearer token, same checks as the Flask
+    app's jwt_required()
+    """
+    headers = dict(scope["headers"])
+    parts = headers.get(b"authorization", b"").decode("latin-1").split()
+    if len(parts) != 2 or parts[0].lower() != "bearer":
+        raise PermissionError("Missing Authorization Header")
+    try:
+        payload = jwt.decode(parts[1], JWT_SECRET_KEY, algorithms=["HS256"], options={"require": ["sub"]})
+    except jwt.ExpiredSignatureError:
+        raise PermissionError("Token has expired")
+    except jwt.InvalidTokenError:
+        raise PermissionError("Invalid token")
+    return str(payload["sub"])
+
+
+async def _generate_wod(scope, receive, send):
+    try:
+        user_id = _identity(scope)
+    except PermissionError as e:
+        return await _send_json(send, 401, {"msg": str(e)})
+
+    try:
+        body = await _read_body(receive)
+        data = json.loads(body) if body else {}
+        if not isinstance(data, dict):
+            raise ValueError("Expected a JSON object")
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        if data.get('equipment_available') is None and 'equipment' in query:
+            data['equipment_available'] = [name.strip() for value in query['equipment'] for name in value.split(',') if name.strip()]
+        wod_request = WODRequest(
+            user_id=user_id,
+            fitness_level=data.get('fitness_level', 'beginner'),
+            goals=data.get('goals', []),
+            equipment_available=data.get('equipment_available'),
+            excluded_exercise_ids=data.get('excluded_exercise_ids', [])
+        )
+    except ConnectionError:
+        return
+    except OverflowError as e:
+        return await _send_json(send, 413, {"error": str(e)})
+    except ValidationError as e:
+        return await _send_json(send, 400, {"error": "Invalid WOD request", "details": e.errors(include_input=False, include_url=False)})
+    except ValueError as e:
+        return await _send_json(send, 400, {"error": str(e)})
+
+    global _pending, _pool
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    _pending += 1
+    try:
+        wod = await loop.run_in_executor(pool, generate_wod_json, wod_request)
+    except CatalogUnavailable as e:
+        return await _send_json(send, 503, {"error": str(e)})
+    except ValidationError as e:
+        return await _send_json(send, 400, {"error": "Invalid WOD request", "details": e.errors(include_input=False, include_url=False)})
+    except BrokenProcessPool as e:
+        # A worker died: start a new pool on the next request
+        print(f"WOD worker pool broken: {e}")
+        if _pool is pool:
+            _pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+        return await _send_json(send, 503, {"error": "WOD workers unavailable"})
+    except Exception as e:
+        print(f"WOD generation failed: {type(e).__name__}: {e}")
+        return await _send_json(send, 500, {"error": "WOD generation failed"})
+    finally:
+        _pending -= 1
+    await _send_json(send, 200, wod)
+
+
+def _check_catalog():
+    # The workers load the snapshot themselves: check that there is one
+    try:
+        stat = os.stat(CATALOG_SNAPSHOT_PATH)
+    except OSError as e:
+        return {"status": "DOWN", "error": str(e)}
+    return {"status": "UP", "size_bytes": stat.st_size, "modified_at": stat.st_mtime}
+
+
+async def _monitor():
+    global _checks
+    while True:
+        # The stat runs in a thread: a slow volume must not stall the loop
+        _checks = {"catalog": await asyncio.to_thread(_check_catalog)}
+        await asyncio.sleep(HEALTH_CHECK_INTERVAL)
+
+
+def _readiness():
+    # Never checks on the probe's path: STARTING until the monitor's first run
+    if _checks is None:
+        return 503, {"status": "STARTING"}
+    checks = dict(_checks)
+    checks["workers"] = {"status": "UP" if _pool is not None else "DOWN", "workers": COACH_WORKERS, "pending_requests": _pending}
+    ready = all(check["status"] == "UP" for check in checks.values())
+    return (200 if ready else 503), {"status": "UP" if ready else "DOWN", "checks": checks}
+
+
+async def _lifespan(receive, send):
+    global _pool
+    monitor = None
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            # Create the pool before taking traffic; workers map the snapshot
+            # as they start
+            _get_pool()
+            monitor = asyncio.create_task(_monitor())
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            if monitor is not None:
+                monitor.cancel()
+            if _pool is not None:
+                _pool.shutdown(cancel_futures=True)
+                _pool = None
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await _lifespan(receive, send)
+    if scope["type"] != "http":
+        return
+
+    path, method = scope["path"], scope["method"]
+    if path in ("/health", "/health/live", "/health/ready"):
+        if method != "GET":
+            return await _send_json(send, 405, {"error": "Method not allowed"})
+        if path == "/health/live":
+            return await _send_json(send, 200, {"status": "UP"})
+        return await _send_json(send, *_readiness())
+    if path in ("/wod", "/fitness/wod"):
+        if method != "POST" and not (path == "/fitness/wod" and method == "GET"):
+            return await _send_json(send, 405, {"error": "Method not allowed"})
+        return await _generate_wod(scope, receive, send)
+    await _send_json(send, 404, {"error": "Not found"})
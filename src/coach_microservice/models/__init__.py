@@ -1,3 +1,3 @@
-from .models_dto import Exercise, WODRequest, WODResponse
+from .models_dto import Exercise, MuscleGroupImpact, WODRequest, WODResponse
 
-__all__ = ['Exercise', 'WODRequest', 'WODResponse'] 
\ No newline at end of file
+__all__ = ['Exercise', 'MuscleGroupImpact', 'WODRequest', 'WODResponse'] 
\ No newline at end of file
@@ -1,8 +1,23 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import List, Optional
+from datetime import datetime
+
+class MuscleGroupImpact(BaseModel):
+    # Immutable: built once per catalog and shared by every generated WOD
+    model_config = ConfigDict(frozen=True)
+
+    id: int
+    name: str
+    body_part: str
+    is_primary: bool
+    intensity: float  # Calculated based on exercise difficulty (0.0 to 1.0)
 
 class Exercise(BaseModel):
+    id: int
     name: str
+    description: Optional[str] = None
+    difficulty: int
+    muscle_groups: List[MuscleGroupImpact] = []
     sets: int
     reps: int
     weight: Optional[float] = None
@@ -10,12 +25,15 @@ class Exercise(BaseModel):
 
 class WODRequest(BaseModel):
     user_id: str
-    fitness_level: str
-    goals: List[str]
-    equipment_available: List[str]
+    fitness_level: str = "beginner"
+    goals: List[str] = []
+    equipment_available: Optional[List[str]] = None  # None: no equipment filtering
+    excluded_exercise_ids: List[int] = []  # e.g. exercises performed yesterday
 
 class WODResponse(BaseModel):
     exercises: List[Exercise]
     total_duration: int  # in minutes
     difficulty: str
-    calories_burned: Optional[int] = None 
\ No newline at end of file
+    calories_burned: Optional[int] = None
+    catalog_version: str
+    generated_at: datetime
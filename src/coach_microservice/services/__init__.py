@@ -1,3 +1,5 @@
-from .wod_service import WODService
+from .catalog_store import CatalogIndex, CatalogStore
+from .wod_service import CatalogUnavailable, WODService
+from .batch_service import BatchWODService
 
-__all__ = ['WODService'] 
\ No newline at end of file
+__all__ = ['BatchWODService', 'CatalogIndex', 'CatalogStore', 'CatalogUnavailable', 'WODService']
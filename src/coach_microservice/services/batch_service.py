@@ -0,0 +1,145 @@
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Iterator, List, Optional, Sequence, Tuple
+from models.models_dto import WODRequest
+from services.catalog_store import CatalogStore
+from services.wod_service import CatalogUnavailable, WODService
+
+WOD_BATCH_WORKERS = int(os.environ.get("WOD_BATCH_WORKERS", str(os.cpu_count() or 1)))
+WOD_BATCH_MAX_SIZE = int(os.environ.get("WOD_BATCH_MAX_SIZE", "1000"))
+# Requests sent to a worker per task: large enough to amortize the pickling
+# round trip, small enough to stream the first results quickly
+WOD_BATCH_CHUNK_SIZE = int(os.environ.get("WOD_BATCH_CHUNK_SIZE", "16"))
+
+_worker_service: Optional[WODService] = None
+
+
+def _init_worker(snapshot_path: str):
+    # Each worker maps the same snapshot file, so the catalog pages are shared
+    global _worker_service
+    _worker_service = WODService(CatalogStore(snapshot_path))
+
+
+def error_line(index: int, error: Exception) -> bytes:
+    message = str(error) if isinstance(error, CatalogUnavailable) else f"{type(error).__name__}: {error}"
+    return b'{"index":%d,"error":%s}\n' % (index, json.dumps(message).encode())
+
+
+def render_lines(service: WODService, start: int, requests: Sequence[WODRequest]) -> List[bytes]:
+    """
+    NDJSON lines for consecutive requests, numbered from `start`. A request
+    that fails gets an error line: the response is already streaming, so an
+    exception would cut it short without saying which item failed.
+    """
+    lines = []
+    for index, wod_request in enumerate(requests, start):
+        try:
+            body = service.generate_wod(wod_request).model_dump_json().encode()
+            lines.append(b'{"index":%d,"wod":%s}\n' % (index, body))
+        except CatalogUnavailable as e:
+            lines.append(error_line(index, e))
+        except Exception as e:
+            print(f"WOD generation failed for batch item {index}: {type(e).__name__}: {e}")
+            lines.append(error_line(index, e))
+    return lines
+
+
+def _generate_chunk(start: int, requests: List[WODRequest]) -> List[bytes]:
+    return render_lines(_worker_service, start, requests)
+
+
+def generate_wod_json(wod_request: WODRequest) -> bytes:
+    """
+    Single WOD response body, generated in a pool worker (see asgi.py)
+    """
+    return _worker_service.generate_wod(wod_request).model_dump_json().encode()
+
+
+def create_pool(snapshot_path: str, workers: int) -> ProcessPoolExecutor:
+    # spawn: forking a multi-threaded server process is unsafe
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(snapshot_path,)
+    )
+
+
+class BatchWODService:
+    """
+    Generates many WODs across a process pool and yields them as NDJSON
+    lines, in request order, as soon as each chunk is done
+    """
+
+    def __init__(self, service: WODService, snapshot_path: str, workers: int = WOD_BATCH_WORKERS, chunk_size: int = WOD_BATCH_CHUNK_SIZE):
+        self.service = service
+        self.snapshot_path = snapshot_path
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Requests of the running batches not yielded yet
+        self.pending = 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = create_pool(self.snapshot_path, self.workers)
+            return self._pool
+
+    def _add_pending(self, count: int):
+        with self._lock:
+            self.pending += count
+
+    def generate(self, requests: Sequence[WODRequest]) -> Iterator[bytes]:
+        self._add_pending(len(requests))
+        remaining = len(requests)
+        try:
+            # A single chunk is not worth the round trip to a worker
+            if len(requests) <= self.chunk_size or self.workers <= 1:
+                chunks = [render_lines(self.service, 0, requests)]
+            else:
+                pool = self._get_pool()
+                futures = [
+                    (start, len(chunk), pool.submit(_generate_chunk, start, chunk))
+                    for start, chunk in (
+                        (start, list(requests[start:start + self.chunk_size]))
+                        for start in range(0, len(requests), self.chunk_size)
+                    )
+                ]
+                chunks = self._chunk_results(futures)
+            for lines in chunks:
+                self._add_pending(-len(lines))
+                remaining -= len(lines)
+                yield from lines
+        finally:
+            # Batch abandoned by the client
+            self._add_pending(-remaining)
+
+    @staticmethod
+    def _chunk_results(futures: List[Tuple[int, int, Future]]) -> Iterator[List[bytes]]:
+        try:
+            for start, count, future in futures:
+                try:
+                    yield future.result()
+                except Exception as e:
+                    # The chunk as a whole failed (worker crash, broken pool,
+                    # unpicklable request): every item of it gets an error line
+                    print(f"WOD batch chunk {start}-{start + count - 1} failed: {type(e).__name__}: {e}")
+                    yield [error_line(index, e) for index in range(start, start + count)]
+        finally:
+            for _, _, future in futures:
+                future.cancel()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"workers": self.workers, "pool_started": self._pool is not None, "pending_requests": self.pending}
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
@@ -0,0 +1,272 @@
+"""
+Compact binary catalog snapshot format, written by the fit app and read by
+stateless services through mmap.
+
+This module has no dependency outside the standard library: the coach
+microservice vendors it (src/coach_microservice/services/), so any change
+must be made to both copies and FORMAT_VERSION bumped if the layout changes.
+tests/test_coach_wod.py checks that each copy reads the other's output and
+pins the layout of FORMAT_VERSION.
+
+Layout (little endian, sections aligned to 8 bytes):
+
+    header          HEADER
+    muscle groups   MUSCLE_GROUP records      id, name, body_part
+    exercises       EXERCISE records          id, name, description, link and clause ranges, difficulty
+    links           LINK records              muscle group id, is_primary, intensity
+    clauses         CLAUSE records            range of alternatives, one of which is required
+    alternatives    ALTERNATIVE records       equipment name
+    string refs     STRING_REF records        offset and length in the string data
+    string data     UTF-8 bytes, each distinct string stored once
+
+Strings are referenced by index in the string table, NO_STRING meaning None.
+Records are fixed width, so a reader maps the file and decodes only the
+records it touches; every process mapping the same file shares its pages.
+"""
+import mmap
+import struct
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+MAGIC = b"FCAT"
+FORMAT_VERSION = 1
+NO_STRING = 0xFFFFFFFF
+ALIGNMENT = 8
+
+# magic, format version, reserved, catalog version,
+# counts: muscle groups, exercises, links, clauses, alternatives, strings
+# offsets: muscle groups, exercises, links, clauses, alternatives, string refs, string data
+HEADER = struct.Struct("<4sHH16s6I7I")
+MUSCLE_GROUP = struct.Struct("<iII")
+EXERCISE = struct.Struct("<iIIIIHHB3x")
+LINK = struct.Struct("<iB3xd")
+CLAUSE = struct.Struct("<IH2x")
+ALTERNATIVE = struct.Struct("<I")
+STRING_REF = struct.Struct("<II")
+
+# (id, name, body_part)
+MuscleGroupRow = Tuple[int, str, str]
+# (muscle group id, is_primary, intensity)
+LinkRow = Tuple[int, bool, float]
+
+
+class SnapshotFormatError(ValueError):
+    pass
+
+
+def _align(size: int) -> int:
+    return (size + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+class _StringTable:
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.data = bytearray()
+        self.refs: List[Tuple[int, int]] = []
+
+    def add(self, value: Optional[str]) -> int:
+        if value is None:
+            return NO_STRING
+        string_id = self.ids.get(value)
+        if string_id is None:
+            encoded = value.encode()
+            string_id = self.ids[value] = len(self.refs)
+            self.refs.append((len(self.data), len(encoded)))
+            self.data += encoded
+        return string_id
+
+
+def encode_snapshot(version: str, muscle_groups: Iterable[MuscleGroupRow], exercises: Iterable[dict]) -> bytes:
+    """
+    Encode a catalog. Exercises are dicts with the keys of the JSON snapshot:
+    id, name, description, difficulty, requirements (clauses of equipment
+    alternatives) and muscle_groups (dicts with id, is_primary, intensity).
+    """
+    encoded_version = version.encode("ascii")
+    if len(encoded_version) > 16:
+        raise SnapshotFormatError(f"Catalog version '{version}' is longer than 16 bytes")
+
+    strings = _StringTable()
+    muscle_group_records = bytearray()
+    exercise_records = bytearray()
+    link_records = bytearray()
+    clause_records = bytearray()
+    alternative_records = bytearray()
+    counts = {"muscle_groups": 0, "exercises": 0, "links": 0, "clauses": 0, "alternatives": 0}
+
+    for mg_id, name, body_part in muscle_groups:
+        muscle_group_records += MUSCLE_GROUP.pack(mg_id, strings.add(name), strings.add(body_part))
+        counts["muscle_groups"] += 1
+
+    for exercise in exercises:
+        link_start, clause_start = counts["links"], counts["clauses"]
+        for mg in exercise["muscle_groups"]:
+            link_records += LINK.pack(mg["id"], mg["is_primary"], mg["intensity"])
+            counts["links"] += 1
+        for alternatives in exercise["requirements"]:
+            clause_records += CLAUSE.pack(counts["alternatives"], len(alternatives))
+            counts["clauses"] += 1
+            for name in alternatives:
+                alternative_records += ALTERNATIVE.pack(strings.add(name))
+                counts["alternatives"] += 1
+        exercise_records += EXERCISE.pack(
+            exercise["id"], strings.add(exercise["name"]), strings.add(exercise["description"]),
+            link_start, clause_start, counts["links"] - link_start, counts["clauses"] - clause_start,
+            exercise["difficulty"]
+        )
+        counts["exercises"] += 1
+
+    string_refs = b"".join(STRING_REF.pack(offset, length) for offset, length in strings.refs)
+    sections = [muscle_group_records, exercise_records, link_records, clause_records, alternative_records, string_refs, strings.data]
+    offsets = []
+    position = _align(HEADER.size)
+    for section in sections:
+        offsets.append(position)
+        position = _align(position + len(section))
+
+    body = bytearray(position)
+    body[:HEADER.size] = HEADER.pack(
+        MAGIC, FORMAT_VERSION, 0, encoded_version,
+        counts["muscle_groups"], counts["exercises"], counts["links"], counts["clauses"], counts["alternatives"], len(strings.refs),
+        *offsets
+    )
+    for offset, section in zip(offsets, sections):
+        body[offset:offset + len(section)] = section
+    return bytes(body)
+
+
+class LazyColumn(Sequence):
+    """
+    Read-only sequence decoding its items from the mapped file on access
+    """
+
+    def __init__(self, getter: Callable[[int], object], rows: Sequence[int]):
+        self._getter = getter
+        self._rows = rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self._getter(row) for row in self._rows[position]]
+        return self._getter(self._rows[position])
+
+
+class SnapshotReader:
+    """
+    Memory-mapped snapshot. Nothing is decoded up front: records and strings
+    are unpacked from the shared mapping when they are accessed.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+        try:
+            self._read_header()
+        except BaseException:
+            self.close()
+            raise
+
+    def _read_header(self):
+        if len(self._buffer) < HEADER.size:
+            raise SnapshotFormatError("File too small for a catalog snapshot")
+        fields = HEADER.unpack_from(self._buffer, 0)
+        magic, format_version, _, version = fields[:4]
+        if magic != MAGIC:
+            raise SnapshotFormatError("Not a catalog snapshot")
+        if format_version != FORMAT_VERSION:
+            raise SnapshotFormatError(f"Unsupported snapshot format {format_version}, expected {FORMAT_VERSION}")
+        self.version = version.rstrip(b"\0").decode("ascii")
+        (self.muscle_group_count, self.exercise_count, self.link_count,
+         self.clause_count, self.alternative_count, self.string_count) = fields[4:10]
+        (self._muscle_groups_offset, self._exercises_offset, self._links_offset, self._clauses_offset,
+         self._alternatives_offset, self._string_refs_offset, self._string_data_offset) = fields[10:17]
+
+    def close(self):
+        self._buffer.release()
+        self._mmap.close()
+
+    def __enter__(self) -> "SnapshotReader":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def string(self, string_id: int) -> Optional[str]:
+        if string_id == NO_STRING:
+            return None
+        offset, length = STRING_REF.unpack_from(self._buffer, self._string_refs_offset + string_id * STRING_REF.size)
+        start = self._string_data_offset + offset
+        return str(self._buffer[start:start + length], "utf-8")
+
+    def muscle_group(self, row: int) -> MuscleGroupRow:
+        mg_id, name, body_part = MUSCLE_GROUP.unpack_from(self._buffer, self._muscle_groups_offset + row * MUSCLE_GROUP.size)
+        return mg_id, self.string(name), self.string(body_part)
+
+    def _exercise_record(self, row: int) -> tuple:
+        return EXERCISE.unpack_from(self._buffer, self._exercises_offset + row * EXERCISE.size)
+
+    def exercise_id(self, row: int) -> int:
+        return self._exercise_record(row)[0]
+
+    def exercise_name(self, row: int) -> str:
+        return self.string(self._exercise_record(row)[1])
+
+    def exercise_description(self, row: int) -> Optional[str]:
+        return self.string(self._exercise_record(row)[2])
+
+    def exercise_difficulty(self, row: int) -> int:
+        return self._exercise_record(row)[7]
+
+    def exercise_links(self, row: int) -> List[LinkRow]:
+        _, _, _, link_start, _, link_count, _, _ = self._exercise_record(row)
+        return [
+            (mg_id, bool(is_primary), intensity)
+            for mg_id, is_primary, intensity in LINK.iter_unpack(
+                self._buffer[self._links_offset + link_start * LINK.size:self._links_offset + (link_start + link_count) * LINK.size]
+            )
+        ]
+
+    def exercise_requirements(self, row: int) -> List[List[str]]:
+        _, _, _, _, clause_start, _, clause_count, _ = self._exercise_record(row)
+        clauses = []
+        for clause in range(clause_start, clause_start + clause_count):
+            alternative_start, alternative_count = CLAUSE.unpack_from(self._buffer, self._clauses_offset + clause * CLAUSE.size)
+            clauses.append([
+                self.string(ALTERNATIVE.unpack_from(self._buffer, self._alternatives_offset + alternative * ALTERNATIVE.size)[0])
+                for alternative in range(alternative_start, alternative_start + alternative_count)
+            ])
+        return clauses
+
+    def column(self, getter: Callable[[int], object], rows: Optional[Sequence[int]] = None) -> LazyColumn:
+        """
+        Lazy sequence of `getter(row)` over `rows` (every exercise by default)
+        """
+        return LazyColumn(getter, rows if rows is not None else range(self.exercise_count))
+
+    def to_document(self) -> dict:
+        """
+        Decode everything into the JSON snapshot structure
+        """
+        return {
+            "version": self.version,
+            "muscle_groups": [
+                dict(zip(("id", "name", "body_part"), self.muscle_group(row)))
+                for row in range(self.muscle_group_count)
+            ],
+            "exercises": [
+                {
+                    "id": self.exercise_id(row),
+                    "name": self.exercise_name(row),
+                    "description": self.exercise_description(row),
+                    "difficulty": self.exercise_difficulty(row),
+                    "requirements": self.exercise_requirements(row),
+                    "muscle_groups": [
+                        {"id": mg_id, "is_primary": is_primary, "intensity": intensity}
+                        for mg_id, is_primary, intensity in self.exercise_links(row)
+                    ]
+                }
+                for row in range(self.exercise_count)
+            ]
+        }
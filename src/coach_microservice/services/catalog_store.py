@@ -0,0 +1,180 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from services.catalog_snapshot_format import MAGIC, SnapshotReader
+
+# Minimum delay between two checks of the snapshot file
+RELOAD_CHECK_INTERVAL = float(os.environ.get("CATALOG_RELOAD_INTERVAL", "2"))
+
+
+class CatalogIndex:
+    """
+    Compact, read-only view of a catalog snapshot exported by the fit app.
+    Only WOD candidates (exercises working at least one muscle group) are
+    kept, as parallel sequences indexed by position. With a binary snapshot
+    the text columns stay in the shared memory mapping and are decoded on
+    access; only the small numeric columns used for selection are copied.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        muscle_groups: Dict[int, Tuple[str, str]],
+        ids: Sequence[int],
+        names: Sequence[str],
+        descriptions: Sequence[Optional[str]],
+        difficulties: Sequence[int],
+        impacts: Sequence[Tuple[Tuple[int, bool, float], ...]],
+        requirements: Iterable[List[List[str]]],
+        reader: Optional[SnapshotReader] = None
+    ):
+        self.version = version
+        self.muscle_groups = muscle_groups
+        self.ids: Tuple[int, ...] = tuple(ids)
+        self.names = names
+        self.descriptions = descriptions
+        self.difficulties: Tuple[int, ...] = tuple(difficulties)
+        # (muscle group id, is_primary, intensity) per exercise
+        self.impacts: Tuple[Tuple[Tuple[int, bool, float], ...], ...] = tuple(impacts)
+        self.primary_muscle_groups: Tuple[frozenset, ...] = tuple(
+            frozenset(mg_id for mg_id, is_primary, _ in impacts if is_primary) for impacts in self.impacts
+        )
+        self.position_by_id: Dict[int, int] = {exercise_id: position for position, exercise_id in enumerate(self.ids)}
+        # Keeps the mapping alive for the lazy columns
+        self.reader = reader
+
+        # One bit per piece of equipment; each exercise keeps the masks of
+        # its acceptable equipment combinations, (0,) meaning bodyweight
+        self.equipment_bits: Dict[str, int] = {}
+        self.requirement_masks: Tuple[Tuple[int, ...], ...] = tuple(self._compile(clauses) for clauses in requirements)
+        self._pools: Dict[int, Tuple[int, ...]] = {}
+
+    @classmethod
+    def from_document(cls, document: dict) -> "CatalogIndex":
+        candidates = [exercise for exercise in document["exercises"] if exercise["muscle_groups"]]
+        return cls(
+            version=document["version"],
+            muscle_groups={mg["id"]: (mg["name"], mg["body_part"]) for mg in document["muscle_groups"]},
+            ids=[exercise["id"] for exercise in candidates],
+            names=tuple(exercise["name"] for exercise in candidates),
+            descriptions=tuple(exercise["description"] for exercise in candidates),
+            difficulties=[exercise["difficulty"] for exercise in candidates],
+            impacts=[
+                tuple((mg["id"], mg["is_primary"], mg["intensity"]) for mg in exercise["muscle_groups"])
+                for exercise in candidates
+            ],
+            requirements=[exercise["requirements"] for exercise in candidates]
+        )
+
+    @classmethod
+    def from_reader(cls, reader: SnapshotReader) -> "CatalogIndex":
+        impacts_by_row = [tuple(reader.exercise_links(row)) for row in range(reader.exercise_count)]
+        rows = [row for row, impacts in enumerate(impacts_by_row) if impacts]
+        muscle_groups = {}
+        for row in range(reader.muscle_group_count):
+            mg_id, name, body_part = reader.muscle_group(row)
+            muscle_groups[mg_id] = (name, body_part)
+        return cls(
+            version=reader.version,
+            muscle_groups=muscle_groups,
+            ids=[reader.exercise_id(row) for row in rows],
+            names=reader.column(reader.exercise_name, rows),
+            descriptions=reader.column(reader.exercise_description, rows),
+            difficulties=[reader.exercise_difficulty(row) for row in rows],
+            impacts=[impacts_by_row[row] for row in rows],
+            requirements=(reader.exercise_requirements(row) for row in rows),
+            reader=reader
+        )
+
+    def _compile(self, clauses: List[List[str]]) -> Tuple[int, ...]:
+        masks = [0]
+        for alternatives in clauses:
+            bits = [self.equipment_bits.setdefault(name, 1 << len(self.equipment_bits)) for name in alternatives]
+            masks = [mask | bit for mask in masks for bit in bits]
+        return tuple(sorted(set(masks)))
+
+    def equipment_mask(self, available_equipment: Optional[Sequence[str]]) -> int:
+        """
+        Mask of the given equipment names; None means no equipment filtering
+        """
+        if available_equipment is None:
+            return -1
+        mask = 0
+        for name in available_equipment:
+            mask |= self.equipment_bits.get(name.replace("(optional)", "").strip().lower(), 0)
+        return mask
+
+    def candidate_positions(self, available_mask: int) -> Tuple[int, ...]:
+        """
+        Positions of the exercises doable with the given equipment, memoized per mask
+        """
+        pool = self._pools.get(available_mask)
+        if pool is None:
+            pool = tuple(
+                position for position, masks in enumerate(self.requirement_masks)
+                if any(required & ~available_mask == 0 for required in masks)
+            )
+            if len(self._pools) >= 1024:
+                self._pools.clear()
+            self._pools[available_mask] = pool
+        return pool
+
+
+def load_index(path: str) -> CatalogIndex:
+    """
+    Load a binary snapshot (mapped, see catalog_snapshot_format) or a JSON one
+    """
+    with open(path, "rb") as file:
+        binary = file.read(len(MAGIC)) == MAGIC
+        if not binary:
+            file.seek(0)
+            return CatalogIndex.from_document(json.load(file))
+    return CatalogIndex.from_reader(SnapshotReader(path))
+
+
+class CatalogStore:
+    """
+    Holds the catalog index of the snapshot at `path` and reloads it, without
+    a restart, when the file changes. A snapshot that fails to load leaves
+    the previous index in service.
+    """
+
+    def __init__(self, path: str, check_interval: float = RELOAD_CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self._index: Optional[CatalogIndex] = None
+        self._signature: Optional[Tuple[int, int]] = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload_if_changed(self) -> bool:
+        with self._lock:
+            self._checked_at = time.monotonic()
+            signature = self._file_signature()
+            if signature is None or signature == self._signature:
+                return False
+            try:
+                index = load_index(self.path)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Could not load catalog snapshot {self.path}: {e}")
+                return False
+            self._index, self._signature = index, signature
+            print(f"Loaded catalog {index.version} ({len(index.ids)} exercises) from {self.path}")
+            return True
+
+    def get(self) -> Optional[CatalogIndex]:
+        """
+        Current index, or None until a snapshot has been loaded
+        """
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            self.reload_if_changed()
+        return self._index
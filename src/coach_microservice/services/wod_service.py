@@ -1,84 +1,124 @@
-from models.models_dto import Exercise, WODRequest, WODResponse
+from models.models_dto import Exercise, MuscleGroupImpact, WODRequest, WODResponse
+from services.catalog_store import CatalogIndex, CatalogStore
 import random
-from typing import List, Dict
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+WOD_SIZE = 6
+SETS_BY_LEVEL = {"beginner": 3, "intermediate": 4, "advanced": 5}
+
+
+class CatalogUnavailable(Exception):
+    pass
+
 
 class WODService:
-    def __init__(self):
-        # Exercise database - in a real service, this would come from a database
-        self.exercises = {
-            "beginner": [
-                {"name": "Push-ups", "sets": 3, "reps": 10},
-                {"name": "Squats", "sets": 3, "reps": 15},
-                {"name": "Plank", "sets": 3, "duration": 30},
-            ],
-            "intermediate": [
-                {"name": "Burpees", "sets": 4, "reps": 12},
-                {"name": "Pull-ups", "sets": 4, "reps": 8},
-                {"name": "Mountain Climbers", "sets": 4, "duration": 45},
-            ],
-            "advanced": [
-                {"name": "Muscle-ups", "sets": 5, "reps": 6},
-                {"name": "Handstand Push-ups", "sets": 5, "reps": 8},
-                {"name": "Box Jumps", "sets": 5, "reps": 15},
-            ]
-        }
+    def __init__(self, store: CatalogStore):
+        self.store = store
+        # Muscle group impacts of each candidate, validated once per catalog,
+        # with the index they were built from: swapped as one tuple, so a
+        # request never gets the templates of another snapshot
+        self._templates: Optional[Tuple[CatalogIndex, Tuple[Tuple[MuscleGroupImpact, ...], ...]]] = None
+        index = store.get()
+        if index is not None:
+            self._get_templates(index)
 
-    def generate_wod(self, request: WODRequest) -> WODResponse:
+    def _get_templates(self, index: CatalogIndex) -> Tuple[Tuple[MuscleGroupImpact, ...], ...]:
+        cached = self._templates
+        if cached is not None and cached[0] is index:
+            return cached[1]
+        # The same (muscle group, is_primary, intensity) impact is shared
+        # by many exercises: validate each one only once
+        impacts = {}
+        for exercise_impacts in index.impacts:
+            for mg_id, is_primary, intensity in exercise_impacts:
+                if (mg_id, is_primary, intensity) not in impacts:
+                    name, body_part = index.muscle_groups[mg_id]
+                    impacts[(mg_id, is_primary, intensity)] = MuscleGroupImpact(
+                        id=mg_id, name=name, body_part=body_part, is_primary=is_primary, intensity=intensity
+                    )
+        templates = tuple(tuple(impacts[impact] for impact in exercise_impacts) for exercise_impacts in index.impacts)
+        self._templates = (index, templates)
+        return templates
+
+    def generate_wod(self, request: WODRequest, rng: Optional[random.Random] = None) -> WODResponse:
         """
-        Generate a Workout of the Day (WOD) based on user's fitness level and goals
+        Generate a Workout of the Day (WOD) from the catalog snapshot, with the
+        same rules as the fit app: only exercises doable with the available
+        equipment, none of the excluded ones (what the user did yesterday)
+        unless fewer than WOD_SIZE would remain
         """
-        # Select exercises based on fitness level
+        index = self.store.get()
+        if index is None:
+            raise CatalogUnavailable("Catalog snapshot not loaded")
+        rng = rng or random.Random()
+
         level = request.fitness_level.lower()
-        available_exercises = self.exercises.get(level, self.exercises["beginner"])
-        
-        # Filter exercises based on available equipment
-        filtered_exercises = [
-            ex for ex in available_exercises 
-            if self._is_equipment_available(ex["name"], request.equipment_available)
-        ]
-        
-        # Select 4-6 exercises for the WOD
-        num_exercises = random.randint(4, 6)
-        selected_exercises = random.sample(filtered_exercises, min(num_exercises, len(filtered_exercises)))
-        
-        # Convert to Exercise objects
+        if level not in SETS_BY_LEVEL:
+            level = "beginner"
+
+        candidates = index.candidate_positions(index.equipment_mask(request.equipment_available))
+        excluded = set(request.excluded_exercise_ids)
+        positions = [position for position in candidates if index.ids[position] not in excluded]
+        # if not enough exercises remain, fallback to all exercises the equipment allows
+        if len(positions) < WOD_SIZE:
+            positions = list(candidates)
+
+        templates = self._get_templates(index)
         exercises = [
-            Exercise(
-                name=ex["name"],
-                sets=ex["sets"],
-                reps=ex.get("reps", 0),
-                duration=ex.get("duration", None)
-            )
-            for ex in selected_exercises
+            self._exercise(index, templates[position], position, SETS_BY_LEVEL[level], rng)
+            for position in self._select(index, positions, rng)
         ]
-        
+
         # Calculate total duration (rough estimate)
         total_duration = sum(
             ex.sets * (ex.duration or 30)  # Assume 30s per rep if no duration specified
             for ex in exercises
         ) // 60  # Convert to minutes
-        
+
         # Estimate calories burned (very rough estimate)
         calories_burned = total_duration * 10  # Assume 10 calories per minute
-        
-        return WODResponse(
+
+        # Every field comes from the validated snapshot or is generated
+        # here, so the response is assembled without validating it again
+        return WODResponse.model_construct(
             exercises=exercises,
             total_duration=total_duration,
             difficulty=level,
-            calories_burned=calories_burned
+            calories_burned=calories_burned,
+            catalog_version=index.version,
+            generated_at=datetime.now()
         )
-    
-    def _is_equipment_available(self, exercise_name: str, available_equipment: List[str]) -> bool:
+
+    @staticmethod
+    def _select(index: CatalogIndex, positions: Sequence[int], rng: random.Random) -> List[int]:
         """
-        Check if the exercise can be performed with available equipment
+        Pick WOD_SIZE exercises in random order, preferring ones whose primary
+        muscle groups are not already worked by the session
         """
-        # This is a simplified check - in a real service, we'd have a proper mapping
-        equipment_required = {
-            "Pull-ups": ["pull-up bar"],
-            "Muscle-ups": ["pull-up bar", "rings"],
-            "Box Jumps": ["box"],
-            "Handstand Push-ups": ["wall"],
-        }
-        
-        required = equipment_required.get(exercise_name, [])
-        return all(equip in available_equipment for equip in required) 
\ No newline at end of file
+        if len(positions) <= WOD_SIZE:
+            return list(positions)
+        shuffled = rng.sample(positions, len(positions))
+        selected, worked = [], set()
+        for position in shuffled:
+            if not index.primary_muscle_groups[position] & worked:
+                selected.append(position)
+                worked |= index.primary_muscle_groups[position]
+                if len(selected) == WOD_SIZE:
+                    return selected
+        chosen = set(selected)
+        selected.extend([position for position in shuffled if position not in chosen][:WOD_SIZE - len(selected)])
+        return selected
+
+    @staticmethod
+    def _exercise(index: CatalogIndex, muscle_groups: Tuple[MuscleGroupImpact, ...], position: int, sets: int, rng: random.Random) -> Exercise:
+        return Exercise.model_construct(
+            id=index.ids[position],
+            name=index.names[position],
+            description=index.descriptions[position],
+            difficulty=index.difficulties[position],
+            muscle_groups=list(muscle_groups),
+            sets=sets,
+            reps=rng.randint(8, 15),
+            weight=rng.uniform(5.0, 50.0)
+        )
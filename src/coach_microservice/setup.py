@@ -10,7 +10,9 @@ setup(
         "SQLAlchemy",
         "psycopg2-binary",
         "pydantic",
-        "requests"
+        "requests",
+        "uvicorn",
+        "PyJWT"
     ],
     python_requires=">=3.10",
 ) 
\ No newline at end of file
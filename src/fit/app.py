@@ -1,46 +1,122 @@
+"""
+Application factory.
+
+Importing this module is cheap: blueprints and services are imported by
+`create_app`, the database engine is created on first use (see database.py)
+and numpy only loads with the catalog. `app` is still available as a module
+attribute, built with the default configuration on first access.
+"""
+from typing import Optional
 from flask import Flask
-from .database import init_db
-from flask_jwt_extended import JWTManager 
-from .services.fitness_data_init import init_fitness_data
-from .blueprints.user import user_bp
-from .blueprints.auth import auth_bp
-from .blueprints.profile import profile_bp
-from .blueprints.fitness import fitness_bp
-from dotenv import load_dotenv
 import os
 
-app = Flask(__name__)
-load_dotenv()
 
-app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY", "default-secret")
-app.config["JWT_HEADER_NAME"] = os.getenv("JWT_HEADER_NAME", "Authorization")
-app.config["JWT_HEADER_TYPE"] = os.getenv("JWT_HEADER_TYPE", "Bearer")
-app.config["JWT_TOKEN_LOCATION"] = ["headers"]
+def create_app(config: Optional[dict] = None) -> Flask:
+    """
+    Build the Flask app; `config` overrides the settings read from the environment
+    """
+    from dotenv import load_dotenv
+    from flask_jwt_extended import JWTManager
+    from .services.admission_service import admission_stats
+    from .services.health_service import health_monitor
+    from .services.wod_cache import wod_cache
+    from .services.wod_router import wod_router
+    from .services import warmup_service
+    from .blueprints.user import user_bp
+    from .blueprints.auth import auth_bp
+    from .blueprints.profile import profile_bp
+    from .blueprints.fitness import fitness_bp
+
+    app = Flask(__name__)
+    load_dotenv()
+
+    app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY", "default-secret")
+    app.config["JWT_HEADER_NAME"] = os.getenv("JWT_HEADER_NAME", "Authorization")
+    app.config["JWT_HEADER_TYPE"] = os.getenv("JWT_HEADER_TYPE", "Bearer")
+    app.config["JWT_TOKEN_LOCATION"] = ["headers"]
+    app.config.update(config or {})
+
+    JWTManager(app)
+
+    # Register blueprints
+    app.register_blueprint(user_bp)
+    app.register_blueprint(auth_bp)
+    app.register_blueprint(profile_bp)
+    app.register_blueprint(fitness_bp)
+
+    @app.before_request
+    def start_health_monitor():
+        # Whatever server runs the app, readiness checks run in the
+        # background from its first request on (run_app starts them before
+        # serving); tests refresh them explicitly
+        if not app.testing:
+            health_monitor.start()
+
+    @app.route("/health/live")
+    def health_live():
+        return {"status": "UP"}
+
+    @app.route("/health")
+    @app.route("/health/ready")
+    def health_ready():
+        return health_monitor.readiness()
+
+    @app.route("/metrics")
+    def metrics():
+        return {
+            "admission": admission_stats(),
+            "wod_cache": wod_cache.stats(),
+            "wod_routing": wod_router.stats(),
+            "warmup": warmup_service.last_warmup,
+        }
+
+    return app
 
-jwt = JWTManager(app)
 
-# Register blueprints
-app.register_blueprint(user_bp)
-app.register_blueprint(auth_bp)
-app.register_blueprint(profile_bp)
-app.register_blueprint(fitness_bp)
+_app: Optional[Flask] = None
+
+
+def __getattr__(name: str):
+    # `from src.fit.app import app` builds the default app on first use
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-@app.route("/health")
-def health():
-    return {"status": "UP"}
 
 def run_app():
     """Entry point for the application script"""
-    # Initialize the database before starting the app
-    init_db()
-    
-    # Initialize fitness data
-    init_fitness_data()
+    from .services.migration_service import run_migrations
+    from .services.catalog_service import get_catalog
+    from .services.warmup_service import warm_up
+    from .services.catalog_snapshot import CATALOG_SNAPSHOT_PATH, export_catalog_snapshot
+    from .services.health_service import health_monitor
+
+    app = create_app()
+
+    # Deployments apply the migrations once, before starting the workers
+    # (compose `migrate` service); a local run applies them itself
+    if os.environ.get("MIGRATE_ON_START", "true").lower() == "true":
+        run_migrations()
+
+    # Open pool connections, configure mappers, build the catalog cache and
+    # its indexes and render the WOD fragments before serving traffic
+    warm_up()
+    catalog = get_catalog()
+
+    # Publish the catalog for the stateless services (coach microservice)
+    if CATALOG_SNAPSHOT_PATH:
+        export_catalog_snapshot(CATALOG_SNAPSHOT_PATH, catalog)
     
+    # First readiness checks before serving, then off the request path
+    health_monitor.refresh()
+    health_monitor.start()
+
     # Get debug mode from environment variable, default to False
     debug_mode = os.environ.get("FLASK_DEBUG", "false").lower() == "true"
-    app.run(host="0.0.0.0", port=5055, debug=debug_mode)
+    app.run(host="0.0.0.0", port=int(os.environ.get("PORT", "5055")), debug=debug_mode)
 
 if __name__ == "__main__":
     run_app()
-
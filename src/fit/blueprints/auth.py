@@ -3,6 +3,7 @@ from pydantic import ValidationError
 import datetime
 from ..models_dto import LoginSchema, TokenSchema
 from ..services.auth_service import authenticate_user, create_access_token
+from ..services.admission_service import auth_limiter, limit_concurrency
 from ..services.user_service import create_user as create_user_service
 from ..models_dto import UserSchema
 from ..database import db_session
@@ -14,6 +15,7 @@ auth_bp = Blueprint('auth', __name__)
 BOOTSTRAP_KEY = os.environ.get("BOOTSTRAP_KEY", "bootstrap-secret-key")
 
 @auth_bp.route("/oauth/token", methods=["POST"])
+@limit_concurrency(auth_limiter)
 def login():
     try:
         content_type = request.headers.get('Content-Type', '')
@@ -1,85 +1,148 @@
-from flask import Blueprint, request, jsonify, g
-from datetime import datetime
-import random
-from ..models_dto import WodResponseSchema, WodExerciseSchema, MuscleGroupImpact, ExerciseHistoryCreateSchema, ExerciseHistoryResponseSchema
-from ..models_db import ExerciseHistoryModel
+from flask import Blueprint, request, jsonify, g, Response
+from typing import List
+from ..models_dto import ExerciseHistoryCreateSchema
 from ..services.fitness_service import (
-    get_all_exercises, get_exercise_by_id, get_exercises_by_muscle_group, get_exercises_performed_yesterday,
-    get_exercises_performed
+    get_exercises_performed_yesterday, get_exercises_performed,
+    add_exercise_history as add_exercise_history_service,
+    add_exercise_history_batch as add_exercise_history_batch_service
 )
-from ..services.fitness_coach_service import calculate_intensity, request_wod
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from pydantic import ValidationError
-from ..database import db_session
+from ..services.wod_router import wod_router
+from ..services.catalog_service import get_catalog, SerializedPayload
+from ..services.training_load_service import STATS_PERIODS, get_training_stats
+from ..services.auth_service import jwt_required
+from ..services.admission_service import Overloaded, catalog_limiter, limit_concurrency, overloaded_response
+from pydantic import ValidationError, TypeAdapter
+import os
 
 
 fitness_bp = Blueprint('fitness', __name__)
 
+history_batch_adapter = TypeAdapter(List[ExerciseHistoryCreateSchema])
+
+# How long clients and nginx may reuse a catalog response before revalidating
+CATALOG_MAX_AGE = int(os.environ.get("CATALOG_MAX_AGE", "300"))
+
+def _payload_response(payload: SerializedPayload) -> Response:
+    """
+    Serve a pre-serialized payload, picking the best precompressed variant
+    the client accepts. Conditional requests whose ETag still matches the
+    current catalog version get an empty 304.
+    """
+    encoding = "identity"
+    for candidate in ("br", "gzip"):
+        if candidate in payload.variants and request.accept_encodings[candidate]:
+            encoding = candidate
+            break
+
+    etag = payload.variant_etag(encoding)
+    # Weak comparison (RFC 9110): intermediaries such as nginx gzip turn
+    # ETags into weak W/"..." validators
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = Response(payload.variants[encoding], status=200, mimetype="application/json")
+        if encoding != "identity":
+            response.headers["Content-Encoding"] = encoding
+
+    response.vary.add("Accept-Encoding")
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = CATALOG_MAX_AGE
+    response.headers["X-Catalog-Version"] = payload.version
+    return response
+
 @fitness_bp.route("/fitness/exercises", methods=["GET"])
+@limit_concurrency(catalog_limiter)
 def get_exercises():
     try:
+        catalog = get_catalog()
         muscle_group_id = request.args.get("muscle_group_id")
         if muscle_group_id:
-            exercises = get_exercises_by_muscle_group(int(muscle_group_id))
+            payload = catalog.exercises_by_muscle_group_payload(int(muscle_group_id))
+            if not payload:
+                return jsonify({"error": "Muscle group not found"}), 404
         else:
-            exercises = get_all_exercises()
-        return jsonify([ex.model_dump() for ex in exercises]), 200
+            payload = catalog.exercises_payload()
+        return _payload_response(payload)
     except Exception as e:
         return jsonify({"error": "Error retrieving exercises", "details": str(e)}), 500
 
+def _list_arg(name: str) -> list:
+    """
+    Read a repeatable, comma separated query parameter, without blanks around
+    or between the values
+    """
+    values = (value.strip() for raw in request.args.getlist(name) for value in raw.split(","))
+    return [value for value in values if value]
+
+@fitness_bp.route("/fitness/exercises/search", methods=["GET"])
+@limit_concurrency(catalog_limiter)
+def search_exercises():
+    try:
+        difficulty = [int(value) for value in _list_arg("difficulty")]
+        limit = request.args.get("limit", type=int)
+    except ValueError:
+        return jsonify({"error": "Invalid search parameters", "details": "difficulty must be an integer"}), 400
+
+    try:
+        catalog = get_catalog()
+        exercises = catalog.search_index.search(
+            q=request.args.get("q"),
+            difficulty=difficulty,
+            equipment=_list_arg("equipment"),
+            muscle_group=_list_arg("muscle_group"),
+            body_part=_list_arg("body_part"),
+            limit=limit
+        )
+        response = Response(catalog.render_exercises(exercises), status=200, mimetype="application/json")
+        response.headers["X-Catalog-Version"] = catalog.version
+        return response
+    except Exception as e:
+        return jsonify({"error": "Error searching exercises", "details": str(e)}), 500
+
 @fitness_bp.route("/fitness/exercises/<int:exercise_id>", methods=["GET"])
+@limit_concurrency(catalog_limiter)
 def get_exercise(exercise_id):
     try:
-        exercise = get_exercise_by_id(exercise_id)
-        if not exercise:
+        payload = get_catalog().exercise_payload(exercise_id)
+        if not payload:
             return jsonify({"error": "Exercise not found"}), 404
-        return jsonify(exercise.model_dump()), 200
+        return _payload_response(payload)
     except Exception as e:
         return jsonify({"error": "Error retrieving exercise", "details": str(e)}), 500
 
+@fitness_bp.route("/fitness/muscle-groups", methods=["GET"])
+@limit_concurrency(catalog_limiter)
+def get_muscle_groups():
+    try:
+        return _payload_response(get_catalog().muscle_groups_payload())
+    except Exception as e:
+        return jsonify({"error": "Error retrieving muscle groups", "details": str(e)}), 500
+
+@fitness_bp.route("/fitness/muscle-groups/<int:muscle_group_id>", methods=["GET"])
+@limit_concurrency(catalog_limiter)
+def get_muscle_group(muscle_group_id):
+    try:
+        with_exercises = request.args.get("include") == "exercises"
+        payload = get_catalog().muscle_group_payload(muscle_group_id, with_exercises=with_exercises)
+        if not payload:
+            return jsonify({"error": "Muscle group not found"}), 404
+        return _payload_response(payload)
+    except Exception as e:
+        return jsonify({"error": "Error retrieving muscle group", "details": str(e)}), 500
+
 @fitness_bp.route("/fitness/wod", methods=["GET"])
-@jwt_required()
+@jwt_required
 def get_wod():
     try:
         user_email = g.user_email
+        available_equipment = _list_arg("equipment") if "equipment" in request.args else None
 
-        exercises_with_muscles = request_wod(user_email)
-        print(f"get_wod: Received {len(exercises_with_muscles)} exercises")
-
-        wod_exercises = []
-        for exercise, muscle_groups in exercises_with_muscles:
-            print(f"Processing Exercise ID: {exercise.id}, Name: {exercise.name}")
-            muscle_impacts = []
-            for mg, is_primary in muscle_groups:
-                print(f"Muscle: {mg.name}, Primary: {is_primary}")
-                muscle_impacts.append(
-                    MuscleGroupImpact(
-                        id=mg.id,
-                        name=mg.name,
-                        body_part=mg.body_part,
-                        is_primary=is_primary,
-                        intensity=calculate_intensity(exercise.difficulty) * (1.2 if is_primary else 0.8)
-                    )
-                )
-
-            wod_exercise = WodExerciseSchema(
-                id=exercise.id,
-                name=exercise.name,
-                description=exercise.description,
-                difficulty=exercise.difficulty,
-                muscle_groups=muscle_impacts,
-                suggested_weight=random.uniform(5.0, 50.0),
-                suggested_reps=random.randint(8, 15)
-            )
-            wod_exercises.append(wod_exercise)
-
-        response = WodResponseSchema(
-            exercises=wod_exercises,
-            generated_at = datetime.now().isoformat()
-        )
-
-        return jsonify(response.model_dump()), 200
+        body = wod_router.get_wod(user_email, available_equipment, request.headers.get("Authorization"))
+        return Response(body, status=200, mimetype="application/json")
 
+    except Overloaded as e:
+        return overloaded_response(e.limiter)
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -89,7 +152,7 @@ def get_wod():
         }), 500
 
 @fitness_bp.route("/fitness/exercises/yesterday", methods=["GET"])
-@jwt_required()
+@jwt_required
 def get_performed_exercises_yesterday():
     try:
         user_email = g.user_email
@@ -104,7 +167,7 @@ def get_performed_exercises_yesterday():
         return jsonify({"error": "Error retrieving yesterday's exercises", "details": str(e)}), 500
     
 @fitness_bp.route("/fitness/exercises/history", methods=["GET"])
-@jwt_required()
+@jwt_required
 def get_exercise_history():
     try:
         user_email = g.user_email
@@ -119,28 +182,44 @@ def get_exercise_history():
         return jsonify({"error": "Error retrieving exercise history", "details": str(e)}), 500
 
 @fitness_bp.route("/fitness/exercises/history", methods=["POST"])
-@jwt_required()
+@jwt_required
 def add_exercise_history():
     try:
         user_email = g.user_email
         history_data = request.get_json()
         history = ExerciseHistoryCreateSchema.model_validate(history_data)
         
-        db = db_session()
-        new_history = ExerciseHistoryModel(
-            user_email=user_email,
-            exercise_id=history.exercise_id,
-            performed_at=history.performed_at or datetime.now(),
-            duration_minutes=history.duration_minutes,
-            reps=history.reps
-        )
-        db.add(new_history)
-        db.commit()
-        db.refresh(new_history)
-        db.close()
+        new_history = add_exercise_history_service(user_email, history)
+        
+        return jsonify(new_history.model_dump()), 201
+    except ValidationError as e:
+        return jsonify({"error": "Invalid exercise history data", "details": e.errors()}), 400
+    except Exception as e:
+        return jsonify({"error": "Error adding exercise history", "details": str(e)}), 500
+
+@fitness_bp.route("/fitness/exercises/history/batch", methods=["POST"])
+@jwt_required
+def add_exercise_history_batch():
+    try:
+        user_email = g.user_email
+        history = history_batch_adapter.validate_python(request.get_json())
         
-        return jsonify(ExerciseHistoryResponseSchema.model_validate(new_history).model_dump()), 201
+        new_history = add_exercise_history_batch_service(user_email, history)
+        
+        return jsonify([entry.model_dump() for entry in new_history]), 201
     except ValidationError as e:
         return jsonify({"error": "Invalid exercise history data", "details": e.errors()}), 400
     except Exception as e:
-        return jsonify({"error": "Error adding exercise history", "details": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": "Error adding exercise history", "details": str(e)}), 500
+
+@fitness_bp.route("/fitness/stats", methods=["GET"])
+@jwt_required
+def get_stats():
+    period = request.args.get("period", "week")
+    if period not in STATS_PERIODS:
+        return jsonify({"error": "Invalid period", "details": f"period must be one of {', '.join(STATS_PERIODS)}"}), 400
+    try:
+        stats = get_training_stats(g.user_email, period)
+        return jsonify(stats.model_dump(mode="json")), 200
+    except Exception as e:
+        return jsonify({"error": "Error retrieving training stats", "details": str(e)}), 500
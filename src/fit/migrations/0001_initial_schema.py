@@ -0,0 +1,84 @@
+"""
+Baseline schema: the tables as they were when migrations were introduced.
+
+Frozen on purpose, not derived from the models: later schema changes are
+migrations of their own. Existing tables are left as they are, so databases
+created by the former create_all at every start are adopted.
+"""
+from sqlalchemy import Boolean, Column, Date, DateTime, Float, ForeignKey, Integer, MetaData, String, Table, Text
+
+metadata = MetaData()
+
+Table(
+    "users", metadata,
+    Column("email", String, primary_key=True, index=True),
+    Column("name", String, nullable=False),
+    Column("role", String, nullable=False),
+    Column("password_hash", String, nullable=False),
+    Column("weight", Float),
+    Column("height", Float),
+    Column("fitness_goal", String),
+    Column("onboarded", String, nullable=False),
+)
+
+Table(
+    "muscle_groups", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String(100), unique=True, nullable=False),
+    Column("body_part", String(50), nullable=False),
+    Column("description", Text),
+)
+
+Table(
+    "exercises", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String(100), unique=True, nullable=False),
+    Column("description", Text),
+    Column("difficulty", Integer, nullable=False),
+    Column("equipment", String(100)),
+    Column("instructions", Text),
+)
+
+Table(
+    "exercise_muscle_groups", metadata,
+    Column("exercise_id", Integer, ForeignKey("exercises.id", ondelete="CASCADE"), primary_key=True),
+    Column("muscle_group_id", Integer, ForeignKey("muscle_groups.id", ondelete="CASCADE"), primary_key=True),
+    Column("is_primary", Boolean, nullable=False),
+)
+
+Table(
+    "exercise_history", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_email", String, ForeignKey("users.email"), nullable=False),
+    Column("exercise_id", Integer, ForeignKey("exercises.id"), nullable=False),
+    Column("performed_at", DateTime, nullable=False),
+    Column("duration_minutes", Float),
+    Column("reps", Integer),
+)
+
+Table(
+    "user_daily_load", metadata,
+    Column("user_email", String, ForeignKey("users.email"), primary_key=True),
+    Column("day", Date, primary_key=True),
+    Column("muscle_group_id", Integer, ForeignKey("muscle_groups.id", ondelete="CASCADE"), primary_key=True),
+    Column("exercise_count", Integer, nullable=False),
+    Column("primary_count", Integer, nullable=False),
+    Column("reps", Integer, nullable=False),
+    Column("minutes", Float, nullable=False),
+    Column("volume", Float, nullable=False),
+)
+
+Table(
+    "user_daily_summary", metadata,
+    Column("user_email", String, ForeignKey("users.email"), primary_key=True),
+    Column("day", Date, primary_key=True),
+    Column("exercise_count", Integer, nullable=False),
+    Column("reps", Integer, nullable=False),
+    Column("minutes", Float, nullable=False),
+    Column("volume", Float, nullable=False),
+    Column("streak", Integer, nullable=False),
+)
+
+
+def upgrade(connection):
+    metadata.create_all(bind=connection)
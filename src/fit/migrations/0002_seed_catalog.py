@@ -0,0 +1,20 @@
+"""
+Muscle groups and exercises of the seed script, on a database without any.
+The tables exist (0001), so the script's DROP and CREATE TABLE statements
+are skipped: dropping them would also drop the history foreign keys.
+"""
+import os
+from sqlalchemy import text
+from ..services.migration_service import sql_statements
+
+SEED_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "db_init_scripts", "init_muscle_groups_exercises.sql")
+
+
+def upgrade(connection):
+    if connection.execute(text("SELECT COUNT(*) FROM exercises")).scalar():
+        return
+    with open(SEED_SCRIPT) as file:
+        statements = sql_statements(file.read())
+    for statement in statements:
+        if not statement.upper().startswith(("DROP TABLE", "CREATE TABLE")):
+            connection.execute(text(statement))
@@ -0,0 +1,11 @@
+"""
+Index for the history lookups by user and date range (yesterday's
+exercises, stats and load rebuilds), built without blocking history writes
+"""
+from ..services.migration_service import create_index_online
+
+TRANSACTIONAL = False
+
+
+def upgrade(connection):
+    create_index_online(connection, "ix_exercise_history_user_performed_at", "exercise_history", ["user_email", "performed_at"])
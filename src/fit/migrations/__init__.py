@@ -0,0 +1,3 @@
+"""
+Versioned schema migrations, applied by services/migration_service.py
+"""
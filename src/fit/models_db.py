@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, String, Float, Integer, Boolean, ForeignKey, Table, Text, DateTime
+from sqlalchemy import Column, String, Float, Integer, Boolean, ForeignKey, Table, Text, DateTime, Date
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from .database import Base
@@ -81,6 +81,47 @@ class ExerciseHistoryModel(Base):
 
     user = relationship("UserModel", back_populates="exercise_histories")
     exercise = relationship("ExerciseModel")
+    # Indexed on (user_email, performed_at) by migration 0003, which owns the
+    # index: declaring it here would create it with the tables in init_db()
     
     def __repr__(self):
         return f"<ExerciseHistory(id={self.id}, user_email='{self.user_email}', exercise_id={self.exercise_id}, performed_at={self.performed_at})>"
+
+
+class UserDailyLoadModel(Base):
+    """
+    Per user, day and muscle group training totals, maintained incrementally
+    on every exercise history write
+    """
+    __tablename__ = "user_daily_load"
+
+    user_email = Column(String, ForeignKey("users.email"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    muscle_group_id = Column(Integer, ForeignKey("muscle_groups.id", ondelete="CASCADE"), primary_key=True)
+    exercise_count = Column(Integer, default=0, nullable=False)
+    primary_count = Column(Integer, default=0, nullable=False)
+    reps = Column(Integer, default=0, nullable=False)
+    minutes = Column(Float, default=0.0, nullable=False)
+    volume = Column(Float, default=0.0, nullable=False)  # reps weighted by muscle group intensity
+
+    def __repr__(self):
+        return f"<UserDailyLoad(user_email='{self.user_email}', day={self.day}, muscle_group_id={self.muscle_group_id})>"
+
+
+class UserDailySummaryModel(Base):
+    """
+    Per user and day training totals with the length of the activity streak
+    ending that day, maintained incrementally on every exercise history write
+    """
+    __tablename__ = "user_daily_summary"
+
+    user_email = Column(String, ForeignKey("users.email"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    exercise_count = Column(Integer, default=0, nullable=False)
+    reps = Column(Integer, default=0, nullable=False)
+    minutes = Column(Float, default=0.0, nullable=False)
+    volume = Column(Float, default=0.0, nullable=False)  # reps weighted by exercise intensity
+    streak = Column(Integer, default=0, nullable=False)  # consecutive active days up to and including this one
+
+    def __repr__(self):
+        return f"<UserDailySummary(user_email='{self.user_email}', day={self.day}, streak={self.streak})>"
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field, EmailStr
 from typing import List, Optional
-from datetime import datetime
+from datetime import date, datetime
 
 # User-related DTOs
 class UserSchema(BaseModel):
@@ -85,6 +85,9 @@ class Exercise(ExerciseBase):
     id: int
     muscle_groups: List[MuscleGroupWithPrimary] = []
 
+class MuscleGroupWithExercises(MuscleGroup):
+    exercises: List[Exercise] = []
+
 class MuscleGroupImpact(BaseModel):
     id: int
     name: str
@@ -114,4 +117,33 @@ class ExerciseHistoryCreateSchema(BaseModel):
 
 class ExerciseHistoryResponseSchema(ExerciseHistoryCreateSchema):
     id: int
-    user_email: str
\ No newline at end of file
+    user_email: str
+
+# Training stats DTOs
+class MuscleGroupStatsSchema(BaseModel):
+    id: int
+    name: str
+    body_part: str
+    exercise_count: int
+    reps: int
+    minutes: float
+    volume: float
+
+class TrainingTotalsSchema(BaseModel):
+    exercise_count: int = 0
+    reps: int = 0
+    minutes: float = 0.0
+    volume: float = 0.0
+    active_days: int = 0
+
+class StreakSchema(BaseModel):
+    current: int = 0
+    longest: int = 0  # longest streak reached during the period
+
+class TrainingStatsSchema(BaseModel):
+    period: str
+    start: date
+    end: date
+    totals: TrainingTotalsSchema
+    muscle_groups: List[MuscleGroupStatsSchema]
+    streaks: StreakSchema
@@ -0,0 +1,158 @@
+"""
+Admission control: per endpoint class concurrency limits with a bounded wait
+queue, so a burst of expensive requests cannot starve the cheap ones.
+
+Each pool admits up to `max_concurrent` requests; up to `max_queue` more wait
+at most `queue_timeout` seconds for a slot, and anything beyond that is shed
+immediately with a 503 and a `Retry-After` header. WOD, catalog and auth
+endpoints get separate pools, so a WOD storm only queues WOD requests.
+"""
+import os
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict
+from flask import jsonify, Response
+
+
+class ConcurrencyLimiter:
+    """
+    Counting semaphore with a bounded, time limited wait queue and counters
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, queue_timeout: float, retry_after: int):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> bool:
+        """
+        Take a slot, waiting in the queue if there is room in it. Returns
+        False when the request should be shed.
+        """
+        with self._condition:
+            if self.active >= self.max_concurrent:
+                if self.waiting >= self.max_queue:
+                    self.rejected += 1
+                    return False
+                self.waiting += 1
+                try:
+                    admitted = self._condition.wait_for(lambda: self.active < self.max_concurrent, self.queue_timeout)
+                finally:
+                    self.waiting -= 1
+                if not admitted:
+                    self.timed_out += 1
+                    return False
+            self.active += 1
+            self.admitted += 1
+            return True
+
+    def release(self):
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
+
+    def utilization(self) -> float:
+        """
+        Share of the pool and its queue in use; at 1.0 requests are shed
+        """
+        with self._condition:
+            return (self.active + self.waiting) / max(1, self.max_concurrent + self.max_queue)
+
+    def stats(self) -> Dict[str, float]:
+        with self._condition:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "queue_timeout": self.queue_timeout,
+                "active": self.active,
+                "waiting": self.waiting,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+            }
+
+
+def _limiter_from_env(name: str, max_concurrent: int, queue_timeout: float, retry_after: int) -> ConcurrencyLimiter:
+    prefix = name.upper()
+    max_concurrent = int(os.environ.get(f"{prefix}_MAX_CONCURRENCY", str(max_concurrent)))
+    return ConcurrencyLimiter(
+        name,
+        max_concurrent=max_concurrent,
+        max_queue=int(os.environ.get(f"{prefix}_MAX_QUEUE", str(2 * max_concurrent))),
+        queue_timeout=float(os.environ.get(f"{prefix}_QUEUE_TIMEOUT", str(queue_timeout))),
+        retry_after=int(os.environ.get(f"{prefix}_RETRY_AFTER", str(retry_after)))
+    )
+
+
+# WOD generation is CPU bound and holds the GIL, so the threads of a worker
+# run one at a time: a second slot overlaps the database reads of one WOD with
+# the computation of another, any more only queue for the GIL. Tune it
+# with WOD_MAX_CONCURRENCY, e.g. when generation runs in a process pool
+WOD_MAX_CONCURRENCY = 2
+
+wod_limiter = _limiter_from_env("wod", max_concurrent=WOD_MAX_CONCURRENCY, queue_timeout=2.0, retry_after=5)
+catalog_limiter = _limiter_from_env("catalog", max_concurrent=64, queue_timeout=0.5, retry_after=1)
+auth_limiter = _limiter_from_env("auth", max_concurrent=16, queue_timeout=1.0, retry_after=1)
+
+limiters = {limiter.name: limiter for limiter in (wod_limiter, catalog_limiter, auth_limiter)}
+
+
+class Overloaded(Exception):
+    def __init__(self, limiter: ConcurrencyLimiter):
+        super().__init__(f"{limiter.name} pool is saturated")
+        self.limiter = limiter
+
+
+@contextmanager
+def admitted(limiter: ConcurrencyLimiter):
+    """
+    Hold a slot of `limiter` for the duration of the block, raising
+    Overloaded if the request is shed
+    """
+    if not limiter.acquire():
+        raise Overloaded(limiter)
+    try:
+        yield
+    finally:
+        limiter.release()
+
+
+def overloaded_response(limiter: ConcurrencyLimiter) -> Response:
+    response = jsonify({"error": "Service overloaded, retry later", "pool": limiter.name})
+    response.status_code = 503
+    response.headers["Retry-After"] = str(limiter.retry_after)
+    return response
+
+
+def limit_concurrency(limiter: ConcurrencyLimiter) -> Callable:
+    """
+    Decorator admitting the view through `limiter`, or answering 503 with
+    Retry-After when the pool and its queue are full
+    """
+    def decorator(f: Callable) -> Callable:
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            try:
+                with admitted(limiter):
+                    return f(*args, **kwargs)
+            except Overloaded as e:
+                if e.limiter is not limiter:
+                    raise
+                return overloaded_response(limiter)
+
+        return decorated_function
+
+    return decorator
+
+
+def admission_stats() -> Dict[str, Dict[str, float]]:
+    return {name: limiter.stats() for name, limiter in limiters.items()}
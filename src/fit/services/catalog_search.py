@@ -0,0 +1,116 @@
+"""
+In-memory search over the exercise catalog.
+
+Every exercise gets a position in the catalog; each token and facet value maps
+to a bitmap (a Python int) with one bit per position. A search is a handful of
+integer ANDs/ORs followed by a walk over the set bits, no database involved.
+"""
+import re
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence
+from ..models_dto import Exercise, MuscleGroup
+from .equipment_index import equipment_items
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Split free text into lowercase alphanumeric tokens
+    """
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def _bitmap_positions(bitmap: int) -> Iterable[int]:
+    while bitmap:
+        lowest = bitmap & -bitmap
+        yield lowest.bit_length() - 1
+        bitmap ^= lowest
+
+
+class CatalogSearchIndex:
+    """
+    Token inverted index over name/description/instructions plus facet
+    bitmaps on difficulty, equipment, muscle group and body part
+    """
+
+    def __init__(self, exercises: Sequence[Exercise], muscle_groups: Sequence[MuscleGroup]):
+        self.exercises = tuple(exercises)
+        self.all_bits = (1 << len(self.exercises)) - 1
+
+        self.tokens: Dict[str, int] = {}
+        self.difficulty: Dict[int, int] = {}
+        self.equipment: Dict[str, int] = {}
+        self.muscle_group: Dict[int, int] = {}
+        self.body_part: Dict[str, int] = {}
+        self.muscle_group_ids_by_name = {mg.name.lower(): mg.id for mg in muscle_groups}
+
+        for position, exercise in enumerate(self.exercises):
+            bit = 1 << position
+            text = " ".join(filter(None, (exercise.name, exercise.description, exercise.instructions)))
+            for token in set(tokenize(text)):
+                self.tokens[token] = self.tokens.get(token, 0) | bit
+            self.difficulty[exercise.difficulty] = self.difficulty.get(exercise.difficulty, 0) | bit
+            for item in equipment_items(exercise.equipment):
+                self.equipment[item] = self.equipment.get(item, 0) | bit
+            for mg in exercise.muscle_groups:
+                self.muscle_group[mg.id] = self.muscle_group.get(mg.id, 0) | bit
+                body_part = mg.body_part.lower()
+                self.body_part[body_part] = self.body_part.get(body_part, 0) | bit
+
+        self.sorted_tokens = sorted(self.tokens)
+
+    def _token_bitmap(self, prefix: str) -> int:
+        # Every query token is treated as a prefix so partial words match
+        bitmap = 0
+        position = bisect_left(self.sorted_tokens, prefix)
+        while position < len(self.sorted_tokens) and self.sorted_tokens[position].startswith(prefix):
+            bitmap |= self.tokens[self.sorted_tokens[position]]
+            position += 1
+        return bitmap
+
+    @staticmethod
+    def _facet_bitmap(facet: Dict, values: Iterable) -> int:
+        bitmap = 0
+        for value in values:
+            bitmap |= facet.get(value, 0)
+        return bitmap
+
+    def _muscle_group_id(self, value: str) -> Optional[int]:
+        if value.isdigit():
+            return int(value)
+        return self.muscle_group_ids_by_name.get(value.lower())
+
+    def search(
+        self,
+        q: Optional[str] = None,
+        difficulty: Sequence[int] = (),
+        equipment: Sequence[str] = (),
+        muscle_group: Sequence[str] = (),
+        body_part: Sequence[str] = (),
+        limit: Optional[int] = None,
+    ) -> List[Exercise]:
+        """
+        Return exercises matching every query token and every given facet.
+        Several values for the same facet are OR'ed together.
+        """
+        bitmap = self.all_bits
+        for token in tokenize(q):
+            bitmap &= self._token_bitmap(token)
+        if difficulty:
+            bitmap &= self._facet_bitmap(self.difficulty, difficulty)
+        if equipment:
+            bitmap &= self._facet_bitmap(self.equipment, (value.strip().lower() for value in equipment))
+        if muscle_group:
+            bitmap &= self._facet_bitmap(self.muscle_group, (self._muscle_group_id(value) for value in muscle_group))
+        if body_part:
+            bitmap &= self._facet_bitmap(self.body_part, (value.strip().lower() for value in body_part))
+
+        results = []
+        for position in _bitmap_positions(bitmap):
+            if limit is not None and len(results) >= limit:
+                break
+            results.append(self.exercises[position])
+        return results
@@ -0,0 +1,242 @@
+"""
+In-memory catalog of exercises and muscle groups.
+
+The catalog only changes when the seed script runs, so it is loaded with a
+handful of queries and its JSON responses are serialized (and compressed)
+once, then served as ready-made byte buffers.
+"""
+import gzip
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+from pydantic import TypeAdapter
+from ..database import db_session
+from ..models_db import MuscleGroupModel, ExerciseModel, exercise_muscle_groups
+from ..models_dto import MuscleGroup, MuscleGroupWithPrimary, MuscleGroupWithExercises, Exercise
+from .catalog_search import CatalogSearchIndex
+from .equipment_index import EquipmentIndex
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+# Payloads smaller than this are not worth compressing
+COMPRESSION_MIN_SIZE = 512
+# Quality 11 is several hundred times slower for a few percent smaller output
+BROTLI_QUALITY = 9
+
+exercise_list_adapter = TypeAdapter(List[Exercise])
+muscle_group_list_adapter = TypeAdapter(List[MuscleGroup])
+
+
+@dataclass(frozen=True)
+class SerializedPayload:
+    """
+    A JSON response body with its precompressed variants, keyed by
+    content-coding ("identity", "gzip", "br"), and a strong ETag scoped to
+    the catalog version it was rendered from.
+    """
+    variants: Dict[str, bytes]
+    etag: str
+    version: str
+
+    @classmethod
+    def build(cls, body: bytes, version: str, key: str) -> "SerializedPayload":
+        variants = {"identity": body}
+        if len(body) >= COMPRESSION_MIN_SIZE:
+            variants["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+            if brotli is not None:
+                variants["br"] = brotli.compress(body, quality=BROTLI_QUALITY)
+        return cls(variants=variants, etag=f"{version}.{key}", version=version)
+
+    def variant_etag(self, encoding: str) -> str:
+        # Strong ETags must differ between encoded representations
+        return self.etag if encoding == "identity" else f"{self.etag}-{encoding}"
+
+
+class Catalog:
+    """
+    Immutable snapshot of the exercise catalog with memoized JSON payloads
+    """
+
+    def __init__(self, muscle_groups: List[MuscleGroup], exercises: List[Exercise]):
+        self.muscle_groups = muscle_groups
+        self.exercises = exercises
+        self.muscle_groups_by_id = {mg.id: mg for mg in muscle_groups}
+        self.exercises_by_id = {exercise.id: exercise for exercise in exercises}
+
+        # Inverted index: muscle group id -> exercises targeting it, in catalog order
+        index: Dict[int, List[Exercise]] = {mg.id: [] for mg in muscle_groups}
+        for exercise in exercises:
+            for mg in exercise.muscle_groups:
+                index.setdefault(mg.id, []).append(exercise)
+        self.exercises_by_muscle_group: Dict[int, Tuple[Exercise, ...]] = {
+            mg_id: tuple(items) for mg_id, items in index.items()
+        }
+        self.search_index = CatalogSearchIndex(exercises, muscle_groups)
+        # Only exercises with muscle groups can be part of a workout of the day
+        wod_candidates = [exercise for exercise in exercises if exercise.muscle_groups]
+        self.equipment_index = EquipmentIndex(wod_candidates)
+        # numpy loads with the first catalog, not when the app is imported
+        from .wod_selector import IncidenceMatrix
+        self.incidence = IncidenceMatrix(wod_candidates, muscle_groups)
+
+        # Per-exercise JSON, reused to assemble single-exercise and search responses
+        self.exercise_json: Dict[int, bytes] = {
+            exercise.id: exercise.model_dump_json().encode() for exercise in exercises
+        }
+
+        exercises_body = exercise_list_adapter.dump_json(exercises)
+        muscle_groups_body = muscle_group_list_adapter.dump_json(muscle_groups)
+        self.version = hashlib.sha256(exercises_body + b"\n" + muscle_groups_body).hexdigest()[:16]
+
+        self._payloads: Dict[str, SerializedPayload] = {}
+        self._lock = threading.Lock()
+        self._store("exercises", exercises_body)
+        self._store("muscle-groups", muscle_groups_body)
+
+    def _store(self, key: str, body: bytes) -> SerializedPayload:
+        payload = SerializedPayload.build(body, self.version, key)
+        self._payloads[key] = payload
+        return payload
+
+    def _payload(self, key: str, render: Callable[[], bytes]) -> SerializedPayload:
+        payload = self._payloads.get(key)
+        if payload is None:
+            with self._lock:
+                payload = self._payloads.get(key) or self._store(key, render())
+        return payload
+
+    def exercises_payload(self) -> SerializedPayload:
+        return self._payloads["exercises"]
+
+    def exercise_payload(self, exercise_id: int) -> Optional[SerializedPayload]:
+        exercise = self.exercises_by_id.get(exercise_id)
+        if exercise is None:
+            return None
+        return self._payload(f"exercise-{exercise_id}", lambda: self.exercise_json[exercise_id])
+
+    def render_exercises(self, exercises: List[Exercise]) -> bytes:
+        """
+        Concatenate the pre-serialized JSON of the given exercises into a list
+        """
+        return b"[" + b",".join(self.exercise_json[exercise.id] for exercise in exercises) + b"]"
+
+    def exercises_for_muscle_group(self, muscle_group_id: int) -> Tuple[Exercise, ...]:
+        return self.exercises_by_muscle_group.get(muscle_group_id, ())
+
+    def exercises_by_muscle_group_payload(self, muscle_group_id: int) -> Optional[SerializedPayload]:
+        # Only known ids are memoized: clients must not grow the payload cache
+        if muscle_group_id not in self.muscle_groups_by_id:
+            return None
+
+        def render() -> bytes:
+            return self.render_exercises(self.exercises_for_muscle_group(muscle_group_id))
+        return self._payload(f"exercises-mg-{muscle_group_id}", render)
+
+    def muscle_groups_payload(self) -> SerializedPayload:
+        return self._payloads["muscle-groups"]
+
+    def muscle_group_payload(self, muscle_group_id: int, with_exercises: bool = False) -> Optional[SerializedPayload]:
+        muscle_group = self.muscle_groups_by_id.get(muscle_group_id)
+        if muscle_group is None:
+            return None
+        if not with_exercises:
+            return self._payload(f"muscle-group-{muscle_group_id}", lambda: muscle_group.model_dump_json().encode())
+
+        def render() -> bytes:
+            return MuscleGroupWithExercises(
+                **muscle_group.model_dump(),
+                exercises=list(self.exercises_for_muscle_group(muscle_group_id))
+            ).model_dump_json().encode()
+        return self._payload(f"muscle-group-{muscle_group_id}-exercises", render)
+
+
+def load_catalog() -> Catalog:
+    """
+    Load all muscle groups, exercises and their links in three queries
+    """
+    db = db_session()
+    try:
+        muscle_group_rows = db.query(MuscleGroupModel).order_by(MuscleGroupModel.id).all()
+        exercise_rows = db.query(ExerciseModel).order_by(ExerciseModel.id).all()
+        link_rows = db.query(exercise_muscle_groups).order_by(
+            exercise_muscle_groups.c.exercise_id,
+            exercise_muscle_groups.c.muscle_group_id
+        ).all()
+
+        muscle_groups = [
+            MuscleGroup(id=mg.id, name=mg.name, body_part=mg.body_part, description=mg.description)
+            for mg in muscle_group_rows
+        ]
+        muscle_groups_by_id = {mg.id: mg for mg in muscle_groups}
+
+        links: Dict[int, List[MuscleGroupWithPrimary]] = {}
+        for exercise_id, muscle_group_id, is_primary in link_rows:
+            mg = muscle_groups_by_id[muscle_group_id]
+            links.setdefault(exercise_id, []).append(
+                MuscleGroupWithPrimary(**mg.model_dump(), is_primary=is_primary)
+            )
+
+        exercises = [
+            Exercise(
+                id=exercise.id,
+                name=exercise.name,
+                description=exercise.description,
+                difficulty=exercise.difficulty,
+                equipment=exercise.equipment,
+                instructions=exercise.instructions,
+                muscle_groups=links.get(exercise.id, [])
+            )
+            for exercise in exercise_rows
+        ]
+        return Catalog(muscle_groups, exercises)
+    finally:
+        db.close()
+
+
+_catalog: Optional[Catalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> Catalog:
+    """
+    Return the current catalog, loading it on first use
+    """
+    global _catalog
+    catalog = _catalog
+    if catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = load_catalog()
+            catalog = _catalog
+    return catalog
+
+
+def loaded_catalog() -> Optional[Catalog]:
+    """
+    Return the current catalog if it is loaded, without loading it
+    """
+    return _catalog
+
+
+def refresh_catalog() -> Catalog:
+    """
+    Reload the catalog from the database and swap it in atomically
+    """
+    global _catalog
+    catalog = load_catalog()
+    with _catalog_lock:
+        _catalog = catalog
+    return catalog
+
+
+def invalidate_catalog():
+    """
+    Drop the current catalog; the next request reloads it
+    """
+    global _catalog
+    with _catalog_lock:
+        _catalog = None
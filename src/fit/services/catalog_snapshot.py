@@ -0,0 +1,99 @@
+"""
+Catalog snapshots for stateless services.
+
+Services without database access (the coach microservice) generate WODs from
+a snapshot of the catalog exported by this app: muscle groups, exercises with
+their compiled equipment requirements, and the exercise x muscle group links
+with their intensities, so consumers do not reimplement any catalog rule.
+
+Snapshots are written in the compact, memory-mappable binary format of
+`catalog_snapshot_format`, or as JSON when the path ends in ".json".
+
+    python -m src.fit.services.catalog_snapshot [path]
+"""
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, UTC
+from typing import Optional
+from .catalog_service import Catalog, get_catalog
+from .catalog_snapshot_format import encode_snapshot
+from .equipment_index import equipment_requirements
+from .fitness_coach_service import muscle_group_intensity
+
+SNAPSHOT_FORMAT = 1
+CATALOG_SNAPSHOT_PATH = os.environ.get("CATALOG_SNAPSHOT_PATH")
+
+
+def snapshot_document(catalog: Catalog) -> dict:
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "version": catalog.version,
+        "exported_at": datetime.now(UTC).isoformat(),
+        "muscle_groups": [
+            {"id": mg.id, "name": mg.name, "body_part": mg.body_part}
+            for mg in catalog.muscle_groups
+        ],
+        "exercises": [
+            {
+                "id": exercise.id,
+                "name": exercise.name,
+                "description": exercise.description,
+                "difficulty": exercise.difficulty,
+                # Clauses of alternatives, e.g. [["barbell", "dumbbells"], ["bench"]]
+                "requirements": equipment_requirements(exercise.equipment),
+                "muscle_groups": [
+                    {
+                        "id": mg.id,
+                        "is_primary": mg.is_primary,
+                        "intensity": muscle_group_intensity(exercise.difficulty, mg.is_primary)
+                    }
+                    for mg in exercise.muscle_groups
+                ]
+            }
+            for exercise in catalog.exercises
+        ]
+    }
+
+
+def encode_binary_snapshot(catalog: Catalog) -> bytes:
+    document = snapshot_document(catalog)
+    return encode_snapshot(
+        document["version"],
+        [(mg["id"], mg["name"], mg["body_part"]) for mg in document["muscle_groups"]],
+        document["exercises"]
+    )
+
+
+def export_catalog_snapshot(path: str, catalog: Optional[Catalog] = None) -> str:
+    """
+    Write the catalog snapshot to `path` atomically, so readers polling the
+    file never see a partial write. Returns the exported catalog version.
+    """
+    catalog = catalog or get_catalog()
+    if path.endswith(".json"):
+        body = json.dumps(snapshot_document(catalog), separators=(",", ":")).encode()
+    else:
+        body = encode_binary_snapshot(catalog)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".catalog-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(body)
+        # Replacing the file (rather than rewriting it) keeps existing
+        # mappings of the previous snapshot valid
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return catalog.version
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else CATALOG_SNAPSHOT_PATH
+    if not target:
+        sys.exit("usage: python -m src.fit.services.catalog_snapshot <path> (or set CATALOG_SNAPSHOT_PATH)")
+    print(f"Exported catalog {export_catalog_snapshot(target)} to {target}")
@@ -0,0 +1,115 @@
+"""
+Equipment requirements of catalog exercises as integer bitmasks.
+
+Every piece of equipment named in the catalog gets one bit. An exercise's
+`equipment` column ("Barbell, Bench", "Barbell or Dumbbells",
+"Weight (optional)", "None", ...) is compiled into a tuple of masks, one per
+acceptable combination, so checking it against what a user owns is a single
+AND per mask (and almost every exercise has exactly one mask).
+"""
+import re
+import threading
+from itertools import product
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from ..models_dto import Exercise
+
+OPTIONAL_PATTERN = re.compile(r"\(optional\)")
+BODYWEIGHT = "none"
+
+# Upper bound on memoized candidate pools (one per distinct equipment set)
+MAX_CACHED_POOLS = 1024
+
+
+def _normalize(name: str) -> str:
+    return OPTIONAL_PATTERN.sub("", name).strip().lower()
+
+
+def equipment_items(equipment: Optional[str]) -> Set[str]:
+    """
+    Normalized equipment names mentioned by an exercise, e.g.
+    "Barbell or Dumbbells, Bench" -> {"barbell", "dumbbells", "bench"}.
+    Bodyweight exercises ("None" or empty) map to {"none"}.
+    """
+    items = set()
+    for part in (equipment or "").split(","):
+        for alternative in part.split(" or "):
+            name = _normalize(alternative)
+            if name:
+                items.add(name)
+    return items or {BODYWEIGHT}
+
+
+def equipment_requirements(equipment: Optional[str]) -> List[List[str]]:
+    """
+    Required equipment as a list of clauses, each clause listing the
+    alternatives that satisfy it. Optional and bodyweight items are dropped:
+    "Barbell or Dumbbells, Bench, Weight (optional)" -> [["barbell", "dumbbells"], ["bench"]]
+    """
+    clauses = []
+    for part in (equipment or "").split(","):
+        if OPTIONAL_PATTERN.search(part):
+            continue
+        alternatives = [_normalize(alternative) for alternative in part.split(" or ")]
+        alternatives = [name for name in alternatives if name and name != BODYWEIGHT]
+        if alternatives:
+            clauses.append(alternatives)
+    return clauses
+
+
+class EquipmentIndex:
+    """
+    Equipment bitmasks for every exercise in the catalog, with memoized
+    candidate pools per available-equipment mask
+    """
+
+    def __init__(self, exercises: Sequence[Exercise]):
+        self.bits: Dict[str, int] = {}
+        requirements = {exercise.id: equipment_requirements(exercise.equipment) for exercise in exercises}
+        for clauses in requirements.values():
+            for alternatives in clauses:
+                for name in alternatives:
+                    self.bits.setdefault(name, 1 << len(self.bits))
+
+        # exercise id -> acceptable requirement masks; (0,) means no equipment needed
+        self.requirement_masks: Dict[int, Tuple[int, ...]] = {}
+        for exercise_id, clauses in requirements.items():
+            if not clauses:
+                self.requirement_masks[exercise_id] = (0,)
+                continue
+            masks = {
+                sum(self.bits[name] for name in set(combination))
+                for combination in product(*clauses)
+            }
+            self.requirement_masks[exercise_id] = tuple(sorted(masks))
+
+        self._exercise_ids = tuple(exercise.id for exercise in exercises)
+        self._pools: Dict[int, Tuple[int, ...]] = {}
+        self._lock = threading.Lock()
+
+    def mask_for(self, available_equipment: Iterable[str]) -> int:
+        """
+        Bitmask of the given equipment names; names unknown to the catalog are ignored
+        """
+        mask = 0
+        for name in available_equipment:
+            mask |= self.bits.get(_normalize(name), 0)
+        return mask
+
+    def is_eligible(self, exercise_id: int, available_mask: int) -> bool:
+        return any(required & ~available_mask == 0 for required in self.requirement_masks[exercise_id])
+
+    def candidate_ids(self, available_mask: int) -> Tuple[int, ...]:
+        """
+        Ids of the exercises doable with the given equipment, in catalog order
+        """
+        pool = self._pools.get(available_mask)
+        if pool is None:
+            pool = tuple(
+                exercise_id for exercise_id in self._exercise_ids
+                if self.is_eligible(exercise_id, available_mask)
+            )
+            with self._lock:
+                if len(self._pools) >= MAX_CACHED_POOLS:
+                    self._pools.clear()
+                self._pools[available_mask] = pool
+        return pool
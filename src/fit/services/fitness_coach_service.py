@@ -1,10 +1,26 @@
-from typing import List, Tuple
-from ..models_db import ExerciseModel, MuscleGroupModel, exercise_muscle_groups, ExerciseHistoryModel
+from typing import List, Optional, Tuple
+from ..models_db import ExerciseHistoryModel
+from ..models_dto import Exercise, MuscleGroupWithPrimary
 from ..database import db_session
+from .catalog_service import get_catalog
+import hashlib
+import os
 import random
-from datetime import datetime, timedelta, time
+from datetime import date, datetime, timedelta, time
 import time as pytime
 
+# Equipment mask with every bit set: no equipment filtering
+ALL_EQUIPMENT = -1
+WOD_SIZE = 6
+PRIMARY_INTENSITY_FACTOR = 1.2
+SECONDARY_INTENSITY_FACTOR = 0.8
+MAX_DIFFICULTY = 5
+
+# "random": a new WOD on every request. "deterministic": the WOD is a pure
+# function of (user, day, catalog version), so it can be cached and replayed.
+WOD_MODES = ("random", "deterministic")
+WOD_MODE = os.environ.get("WOD_MODE", "random")
+
 def heavy_computation(duration_seconds: int = 3):
     """
     Perform CPU-intensive calculations to simulate heavy processing.
@@ -26,17 +42,73 @@ def calculate_intensity(difficulty: int) -> float:
     # Convert difficulty (1-5) to intensity (0.0-1.0)
     return (difficulty - 1) / 4.0
 
+def muscle_group_intensity(difficulty: int, is_primary: bool) -> float:
+    """
+    Intensity of an exercise on one of its muscle groups: primary muscle
+    groups take more of the load than secondary ones.
+    """
+    if 0 <= difficulty <= MAX_DIFFICULTY:
+        return INTENSITY_TABLE[difficulty][is_primary]
+    return calculate_intensity(difficulty) * (PRIMARY_INTENSITY_FACTOR if is_primary else SECONDARY_INTENSITY_FACTOR)
+
+# Muscle group intensities for every difficulty, computed once:
+# INTENSITY_TABLE[difficulty][is_primary]
+INTENSITY_TABLE = tuple(
+    (calculate_intensity(difficulty) * SECONDARY_INTENSITY_FACTOR, calculate_intensity(difficulty) * PRIMARY_INTENSITY_FACTOR)
+    for difficulty in range(MAX_DIFFICULTY + 1)
+)
+
+
+def wod_seed(user_email: str, day: date, catalog_version: str) -> int:
+    digest = hashlib.sha256(f"{user_email}|{day.isoformat()}|{catalog_version}".encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def wod_rng(user_email: str, day: Optional[date] = None, catalog_version: Optional[str] = None, mode: Optional[str] = None) -> random.Random:
+    """
+    Random generator driving every random choice of a WOD: seeded from the
+    user, day and catalog version in deterministic mode, unseeded otherwise
+    """
+    mode = mode or WOD_MODE
+    if mode not in WOD_MODES:
+        raise ValueError(f"Unknown WOD mode '{mode}', expected one of {', '.join(WOD_MODES)}")
+    if mode == "random":
+        return random.Random()
+    return random.Random(wod_seed(user_email, day or date.today(), catalog_version or get_catalog().version))
+
 
-def request_wod(user_email: str) -> List[Tuple[ExerciseModel, List[Tuple[MuscleGroupModel, bool]]]]:
+def suggest_load(rng: random.Random) -> Tuple[float, int]:
+    """
+    Suggested (weight, reps) for a WOD exercise
+    """
+    return rng.uniform(5.0, 50.0), rng.randint(8, 15)
+
+
+def request_wod(
+    user_email: str,
+    available_equipment: Optional[List[str]] = None,
+    rng: Optional[random.Random] = None
+) -> List[Tuple[Exercise, List[Tuple[MuscleGroupWithPrimary, bool]]]]:
     """
     Request a workout of the day (WOD) for a specific user.
-    Avoid repeating exercises from the previous day.
+    Avoid repeating exercises from the previous day and, when the user's
+    available equipment is given, only pick exercises they can do with it.
+    Among the remaining candidates, prefer exercises for muscle groups the
+    user has not loaded over the last week. `rng` makes the selection
+    reproducible; by default it follows WOD_MODE (see `wod_rng`).
     Returns a list of tuples:
-    - ExerciseModel instance
-    - List of tuples: (MuscleGroupModel, is_primary)
+    - Exercise from the catalog
+    - List of tuples: (MuscleGroupWithPrimary, is_primary)
     """
     heavy_computation(random.randint(1, 5)) # DO NOT REMOVE THIS LINE
 
+    catalog = get_catalog()
+    equipment_index = catalog.equipment_index
+    if available_equipment is None:
+        candidate_ids = equipment_index.candidate_ids(ALL_EQUIPMENT)
+    else:
+        candidate_ids = equipment_index.candidate_ids(equipment_index.mask_for(available_equipment))
+
     db = db_session()
     try:
         # calculate yesterday date range (00:00 to 23:59:59)
@@ -51,40 +123,36 @@ def request_wod(user_email: str) -> List[Tuple[ExerciseModel, List[Tuple[MuscleG
             ExerciseHistoryModel.performed_at >= yesterday_start,
             ExerciseHistoryModel.performed_at <= yesterday_end
         ).distinct().all()
+    finally:
+        db.close()
 
-        yesterday_exercise_ids = [eid for (eid,) in yesterday_exercise_ids]
+    yesterday_exercise_ids = {eid for (eid,) in yesterday_exercise_ids}
 
-        # get all exercises excluding those from yesterday
-        if yesterday_exercise_ids:
-            exercises = db.query(ExerciseModel).filter(~ExerciseModel.id.in_(yesterday_exercise_ids)).all()
-        else:
-            exercises = db.query(ExerciseModel).all()
+    # candidates excluding those from yesterday
+    exercise_ids = [eid for eid in candidate_ids if eid not in yesterday_exercise_ids]
 
-        # if not enough exercises remain, fallback to all exercises
-        if len(exercises) < 6:
-            exercises = db.query(ExerciseModel).all()
+    # if not enough exercises remain, fallback to all exercises the equipment allows
+    if len(exercise_ids) < WOD_SIZE:
+        exercise_ids = list(candidate_ids)
 
-        selected_exercises = random.sample(exercises, 6) if len(exercises) >= 6 else exercises
+    if rng is None:
+        rng = wod_rng(user_email, today, catalog.version)
+    from .wod_selector import fatigue_store, select_exercises
+    fatigue = fatigue_store.get(user_email, catalog.incidence, catalog.version)
+    selected_ids = select_exercises(catalog.incidence, exercise_ids, fatigue, WOD_SIZE, rng)
 
-        result = []
-        for exercise in selected_exercises:
-            stmt = db.query(
-                MuscleGroupModel,
-                exercise_muscle_groups.c.is_primary
-            ).join(
-                exercise_muscle_groups,
-                MuscleGroupModel.id == exercise_muscle_groups.c.muscle_group_id
-            ).filter(
-                exercise_muscle_groups.c.exercise_id == exercise.id
-            )
-            muscle_groups = stmt.all()
+    result = []
+    for exercise_id in selected_ids:
+        exercise = catalog.exercises_by_id[exercise_id]
+        result.append((exercise, [(mg, mg.is_primary) for mg in exercise.muscle_groups]))
 
-            if not muscle_groups:
-                print(f"Skipping exercise {exercise.id} - no muscle groups found")
-                continue
+    return result
 
-            result.append((exercise, muscle_groups))
 
-        return result
-    finally:
-        db.close()
+def record_exercise_performed(user_email: str, exercise_id: int, performed_at: datetime):
+    """
+    Fold a newly logged exercise into the user's fatigue vector
+    """
+    from .wod_selector import fatigue_store
+    catalog = get_catalog()
+    fatigue_store.record(user_email, exercise_id, performed_at, catalog.incidence, catalog.version)
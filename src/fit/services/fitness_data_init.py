@@ -1,7 +1,7 @@
 import os
-import psycopg2
 from sqlalchemy import text
-from ..database import engine
+from ..database import get_engine
+from .catalog_service import invalidate_catalog
 
 def init_fitness_data():
     """
@@ -18,10 +18,13 @@ def init_fitness_data():
             sql_script = file.read()
         
         # Execute the SQL script using SQLAlchemy
-        with engine.connect() as connection:
+        with get_engine().connect() as connection:
             connection.execute(text(sql_script))
             connection.commit()
         
+        # The catalog cache is rebuilt from the fresh data on next use
+        invalidate_catalog()
+        
         print("Fitness data initialized successfully!")
         return True
     except Exception as e:
@@ -1,207 +1,45 @@
 from ..database import db_session
-from ..models_db import MuscleGroupModel, ExerciseModel, exercise_muscle_groups, ExerciseHistoryModel
-from ..models_dto import MuscleGroup, Exercise, MuscleGroupWithPrimary, ExerciseHistoryResponseSchema
+from ..models_db import ExerciseModel, ExerciseHistoryModel
+from ..models_dto import ExerciseHistoryCreateSchema, ExerciseHistoryResponseSchema
+from .catalog_service import get_catalog
+from .fitness_coach_service import record_exercise_performed
+from .training_load_service import record_history_load
+from .wod_cache import history_logged
+from typing import List
 from sqlalchemy import select, join, and_
 from datetime import datetime, timedelta
 
 def get_all_muscle_groups():
     """
-    Get all muscle groups from the database
+    Get all muscle groups from the catalog cache
     """
-    db = db_session()
-    try:
-        muscle_groups = db.query(MuscleGroupModel).all()
-        return [MuscleGroup.model_validate(
-            {
-                "id": mg.id,
-                "name": mg.name,
-                "body_part": mg.body_part,
-                "description": mg.description
-            }
-        ) for mg in muscle_groups]
-    finally:
-        db.close()
+    return list(get_catalog().muscle_groups)
 
 def get_muscle_group_by_id(muscle_group_id: int):
     """
-    Get a specific muscle group by ID
+    Get a specific muscle group by ID from the catalog cache
     """
-    db = db_session()
-    try:
-        muscle_group = db.query(MuscleGroupModel).filter(MuscleGroupModel.id == muscle_group_id).first()
-        if not muscle_group:
-            return None
-        
-        return MuscleGroup.model_validate(
-            {
-                "id": muscle_group.id,
-                "name": muscle_group.name,
-                "body_part": muscle_group.body_part,
-                "description": muscle_group.description
-            }
-        )
-    finally:
-        db.close()
+    return get_catalog().muscle_groups_by_id.get(muscle_group_id)
 
 def get_all_exercises():
     """
-    Get all exercises with their associated muscle groups
+    Get all exercises with their associated muscle groups from the catalog cache
     """
-    db = db_session()
-    try:
-        exercises = db.query(ExerciseModel).all()
-        
-        result = []
-        for exercise in exercises:
-            # Get muscle groups with primary information for this exercise
-            muscle_groups_data = db.query(
-                MuscleGroupModel, 
-                exercise_muscle_groups.c.is_primary
-            ).join(
-                exercise_muscle_groups, 
-                MuscleGroupModel.id == exercise_muscle_groups.c.muscle_group_id
-            ).filter(
-                exercise_muscle_groups.c.exercise_id == exercise.id
-            ).all()
-            
-            # Convert to DTO format
-            muscle_groups = [
-                MuscleGroupWithPrimary.model_validate(
-                    {
-                        "id": mg[0].id,
-                        "name": mg[0].name,
-                        "body_part": mg[0].body_part,
-                        "description": mg[0].description,
-                        "is_primary": mg[1]
-                    }
-                ) for mg in muscle_groups_data
-            ]
-            
-            # Create exercise DTO
-            exercise_dto = Exercise.model_validate(
-                {
-                    "id": exercise.id,
-                    "name": exercise.name,
-                    "description": exercise.description,
-                    "difficulty": exercise.difficulty,
-                    "equipment": exercise.equipment,
-                    "instructions": exercise.instructions,
-                    "muscle_groups": muscle_groups
-                }
-            )
-            
-            result.append(exercise_dto)
-            
-        return result
-    finally:
-        db.close()
+    return list(get_catalog().exercises)
 
 def get_exercise_by_id(exercise_id: int):
     """
-    Get a specific exercise by ID with its associated muscle groups
+    Get a specific exercise by ID with its associated muscle groups from the
+    catalog cache
     """
-    db = db_session()
-    try:
-        exercise = db.query(ExerciseModel).filter(ExerciseModel.id == exercise_id).first()
-        if not exercise:
-            return None
-        
-        # Get muscle groups with primary information for this exercise
-        muscle_groups_data = db.query(
-            MuscleGroupModel, 
-            exercise_muscle_groups.c.is_primary
-        ).join(
-            exercise_muscle_groups, 
-            MuscleGroupModel.id == exercise_muscle_groups.c.muscle_group_id
-        ).filter(
-            exercise_muscle_groups.c.exercise_id == exercise.id
-        ).all()
-        
-        # Convert to DTO format
-        muscle_groups = [
-            MuscleGroupWithPrimary.model_validate(
-                {
-                    "id": mg[0].id,
-                    "name": mg[0].name,
-                    "body_part": mg[0].body_part,
-                    "description": mg[0].description,
-                    "is_primary": mg[1]
-                }
-            ) for mg in muscle_groups_data
-        ]
-        
-        # Create exercise DTO
-        return Exercise.model_validate(
-            {
-                "id": exercise.id,
-                "name": exercise.name,
-                "description": exercise.description,
-                "difficulty": exercise.difficulty,
-                "equipment": exercise.equipment,
-                "instructions": exercise.instructions,
-                "muscle_groups": muscle_groups
-            }
-        )
-    finally:
-        db.close()
+    return get_catalog().exercises_by_id.get(exercise_id)
 
 def get_exercises_by_muscle_group(muscle_group_id: int):
     """
-    Get all exercises that target a specific muscle group
+    Get all exercises that target a specific muscle group, using the
+    catalog's muscle group -> exercises index
     """
-    db = db_session()
-    try:
-        exercises = db.query(ExerciseModel).join(
-            exercise_muscle_groups,
-            ExerciseModel.id == exercise_muscle_groups.c.exercise_id
-        ).filter(
-            exercise_muscle_groups.c.muscle_group_id == muscle_group_id
-        ).all()
-        
-        result = []
-        for exercise in exercises:
-            # Get all muscle groups for this exercise
-            muscle_groups_data = db.query(
-                MuscleGroupModel, 
-                exercise_muscle_groups.c.is_primary
-            ).join(
-                exercise_muscle_groups, 
-                MuscleGroupModel.id == exercise_muscle_groups.c.muscle_group_id
-            ).filter(
-                exercise_muscle_groups.c.exercise_id == exercise.id
-            ).all()
-            
-            # Convert to DTO format
-            muscle_groups = [
-                MuscleGroupWithPrimary.model_validate(
-                    {
-                        "id": mg[0].id,
-                        "name": mg[0].name,
-                        "body_part": mg[0].body_part,
-                        "description": mg[0].description,
-                        "is_primary": mg[1]
-                    }
-                ) for mg in muscle_groups_data
-            ]
-            
-            # Create exercise DTO
-            exercise_dto = Exercise.model_validate(
-                {
-                    "id": exercise.id,
-                    "name": exercise.name,
-                    "description": exercise.description,
-                    "difficulty": exercise.difficulty,
-                    "equipment": exercise.equipment,
-                    "instructions": exercise.instructions,
-                    "muscle_groups": muscle_groups
-                }
-            )
-            
-            result.append(exercise_dto)
-            
-        return result
-    finally:
-        db.close() 
+    return list(get_catalog().exercises_for_muscle_group(muscle_group_id))
         
 def get_exercises_performed_yesterday(user_email:str):
     db = db_session()
@@ -236,3 +74,46 @@ def get_exercises_performed(user_email:str):
         return exercises
     finally:
         db.close()
+
+def add_exercise_history_batch(user_email: str, entries: List[ExerciseHistoryCreateSchema]) -> List[ExerciseHistoryResponseSchema]:
+    """
+    Log performed exercises for a user. The history rows and the
+    user_daily_load aggregates are written in the same transaction.
+    """
+    # Load the catalog first: db_session is scoped per thread, so loading it
+    # inside the transaction below would close our session
+    catalog = get_catalog()
+    db = db_session()
+    try:
+        new_rows = [
+            ExerciseHistoryModel(
+                user_email=user_email,
+                exercise_id=entry.exercise_id,
+                performed_at=entry.performed_at or datetime.now(),
+                duration_minutes=entry.duration_minutes,
+                reps=entry.reps
+            )
+            for entry in entries
+        ]
+        db.add_all(new_rows)
+        db.flush()
+        record_history_load(db, new_rows, catalog)
+        db.commit()
+
+        result = [ExerciseHistoryResponseSchema.model_validate(row, from_attributes=True) for row in new_rows]
+    except Exception as e:
+        db.rollback()
+        raise e
+    finally:
+        db.close()
+
+    for row in result:
+        record_exercise_performed(user_email, row.exercise_id, row.performed_at)
+    history_logged(user_email, [row.performed_at for row in result])
+    return result
+
+def add_exercise_history(user_email: str, entry: ExerciseHistoryCreateSchema) -> ExerciseHistoryResponseSchema:
+    """
+    Log a single performed exercise for a user
+    """
+    return add_exercise_history_batch(user_email, [entry])[0]
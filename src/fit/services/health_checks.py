@@ -0,0 +1,85 @@
+"""
+Readiness checks run in the background, so probes never wait on a dependency.
+
+This module has no dependency outside the standard library: the user and
+coach microservices vendor it (src/user_microservice/services/,
+src/coach_microservice/services/), so any change must be made to every copy.
+tests/test_health.py checks that the copies are identical.
+"""
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+HEALTH_CHECK_INTERVAL = float(os.environ.get("HEALTH_CHECK_INTERVAL", "5"))
+
+Check = Callable[[], Dict[str, object]]
+
+
+class HealthMonitor:
+    """
+    Runs the readiness checks in a daemon thread every `interval` seconds and
+    keeps the last results. Each check returns a dict with a "status"; a
+    check that raises is DOWN. The service is ready when all are "UP".
+    """
+
+    def __init__(self, checks: Dict[str, Check], interval: float = HEALTH_CHECK_INTERVAL):
+        self.checks = checks
+        self.interval = interval
+        self.results: Optional[Dict[str, Dict[str, object]]] = None
+        self.checked_at = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        results = {}
+        for name, check in self.checks.items():
+            try:
+                results[name] = check()
+            except Exception as e:
+                results[name] = {"status": "DOWN", "error": str(e)}
+        with self._lock:
+            self.results, self.checked_at = results, time.monotonic()
+
+    def start(self):
+        """
+        Run the checks now and every `interval` seconds in a background
+        thread; returns at once
+        """
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="health-monitor", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Health checks failed: {e}")
+            time.sleep(self.interval)
+
+    def last_results(self) -> Tuple[Optional[Dict[str, Dict[str, object]]], float]:
+        """
+        Last results, None until the first checks complete, and their age in seconds
+        """
+        with self._lock:
+            return self.results, time.monotonic() - self.checked_at
+
+    def readiness(self) -> Tuple[Dict[str, object], int]:
+        """
+        Readiness document and HTTP status: 200 when UP, 503 otherwise
+        (STARTING, STALE or DOWN). Never runs the checks.
+        """
+        results, age = self.last_results()
+        if results is None:
+            return {"status": "STARTING"}, 503
+        if age > 3 * self.interval:
+            # The monitor thread stopped refreshing
+            status = "STALE"
+        elif all(result["status"] == "UP" for result in results.values()):
+            status = "UP"
+        else:
+            status = "DOWN"
+        return {"status": status, "checks": results, "checked_seconds_ago": round(age, 1)}, 200 if status == "UP" else 503
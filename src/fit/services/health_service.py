@@ -0,0 +1,104 @@
+"""
+Liveness and readiness of an app replica.
+
+/health/live only tells that the process answers. /health/ready tells
+whether the replica should receive traffic, for nginx and docker to drain
+replicas that cannot serve: the database is unreachable, the catalog cache
+is cold, or an admission pool is close to shedding requests. The database
+and catalog checks run in a background thread every `HEALTH_CHECK_INTERVAL`
+seconds (`health_checks.HealthMonitor`, shared with the microservices),
+started by the app (see `create_app` and `run_app`), so probes only read the
+last results and never add database load or latency; until the first checks
+complete the replica reports STARTING. Pool utilization is read live since
+it is in memory.
+"""
+import os
+import time
+from typing import Dict, Tuple
+from sqlalchemy import text
+from ..database import db_session, get_engine
+from . import health_checks
+from .admission_service import limiters, wod_limiter
+from .catalog_service import loaded_catalog
+from .health_checks import HEALTH_CHECK_INTERVAL
+
+# Pool utilization (active and queued requests over capacity) from which
+# the replica reports itself saturated
+HEALTH_SATURATION_THRESHOLD = float(os.environ.get("HEALTH_SATURATION_THRESHOLD", "0.9"))
+
+
+def check_database() -> Dict[str, object]:
+    db = db_session()
+    start = time.perf_counter()
+    try:
+        db.execute(text("SELECT 1"))
+        result = {"status": "UP", "latency_ms": round((time.perf_counter() - start) * 1000, 2)}
+    except Exception as e:
+        return {"status": "DOWN", "error": str(e)}
+    finally:
+        db.close()
+    pool = get_engine().pool
+    # Connection counts of the pool, when it keeps any (QueuePool)
+    if hasattr(pool, "checkedout"):
+        result["pool"] = {"size": pool.size(), "checked_out": pool.checkedout(), "overflow": pool.overflow()}
+    return result
+
+
+def check_catalog() -> Dict[str, object]:
+    catalog = loaded_catalog()
+    if catalog is None:
+        return {"status": "COLD"}
+    return {"status": "WARM", "version": catalog.version, "exercises": len(catalog.exercises)}
+
+
+def check_saturation() -> Dict[str, Dict[str, object]]:
+    pools = {}
+    for name, limiter in limiters.items():
+        utilization = limiter.utilization()
+        pools[name] = {
+            "utilization": round(utilization, 3),
+            "saturated": utilization >= HEALTH_SATURATION_THRESHOLD,
+        }
+    return pools
+
+
+class HealthMonitor(health_checks.HealthMonitor):
+    """
+    Database and catalog checks in the background (see health_checks); the
+    readiness document adds the admission pools, read live
+    """
+
+    def __init__(self, interval: float = HEALTH_CHECK_INTERVAL):
+        super().__init__({"database": check_database, "catalog": check_catalog}, interval)
+
+    def readiness(self) -> Tuple[Dict[str, object], int]:
+        """
+        Readiness document and HTTP status: 200 when UP, 503 otherwise
+        (STARTING, DOWN, STALE, COLD or SATURATED). Never runs the checks.
+        """
+        checks, age = self.last_results()
+        pools = check_saturation()
+        wod = wod_limiter.stats()
+        report = {
+            "checks": dict(checks or {}, pools=pools),
+            "wod_backlog": {"active": wod["active"], "waiting": wod["waiting"]},
+        }
+        if checks is None:
+            status = "STARTING"
+        elif age > 3 * self.interval:
+            # The monitor thread stopped refreshing
+            status = "STALE"
+        elif checks["database"]["status"] != "UP":
+            status = "DOWN"
+        elif checks["catalog"]["status"] != "WARM":
+            status = "COLD"
+        elif any(pool["saturated"] for pool in pools.values()):
+            status = "SATURATED"
+        else:
+            status = "UP"
+        if checks is not None:
+            report["checked_seconds_ago"] = round(age, 1)
+        return {"status": status, **report}, 200 if status == "UP" else 503
+
+
+health_monitor = HealthMonitor()
@@ -0,0 +1,214 @@
+"""
+Schema migrations.
+
+Versioned scripts in `src/fit/migrations`, named `<version>_<name>.sql` or
+`<version>_<name>.py`, are applied in version order, once per database, and
+recorded in the `schema_version` table. They run once per deploy (the compose
+`migrate` service) rather than in every worker at start.
+
+SQL scripts run statement by statement in one transaction. On PostgreSQL the
+transaction sets a short `lock_timeout`, so a DDL statement queued behind a
+long query fails instead of blocking every query on a hot table. Scripts whose
+first line is `-- migrate: no-transaction` run in autocommit mode, which
+`CREATE INDEX CONCURRENTLY` requires. Python scripts define
+`upgrade(connection)` and may set `TRANSACTIONAL = False`;
+`create_index_online` builds an index without blocking writes.
+
+Migration 0001 is the frozen baseline schema; every later schema change is
+a migration of its own, not an edit of the models alone.
+
+    python -m src.fit.services.migration_service [--status]
+"""
+import argparse
+import importlib
+import importlib.util
+import os
+import re
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterator, List, Sequence
+from sqlalchemy import Column, DateTime, Float, Integer, MetaData, String, Table, select, text
+from sqlalchemy.engine import Connection, Engine
+from ..database import get_engine
+
+MIGRATIONS_PACKAGE = __package__.rsplit(".", 1)[0] + ".migrations"
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+MIGRATION_LOCK_TIMEOUT = os.environ.get("MIGRATION_LOCK_TIMEOUT", "5s")
+NO_TRANSACTION = "-- migrate: no-transaction"
+# PostgreSQL advisory lock held while migrating, so that two runners started
+# at the same time apply each migration once
+ADVISORY_LOCK_ID = 4242001
+
+MIGRATION_FILE = re.compile(r"^(\d+)_(\w+)\.(sql|py)$")
+
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String(200), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+    Column("duration_ms", Float, nullable=False),
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    path: str
+
+    @property
+    def is_sql(self) -> bool:
+        return self.path.endswith(".sql")
+
+    def module(self):
+        # Loaded as part of the migrations package, for relative imports
+        name = f"{MIGRATIONS_PACKAGE}.{os.path.basename(self.path)[:-3]}"
+        module = sys.modules.get(name)
+        if module is None or module.__file__ != self.path:
+            importlib.import_module(MIGRATIONS_PACKAGE)
+            spec = importlib.util.spec_from_file_location(name, self.path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            sys.modules[name] = module
+        return module
+
+    @property
+    def transactional(self) -> bool:
+        if self.is_sql:
+            with open(self.path) as file:
+                return file.readline().strip().lower() != NO_TRANSACTION
+        return getattr(self.module(), "TRANSACTIONAL", True)
+
+    def run(self, connection: Connection):
+        if self.is_sql:
+            with open(self.path) as file:
+                for statement in sql_statements(file.read()):
+                    connection.execute(text(statement))
+        else:
+            self.module().upgrade(connection)
+
+
+def discover_migrations(directory: str = MIGRATIONS_DIR) -> List[Migration]:
+    migrations = {}
+    for filename in os.listdir(directory):
+        match = MIGRATION_FILE.match(filename)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise ValueError(f"Duplicate migration version {version}: {filename} and {os.path.basename(migrations[version].path)}")
+        migrations[version] = Migration(version, match.group(2), os.path.join(directory, filename))
+    return [migrations[version] for version in sorted(migrations)]
+
+
+def sql_statements(sql: str) -> List[str]:
+    """
+    Statements of a script, split on the semicolons ending a line
+    """
+    lines = [line for line in sql.splitlines() if not line.strip().startswith("--")]
+    statements = re.split(r";\s*$", "\n".join(lines), flags=re.MULTILINE)
+    return [statement.strip() for statement in statements if statement.strip()]
+
+
+def create_index_online(connection: Connection, name: str, table: str, columns: Sequence[str]):
+    """
+    Create an index without blocking writes to `table` (CONCURRENTLY, needs
+    an autocommit connection) on PostgreSQL, with a plain CREATE INDEX elsewhere
+    """
+    if connection.dialect.name != "postgresql":
+        connection.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"))
+        return
+    # An interrupted concurrent build leaves an invalid index that IF NOT
+    # EXISTS would keep: drop it first
+    invalid = connection.execute(text(
+        "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid WHERE c.relname = :name AND NOT i.indisvalid"
+    ), {"name": name}).first()
+    if invalid:
+        connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    connection.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"))
+
+
+@contextmanager
+def _migration_lock(engine: Engine) -> Iterator[None]:
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": ADVISORY_LOCK_ID})
+        try:
+            yield
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": ADVISORY_LOCK_ID})
+
+
+def applied_versions(engine: Engine) -> set:
+    schema_version.create(engine, checkfirst=True)
+    with engine.connect() as connection:
+        return set(connection.execute(select(schema_version.c.version)).scalars())
+
+
+def _apply(engine: Engine, migration: Migration):
+    start = time.perf_counter()
+    if migration.transactional:
+        with engine.begin() as connection:
+            if engine.dialect.name == "postgresql":
+                connection.execute(text(f"SET LOCAL lock_timeout = '{MIGRATION_LOCK_TIMEOUT}'"))
+            migration.run(connection)
+            _record(connection, migration, start)
+    else:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            migration.run(connection)
+        with engine.begin() as connection:
+            _record(connection, migration, start)
+
+
+def _record(connection: Connection, migration: Migration, start: float):
+    connection.execute(schema_version.insert().values(
+        version=migration.version,
+        name=migration.name,
+        applied_at=datetime.now(),
+        duration_ms=round((time.perf_counter() - start) * 1000, 1)
+    ))
+
+
+def run_migrations(engine: Engine = None, directory: str = MIGRATIONS_DIR) -> List[Migration]:
+    """
+    Apply the pending migrations in order and return them. A failing
+    migration stops the run; it is not recorded and the next run retries it.
+    """
+    engine = engine or get_engine()
+    migrations = discover_migrations(directory)
+    applied = []
+    with _migration_lock(engine):
+        done = applied_versions(engine)
+        for migration in migrations:
+            if migration.version in done:
+                continue
+            print(f"Applying migration {migration.version:04d} {migration.name}")
+            _apply(engine, migration)
+            applied.append(migration)
+    print(f"Schema up to date ({len(applied)} migrations applied)")
+    return applied
+
+
+def migration_status(engine: Engine = None, directory: str = MIGRATIONS_DIR) -> List[dict]:
+    done = applied_versions(engine or get_engine())
+    return [
+        {"version": migration.version, "name": migration.name, "applied": migration.version in done}
+        for migration in discover_migrations(directory)
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply the pending schema migrations")
+    parser.add_argument("--status", action="store_true", help="list the migrations and whether they are applied")
+    args = parser.parse_args()
+    if args.status:
+        for migration in migration_status():
+            print(f"{migration['version']:04d} {migration['name']:<40} {'applied' if migration['applied'] else 'pending'}")
+    else:
+        run_migrations()
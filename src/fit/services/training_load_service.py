@@ -0,0 +1,408 @@
+"""
+Training load rollups: per user, day and muscle group (`user_daily_load`) and
+per user and day with activity streaks (`user_daily_summary`).
+
+Rows are updated incrementally in the same transaction as the exercise
+history they summarize, so readers scan O(days) aggregate rows instead of the
+user's whole history. `rebuild_user_daily_load` recomputes them from
+`exercise_history` in chunks, for backfills and repairs. Writers and rebuilds
+are serialized (`lock_rollups`), so a rebuild never misses nor double counts
+a concurrent write.
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import func, or_, select, text, update
+from ..database import db_session
+from ..models_db import ExerciseHistoryModel, UserDailyLoadModel, UserDailySummaryModel
+from ..models_dto import (
+    TrainingStatsSchema, TrainingTotalsSchema, MuscleGroupStatsSchema, StreakSchema
+)
+from .catalog_service import Catalog, get_catalog
+from .fitness_coach_service import calculate_intensity, muscle_group_intensity
+
+BACKFILL_CHUNK_SIZE = 5000
+# PostgreSQL advisory lock keys of the rollups: one for all users, and one per
+# user within this class
+ROLLUP_LOCK_ID = 4242002
+USER_ROLLUP_LOCK_CLASS = 4242
+STATS_PERIODS = ("week", "month")
+
+LoadKey = Tuple[str, date, int]
+SummaryKey = Tuple[str, date]
+
+
+@dataclass
+class LoadDelta:
+    exercise_count: int = 0
+    primary_count: int = 0
+    reps: int = 0
+    minutes: float = 0.0
+    volume: float = 0.0
+
+
+@dataclass
+class SummaryDelta:
+    exercise_count: int = 0
+    reps: int = 0
+    minutes: float = 0.0
+    volume: float = 0.0
+
+
+def compute_load_deltas(history_rows: Iterable[ExerciseHistoryModel], catalog: Catalog) -> Dict[LoadKey, LoadDelta]:
+    """
+    Aggregate history rows into per (user, day, muscle group) increments.
+    Intensity is applied here, at ingest, so readers only sum.
+    """
+    deltas: Dict[LoadKey, LoadDelta] = defaultdict(LoadDelta)
+    for row in history_rows:
+        exercise = catalog.exercises_by_id.get(row.exercise_id)
+        if exercise is None:
+            continue
+        reps = row.reps or 0
+        minutes = row.duration_minutes or 0.0
+        day = row.performed_at.date()
+        for mg in exercise.muscle_groups:
+            delta = deltas[(row.user_email, day, mg.id)]
+            delta.exercise_count += 1
+            delta.primary_count += 1 if mg.is_primary else 0
+            delta.reps += reps
+            delta.minutes += minutes
+            delta.volume += reps * muscle_group_intensity(exercise.difficulty, mg.is_primary)
+    return deltas
+
+
+def compute_summary_deltas(history_rows: Iterable[ExerciseHistoryModel], catalog: Catalog) -> Dict[SummaryKey, SummaryDelta]:
+    """
+    Aggregate history rows into per (user, day) increments
+    """
+    deltas: Dict[SummaryKey, SummaryDelta] = defaultdict(SummaryDelta)
+    for row in history_rows:
+        exercise = catalog.exercises_by_id.get(row.exercise_id)
+        reps = row.reps or 0
+        delta = deltas[(row.user_email, row.performed_at.date())]
+        delta.exercise_count += 1
+        delta.reps += reps
+        delta.minutes += row.duration_minutes or 0.0
+        if exercise is not None:
+            delta.volume += reps * calculate_intensity(exercise.difficulty)
+    return deltas
+
+
+def _insert(db, model):
+    # ON CONFLICT upserts are dialect specific; both production (PostgreSQL)
+    # and the test database (SQLite) support the same construct
+    if db.get_bind().dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert(model)
+
+
+def apply_load_deltas(db, deltas: Dict[LoadKey, LoadDelta]):
+    """
+    Add the increments to `user_daily_load` with one upsert statement.
+    The caller owns the transaction.
+    """
+    if not deltas:
+        return
+    stmt = _insert(db, UserDailyLoadModel)
+    table = UserDailyLoadModel.__table__
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_email, table.c.day, table.c.muscle_group_id],
+        set_={
+            "exercise_count": table.c.exercise_count + stmt.excluded.exercise_count,
+            "primary_count": table.c.primary_count + stmt.excluded.primary_count,
+            "reps": table.c.reps + stmt.excluded.reps,
+            "minutes": table.c.minutes + stmt.excluded.minutes,
+            "volume": table.c.volume + stmt.excluded.volume,
+        }
+    )
+    db.execute(stmt, [
+        {
+            "user_email": user_email,
+            "day": day,
+            "muscle_group_id": muscle_group_id,
+            "exercise_count": delta.exercise_count,
+            "primary_count": delta.primary_count,
+            "reps": delta.reps,
+            "minutes": delta.minutes,
+            "volume": delta.volume,
+        }
+        for (user_email, day, muscle_group_id), delta in deltas.items()
+    ])
+
+
+def apply_summary_deltas(db, deltas: Dict[SummaryKey, SummaryDelta]):
+    """
+    Add the increments to `user_daily_summary` with one upsert statement.
+    New rows start with a streak of 0 until `refresh_streaks` runs.
+    """
+    if not deltas:
+        return
+    stmt = _insert(db, UserDailySummaryModel)
+    table = UserDailySummaryModel.__table__
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_email, table.c.day],
+        set_={
+            "exercise_count": table.c.exercise_count + stmt.excluded.exercise_count,
+            "reps": table.c.reps + stmt.excluded.reps,
+            "minutes": table.c.minutes + stmt.excluded.minutes,
+            "volume": table.c.volume + stmt.excluded.volume,
+        }
+    )
+    db.execute(stmt, [
+        {
+            "user_email": user_email,
+            "day": day,
+            "exercise_count": delta.exercise_count,
+            "reps": delta.reps,
+            "minutes": delta.minutes,
+            "volume": delta.volume,
+            "streak": 0,
+        }
+        for (user_email, day), delta in deltas.items()
+    ])
+
+
+def refresh_streaks(db, user_email: str, day: date):
+    """
+    Compute the streak of `day`, a day that just became active, from the
+    previous day, then extend the run of consecutive active days after it.
+    That run started right after the gap `day` filled, so its streaks count
+    from 1 and each grows by the new streak: one UPDATE, whatever its length.
+    Logging today only touches today's row.
+    """
+    summary = UserDailySummaryModel.__table__
+    previous = db.query(UserDailySummaryModel.streak).filter(
+        UserDailySummaryModel.user_email == user_email,
+        UserDailySummaryModel.day == day - timedelta(days=1)
+    ).scalar() or 0
+    streak = previous + 1
+    db.execute(update(summary).where(
+        summary.c.user_email == user_email,
+        summary.c.day == day
+    ).values(streak=streak))
+
+    # The run ends before the next day starting a streak of its own
+    next_run = select(func.min(summary.c.day)).where(
+        summary.c.user_email == user_email,
+        summary.c.day > day + timedelta(days=1),
+        summary.c.streak == 1
+    ).scalar_subquery()
+    db.execute(update(summary).where(
+        summary.c.user_email == user_email,
+        summary.c.day > day,
+        or_(next_run.is_(None), summary.c.day < next_run)
+    ).values(streak=summary.c.streak + streak))
+
+
+def lock_rollups(db, user_email: Optional[str] = None, rebuild: bool = False):
+    """
+    Lock the rollups of `user_email` (of every user if None) until the end of
+    the transaction. Writers share the global key, so they only wait for full
+    rebuilds, and take the user key exclusively: the streaks and new days of a
+    user are read then written, so two writes for the same user run one after
+    the other. A rebuild takes its key exclusively, after the writers in
+    flight have committed. On SQLite, which has a single writer, the first
+    write of a transaction serializes it with the others.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    if user_email is None:
+        db.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": ROLLUP_LOCK_ID})
+    else:
+        if not rebuild:
+            db.execute(text("SELECT pg_advisory_xact_lock_shared(:id)"), {"id": ROLLUP_LOCK_ID})
+        db.execute(text("SELECT pg_advisory_xact_lock(:class_id, hashtext(:user_email))"), {"class_id": USER_ROLLUP_LOCK_CLASS, "user_email": user_email})
+
+
+def record_history_load(db, history_rows: Iterable[ExerciseHistoryModel], catalog: Catalog):
+    """
+    Update the rollups for freshly inserted history rows, inside the
+    caller's transaction
+    """
+    history_rows = list(history_rows)
+    for user_email in sorted({row.user_email for row in history_rows}):
+        lock_rollups(db, user_email)
+    apply_load_deltas(db, compute_load_deltas(history_rows, catalog))
+
+    summary_deltas = compute_summary_deltas(history_rows, catalog)
+    apply_summary_deltas(db, summary_deltas)
+    # Only days that just became active (streak still 0) change any streak.
+    # They are found before refreshing, as a refresh also adds to the later
+    # new days it runs over; their own refresh, in day order, sets them.
+    new_days = [
+        (user_email, day) for user_email, day in sorted(summary_deltas, key=lambda key: key[1])
+        if db.query(UserDailySummaryModel.streak).filter(
+            UserDailySummaryModel.user_email == user_email,
+            UserDailySummaryModel.day == day
+        ).scalar() == 0
+    ]
+    for user_email, day in new_days:
+        refresh_streaks(db, user_email, day)
+
+
+def _rebuild_streaks(db, user_email: Optional[str], chunk_size: int = BACKFILL_CHUNK_SIZE):
+    query = db.query(UserDailySummaryModel.user_email, UserDailySummaryModel.day)
+    if user_email is not None:
+        query = query.filter(UserDailySummaryModel.user_email == user_email)
+
+    batch = []
+    previous_user, previous_day, streak = None, None, 0
+    for row_user, row_day in query.order_by(UserDailySummaryModel.user_email, UserDailySummaryModel.day).yield_per(chunk_size):
+        if row_user == previous_user and row_day - previous_day == timedelta(days=1):
+            streak += 1
+        else:
+            streak = 1
+        previous_user, previous_day = row_user, row_day
+        batch.append({"user_email": row_user, "day": row_day, "streak": streak})
+        if len(batch) >= chunk_size:
+            db.execute(update(UserDailySummaryModel), batch)
+            batch = []
+    if batch:
+        db.execute(update(UserDailySummaryModel), batch)
+
+
+def rebuild_user_daily_load(user_email: Optional[str] = None, chunk_size: int = BACKFILL_CHUNK_SIZE) -> int:
+    """
+    Recompute `user_daily_load` and `user_daily_summary` from
+    `exercise_history`, for everyone or a single user, walking the history by
+    id in chunks of `chunk_size` rows. The delete, the high-water mark and the
+    replay are one transaction under the rollup lock: history writes wait for
+    the rebuild, readers see the old rollups until it commits.
+    Returns the number of history rows processed.
+    """
+    catalog = get_catalog()
+    db = db_session()
+    try:
+        history_filter = []
+        load_query = db.query(UserDailyLoadModel)
+        summary_query = db.query(UserDailySummaryModel)
+        if user_email is not None:
+            history_filter.append(ExerciseHistoryModel.user_email == user_email)
+            load_query = load_query.filter(UserDailyLoadModel.user_email == user_email)
+            summary_query = summary_query.filter(UserDailySummaryModel.user_email == user_email)
+
+        lock_rollups(db, user_email, rebuild=True)
+        load_query.delete(synchronize_session=False)
+        summary_query.delete(synchronize_session=False)
+        # Read after the lock: every history row committed before it is
+        # replayed, every later one waits and goes through the incremental path
+        high_water_mark = db.query(func.max(ExerciseHistoryModel.id)).filter(*history_filter).scalar() or 0
+
+        processed = 0
+        last_id = 0
+        while last_id < high_water_mark:
+            rows = db.query(ExerciseHistoryModel).filter(
+                *history_filter,
+                ExerciseHistoryModel.id > last_id,
+                ExerciseHistoryModel.id <= high_water_mark
+            ).order_by(ExerciseHistoryModel.id).limit(chunk_size).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            processed += len(rows)
+            apply_load_deltas(db, compute_load_deltas(rows, catalog))
+            apply_summary_deltas(db, compute_summary_deltas(rows, catalog))
+            db.flush()
+            db.expunge_all()
+
+        _rebuild_streaks(db, user_email, chunk_size)
+        db.commit()
+        return processed
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def period_bounds(period: str, today: date) -> Tuple[date, date]:
+    """
+    First and last day of the current calendar week (from Monday) or month
+    """
+    if period == "week":
+        return today - timedelta(days=today.weekday()), today
+    if period == "month":
+        return today.replace(day=1), today
+    raise ValueError(f"Unknown period '{period}', expected one of {', '.join(STATS_PERIODS)}")
+
+
+def get_training_stats(user_email: str, period: str, today: Optional[date] = None) -> TrainingStatsSchema:
+    """
+    Training summary for the current week or month, read from the rollups:
+    at most one row per day and per day x muscle group.
+    """
+    today = today or date.today()
+    start, end = period_bounds(period, today)
+    catalog = get_catalog()
+
+    db = db_session()
+    try:
+        muscle_group_rows = db.query(
+            UserDailyLoadModel.muscle_group_id,
+            func.sum(UserDailyLoadModel.exercise_count),
+            func.sum(UserDailyLoadModel.reps),
+            func.sum(UserDailyLoadModel.minutes),
+            func.sum(UserDailyLoadModel.volume)
+        ).filter(
+            UserDailyLoadModel.user_email == user_email,
+            UserDailyLoadModel.day >= start,
+            UserDailyLoadModel.day <= end
+        ).group_by(UserDailyLoadModel.muscle_group_id).all()
+
+        summary_rows = db.query(UserDailySummaryModel).filter(
+            UserDailySummaryModel.user_email == user_email,
+            UserDailySummaryModel.day >= min(start, today - timedelta(days=1)),
+            UserDailySummaryModel.day <= end
+        ).all()
+    finally:
+        db.close()
+
+    totals = TrainingTotalsSchema()
+    longest = 0
+    streak_by_day = {}
+    for row in summary_rows:
+        streak_by_day[row.day] = row.streak
+        if row.day < start:
+            continue
+        totals.exercise_count += row.exercise_count
+        totals.reps += row.reps
+        totals.minutes += row.minutes
+        totals.volume += row.volume
+        totals.active_days += 1
+        longest = max(longest, row.streak)
+    # A streak is still current until a full day is missed
+    current = streak_by_day.get(today) or streak_by_day.get(today - timedelta(days=1), 0)
+
+    muscle_groups = []
+    for muscle_group_id, exercise_count, reps, minutes, volume in muscle_group_rows:
+        mg = catalog.muscle_groups_by_id.get(muscle_group_id)
+        if mg is None:
+            continue
+        muscle_groups.append(MuscleGroupStatsSchema(
+            id=mg.id,
+            name=mg.name,
+            body_part=mg.body_part,
+            exercise_count=exercise_count,
+            reps=reps,
+            minutes=minutes,
+            volume=volume
+        ))
+    muscle_groups.sort(key=lambda stats: stats.volume, reverse=True)
+
+    return TrainingStatsSchema(
+        period=period,
+        start=start,
+        end=end,
+        totals=totals,
+        muscle_groups=muscle_groups,
+        streaks=StreakSchema(current=current, longest=longest)
+    )
+
+
+if __name__ == "__main__":
+    # This allows the backfill to be run directly
+    print(f"Rebuilt training load rollups from {rebuild_user_daily_load()} exercise history rows")
@@ -0,0 +1,113 @@
+"""
+Warm-up of a worker before it takes traffic.
+
+Without it the first requests after a deploy pay for opening database
+connections, configuring the SQLAlchemy mappers, loading the catalog (and
+numpy), rendering the WOD fragments and the first validation and
+serialization of each response DTO. `warm_up` runs these steps once, after
+the migrations, and reports how long each took. `WARMUP_STEPS` selects the steps
+(comma separated, in order; empty disables the warm-up).
+"""
+import os
+import time
+from contextlib import ExitStack
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import configure_mappers
+from .. import models_dto
+from ..database import get_engine
+from .catalog_service import get_catalog
+
+WARMUP_STEPS = os.environ.get("WARMUP_STEPS", "connections,mappers,catalog,serializers")
+# Connections opened at once; defaults to the pool size
+WARMUP_CONNECTIONS = int(os.environ.get("WARMUP_CONNECTIONS", "0"))
+
+
+def warm_connections():
+    pool = get_engine().pool
+    count = WARMUP_CONNECTIONS or (pool.size() if hasattr(pool, "size") else 1)
+    # Held together so the pool keeps `count` distinct connections open
+    with ExitStack() as stack:
+        for _ in range(count):
+            connection = stack.enter_context(get_engine().connect())
+            connection.execute(text("SELECT 1"))
+
+
+def warm_mappers():
+    configure_mappers()
+
+
+def warm_catalog():
+    # Also builds the search, equipment and incidence indexes and the
+    # serialized catalog payloads
+    get_catalog()
+
+
+def warm_serializers():
+    from .wod_response import get_wod_renderer
+    catalog = get_catalog()
+    renderer = get_wod_renderer()
+    for exercise in catalog.exercises:
+        if exercise.muscle_groups:
+            renderer.fragment(exercise)
+
+    # Validate and dump one instance of each response DTO built per request,
+    # down to its nested models, so first-call costs are not paid by a user
+    now = datetime.now()
+    samples = [
+        models_dto.WodResponseSchema(exercises=[models_dto.WodExerciseSchema(
+            id=1, name="", description="", difficulty=1,
+            muscle_groups=[models_dto.MuscleGroupImpact(id=1, name="", body_part="", is_primary=True, intensity=0.0)]
+        )], generated_at=now),
+        models_dto.ExerciseHistoryResponseSchema(
+            id=1, user_email="", exercise_id=1, performed_at=now, duration_minutes=1.0, reps=1
+        ),
+        models_dto.TrainingStatsSchema(
+            period="week", start=now.date(), end=now.date(), totals=models_dto.TrainingTotalsSchema(),
+            muscle_groups=[models_dto.MuscleGroupStatsSchema(id=1, name="", body_part="", exercise_count=1, reps=1, minutes=1.0, volume=1.0)],
+            streaks=models_dto.StreakSchema()
+        ),
+        models_dto.User(email="warm.up@example.com", name="", role="user"),
+    ]
+    if catalog.muscle_groups:
+        # The catalog models, from the catalog itself
+        muscle_group = catalog.muscle_groups[0]
+        samples.append(models_dto.MuscleGroupWithExercises(
+            **muscle_group.model_dump(), exercises=list(catalog.exercises_for_muscle_group(muscle_group.id))
+        ))
+    for sample in samples:
+        sample.model_dump_json()
+        sample.model_dump()
+
+
+STEPS: Dict[str, Callable[[], None]] = {
+    "connections": warm_connections,
+    "mappers": warm_mappers,
+    "catalog": warm_catalog,
+    "serializers": warm_serializers,
+}
+
+last_warmup: Optional[Dict[str, float]] = None
+
+
+def warm_up(steps: Optional[Iterable[str]] = None) -> Dict[str, float]:
+    """
+    Run the warm-up steps and return their durations in milliseconds,
+    with the total under "total_ms"
+    """
+    global last_warmup
+    if steps is None:
+        steps = [step.strip() for step in WARMUP_STEPS.split(",") if step.strip()]
+    report = {}
+    start = time.perf_counter()
+    for step in steps:
+        if step not in STEPS:
+            raise ValueError(f"Unknown warm-up step: {step}")
+        step_start = time.perf_counter()
+        STEPS[step]()
+        report[f"{step}_ms"] = round((time.perf_counter() - step_start) * 1000, 1)
+    report["total_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    last_warmup = report
+    print(f"Warm-up done in {report['total_ms']} ms: " + ", ".join(f"{step} {ms} ms" for step, ms in report.items() if step != "total_ms"))
+    return report
@@ -0,0 +1,199 @@
+"""
+Per user and day memoization of rendered WOD responses.
+
+Generating a WOD is expensive (`heavy_computation` alone takes seconds), and
+users refresh the WOD screen repeatedly. Responses are cached by user, day,
+catalog version, equipment set and history version, in an LRU bounded by the
+bytes it holds. Concurrent requests for the same key share a single in-flight
+generation.
+
+The history version is the latest id among the user's exercises of
+yesterday (the exclusion set of today's WOD), read from the database with one
+index lookup per request. History logged through any worker or replica
+changes it, so no process keeps serving a WOD computed before. Entries of
+older versions age out of the LRU; the worker that logged the history drops
+them at once.
+"""
+import os
+import sys
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Dict, Iterable, Optional, Sequence, Set, Tuple
+from sqlalchemy import func
+from ..database import db_session
+from ..models_db import ExerciseHistoryModel
+from .admission_service import admitted, wod_limiter
+from .catalog_service import get_catalog
+from .fitness_coach_service import ALL_EQUIPMENT
+from .wod_response import generate_wod
+
+WOD_CACHE_MAX_BYTES = int(os.environ.get("WOD_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+# Bookkeeping per entry on top of the body: key tuple, LRU node, index sets
+ENTRY_OVERHEAD = 256
+
+WodKey = Tuple[str, date, str, int, int]
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[bytes] = None
+        self.error: Optional[BaseException] = None
+
+
+class WodCache:
+    """
+    LRU of WOD bodies bounded to `max_bytes`, with single-flight generation
+    """
+
+    def __init__(self, max_bytes: int = WOD_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[WodKey, bytes]" = OrderedDict()
+        self._keys_by_user: Dict[str, Set[WodKey]] = {}
+        self._inflight: Dict[WodKey, _Flight] = {}
+        self._lock = threading.Lock()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _entry_size(body: bytes) -> int:
+        return sys.getsizeof(body) + ENTRY_OVERHEAD
+
+    def _remove(self, key: WodKey):
+        body = self._entries.pop(key)
+        self.size_bytes -= self._entry_size(body)
+        user_keys = self._keys_by_user[key[0]]
+        user_keys.discard(key)
+        if not user_keys:
+            del self._keys_by_user[key[0]]
+
+    def _store(self, key: WodKey, body: bytes):
+        size = self._entry_size(body)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = body
+        self._keys_by_user.setdefault(key[0], set()).add(key)
+        self.size_bytes += size
+        while self.size_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def get_or_generate(self, key: WodKey, generate: Callable[[], bytes]) -> bytes:
+        """
+        Cached body for `key`, generating it at most once across concurrent callers
+        """
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return body
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = generate()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+                if flight.error is None:
+                    self._store(key, flight.result)
+            flight.done.set()
+        return flight.result
+
+    def invalidate(self, user_email: str):
+        with self._lock:
+            for key in list(self._keys_by_user.get(user_email, ())):
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+            self.size_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self.size_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "inflight": len(self._inflight),
+            }
+
+
+wod_cache = WodCache()
+
+
+def history_version(user_email: str, day: date) -> int:
+    """
+    Latest history id among the user's exercises of the day before `day`
+    (0 if none), served by the (user_email, performed_at) index
+    """
+    day_start = datetime.combine(day, time.min)
+    db = db_session()
+    try:
+        return db.query(func.max(ExerciseHistoryModel.id)).filter(
+            ExerciseHistoryModel.user_email == user_email,
+            ExerciseHistoryModel.performed_at >= day_start - timedelta(days=1),
+            ExerciseHistoryModel.performed_at < day_start
+        ).scalar() or 0
+    finally:
+        db.close()
+
+
+def get_wod(user_email: str, available_equipment: Optional[Sequence[str]] = None, today: Optional[date] = None) -> bytes:
+    """
+    Today's WOD response body for the user, generated once per user, day,
+    catalog version, equipment set and history version. Only generations
+    take a slot of the WOD admission pool; cache hits and coalesced requests
+    do not.
+    """
+    catalog = get_catalog()
+    if available_equipment is None:
+        mask = ALL_EQUIPMENT
+    else:
+        mask = catalog.equipment_index.mask_for(available_equipment)
+    today = today or date.today()
+    key = (user_email, today, catalog.version, mask, history_version(user_email, today))
+
+    def generate() -> bytes:
+        with admitted(wod_limiter):
+            return generate_wod(user_email, available_equipment)
+
+    return wod_cache.get_or_generate(key, generate)
+
+
+def history_logged(user_email: str, performed_at: Iterable[datetime], today: Optional[date] = None):
+    """
+    Drop the user's cached WODs from this worker's cache if the logged
+    exercises change today's exclusion set (exercises performed yesterday).
+    Other workers miss on the new history version.
+    """
+    yesterday = (today or date.today()) - timedelta(days=1)
+    if any(moment.date() == yesterday for moment in performed_at):
+        wod_cache.invalidate(user_email)
@@ -0,0 +1,106 @@
+"""
+JSON rendering of workout of the day responses.
+
+Everything in a WOD exercise except the suggested weight and reps depends on
+the catalog only, so each exercise is validated and serialized once per
+catalog version into a JSON fragment. A response is then assembled in one
+pass by joining the fragments with the per request suggestions, without
+building a Pydantic model per exercise and muscle group.
+"""
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Sequence, Tuple
+from ..models_dto import Exercise, MuscleGroupImpact, WodExerciseSchema
+from .catalog_service import Catalog, get_catalog
+from .fitness_coach_service import muscle_group_intensity, request_wod, suggest_load, wod_rng
+
+# Fields filled in per request, appended after the cached fragment
+SUGGESTION_FIELDS = {"suggested_weight", "suggested_reps"}
+
+
+def render_exercise_fragment(exercise: Exercise) -> bytes:
+    """
+    JSON of a WOD exercise without its suggestions and closing brace, e.g.
+    b'{"id":1,"name":"Push-ups",...,"muscle_groups":[...]'
+    """
+    wod_exercise = WodExerciseSchema(
+        id=exercise.id,
+        name=exercise.name,
+        description=exercise.description,
+        difficulty=exercise.difficulty,
+        muscle_groups=[
+            MuscleGroupImpact(
+                id=mg.id,
+                name=mg.name,
+                body_part=mg.body_part,
+                is_primary=mg.is_primary,
+                intensity=muscle_group_intensity(exercise.difficulty, mg.is_primary)
+            )
+            for mg in exercise.muscle_groups
+        ]
+    )
+    return wod_exercise.model_dump_json(exclude=SUGGESTION_FIELDS).encode()[:-1]
+
+
+class WodRenderer:
+    """
+    Exercise fragments of one catalog version, rendered on first use
+    """
+
+    def __init__(self, catalog: Catalog):
+        self.version = catalog.version
+        self._fragments: Dict[int, bytes] = {}
+
+    def fragment(self, exercise: Exercise) -> bytes:
+        fragment = self._fragments.get(exercise.id)
+        if fragment is None:
+            fragment = self._fragments.setdefault(exercise.id, render_exercise_fragment(exercise))
+        return fragment
+
+    def render(self, exercises: Sequence[Tuple[Exercise, float, int]], generated_at: datetime) -> bytes:
+        """
+        Response body for (exercise, suggested weight, suggested reps) tuples
+        """
+        return b"".join((
+            b'{"exercises":[',
+            b",".join(
+                b'%s,"suggested_weight":%s,"suggested_reps":%d}' % (self.fragment(exercise), repr(float(weight)).encode(), reps)
+                for exercise, weight, reps in exercises
+            ),
+            b'],"generated_at":"',
+            generated_at.isoformat().encode(),
+            b'"}'
+        ))
+
+
+_renderer: Optional[WodRenderer] = None
+_renderer_lock = threading.Lock()
+
+
+def get_wod_renderer() -> WodRenderer:
+    """
+    Renderer for the current catalog, replaced when the catalog version changes
+    """
+    global _renderer
+    catalog = get_catalog()
+    renderer = _renderer
+    if renderer is None or renderer.version != catalog.version:
+        with _renderer_lock:
+            if _renderer is None or _renderer.version != catalog.version:
+                _renderer = WodRenderer(catalog)
+            renderer = _renderer
+    return renderer
+
+
+def generate_wod(user_email: str, available_equipment: Optional[Sequence[str]] = None) -> bytes:
+    """
+    Generate a WOD for the user and render its response body
+    """
+    # One generator for the selection and the suggestions, so a
+    # deterministic WOD is reproducible end to end
+    rng = wod_rng(user_email)
+    exercises_with_muscles = request_wod(user_email, available_equipment, rng=rng)
+    return get_wod_renderer().render(
+        [(exercise, *suggest_load(rng)) for exercise, _ in exercises_with_muscles],
+        datetime.now()
+    )
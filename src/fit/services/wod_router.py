@@ -0,0 +1,241 @@
+"""
+Routing of WOD requests between the monolith and the coach microservice
+during the migration (ADR 02, phases 2 and 3).
+
+nginx sends /fitness/wod to the app, which forwards `COACH_TRAFFIC_PERCENT`
+percent of the users to the coach service (a user always lands on the same
+backend for a given percentage) and serves the others locally. Coach calls
+are bounded by `COACH_TIMEOUT`; errors, timeouts and non 200 responses fall
+back to the local path, and a circuit breaker stops calling the coach after
+`COACH_BREAKER_FAILURES` consecutive failures, trying again after
+`COACH_BREAKER_RESET` seconds. Latency and outcomes are recorded per backend
+(see /metrics) so the percentage can be ramped on measured performance.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from typing import Deque, Dict, Optional, Sequence
+from .fitness_service import get_exercises_performed_yesterday
+from .wod_cache import get_wod
+
+COACH_SERVICE_URL = os.environ.get("COACH_SERVICE_URL")
+COACH_TRAFFIC_PERCENT = float(os.environ.get("COACH_TRAFFIC_PERCENT", "0"))
+COACH_TIMEOUT = float(os.environ.get("COACH_TIMEOUT", "2.0"))
+COACH_BREAKER_FAILURES = int(os.environ.get("COACH_BREAKER_FAILURES", "5"))
+COACH_BREAKER_RESET = float(os.environ.get("COACH_BREAKER_RESET", "30"))
+# Latencies kept per backend for the percentiles
+LATENCY_WINDOW = 1024
+
+
+class CoachError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Closed: calls go through. Open after `failure_threshold` consecutive
+    failures: calls are refused until `reset_timeout` has elapsed, then a
+    single trial call is let through (half open) and its outcome closes or
+    reopens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opened = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def release(self):
+        """
+        The allowed call was not made: a trial call goes back to open, so the
+        next call is let through
+        """
+        with self._lock:
+            if self.state == "half_open":
+                self.state = "open"
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.opened += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self.failures, "opened": self.opened}
+
+
+class BackendStats:
+    """
+    Request counters and recent latencies of one backend
+    """
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.requests = 0
+        self.errors = 0
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, error: bool = False):
+        with self._lock:
+            self.requests += 1
+            if error:
+                self.errors += 1
+            else:
+                self._latencies.append(seconds)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            requests, errors = self.requests, self.errors
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 2)
+
+        return {
+            "requests": requests,
+            "errors": errors,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+        }
+
+
+class WodRouter:
+    def __init__(
+        self,
+        coach_url: Optional[str] = COACH_SERVICE_URL,
+        traffic_percent: float = COACH_TRAFFIC_PERCENT,
+        timeout: float = COACH_TIMEOUT,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        self.coach_url = coach_url.rstrip("/") if coach_url else None
+        self.traffic_percent = traffic_percent
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker(COACH_BREAKER_FAILURES, COACH_BREAKER_RESET)
+        self.backends = {"coach": BackendStats(), "monolith": BackendStats()}
+        self.fallbacks = 0
+        self._lock = threading.Lock()
+
+    def routes_to_coach(self, user_email: str) -> bool:
+        if not self.coach_url or self.traffic_percent <= 0:
+            return False
+        bucket = int.from_bytes(hashlib.sha256(user_email.encode()).digest()[:4], "big") % 10000
+        return bucket < self.traffic_percent * 100
+
+    def _call_coach(self, payload: dict, authorization: Optional[str]) -> bytes:
+        headers = {"Content-Type": "application/json"}
+        if authorization:
+            headers["Authorization"] = authorization
+        coach_request = urllib.request.Request(
+            f"{self.coach_url}/wod", data=json.dumps(payload).encode(), headers=headers, method="POST"
+        )
+        try:
+            with urllib.request.urlopen(coach_request, timeout=self.timeout) as response:
+                return coach_wod_body(json.loads(response.read()))
+        except (urllib.error.URLError, OSError, ValueError, KeyError, TypeError) as e:
+            # HTTPError (any non 200 status) is a URLError
+            raise CoachError(f"{type(e).__name__}: {e}") from e
+
+    def get_wod(self, user_email: str, available_equipment: Optional[Sequence[str]] = None, authorization: Optional[str] = None) -> bytes:
+        """
+        WOD response body from the coach for the users routed to it, from
+        the monolith for the others and whenever the coach fails
+        """
+        if self.routes_to_coach(user_email) and self.breaker.allow():
+            try:
+                payload = {
+                    "equipment_available": list(available_equipment) if available_equipment is not None else None,
+                    # The coach has no database access: pass yesterday's
+                    # exercises. Queried before timing, so the coach
+                    # latencies measure the coach only.
+                    "excluded_exercise_ids": [exercise.id for exercise in get_exercises_performed_yesterday(user_email)]
+                }
+            except Exception:
+                self.breaker.release()
+                raise
+            start = time.perf_counter()
+            try:
+                body = self._call_coach(payload, authorization)
+            except CoachError as e:
+                self.backends["coach"].record(time.perf_counter() - start, error=True)
+                self.breaker.record_failure()
+                with self._lock:
+                    self.fallbacks += 1
+                print(f"Coach service failed, serving the WOD locally: {e}")
+            else:
+                self.backends["coach"].record(time.perf_counter() - start)
+                self.breaker.record_success()
+                return body
+
+        start = time.perf_counter()
+        try:
+            body = get_wod(user_email, available_equipment)
+        except Exception:
+            self.backends["monolith"].record(time.perf_counter() - start, error=True)
+            raise
+        self.backends["monolith"].record(time.perf_counter() - start)
+        return body
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            fallbacks = self.fallbacks
+        return {
+            "coach_url": self.coach_url,
+            "coach_traffic_percent": self.traffic_percent,
+            "fallbacks": fallbacks,
+            "circuit": self.breaker.stats(),
+            "backends": {name: backend.stats() for name, backend in self.backends.items()},
+        }
+
+
+def coach_wod_body(wod: dict) -> bytes:
+    """
+    Coach response in the monolith's WOD schema (WodResponseSchema), so
+    clients see the same contract whichever backend served them
+    """
+    return json.dumps({
+        "exercises": [
+            {
+                "id": exercise["id"],
+                "name": exercise["name"],
+                "description": exercise.get("description") or "",
+                "difficulty": exercise["difficulty"],
+                "muscle_groups": exercise["muscle_groups"],
+                "suggested_weight": exercise.get("weight") or 0.0,
+                "suggested_reps": exercise["reps"],
+            }
+            for exercise in wod["exercises"]
+        ],
+        "generated_at": wod["generated_at"],
+    }, separators=(",", ":")).encode()
+
+
+wod_router = WodRouter()
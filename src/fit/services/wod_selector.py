@@ -0,0 +1,208 @@
+"""
+Muscle-balance-aware exercise selection for the workout of the day.
+
+The catalog is turned into an exercise x muscle group incidence matrix
+(primary = 1.0, secondary = 0.5). Each user has a fatigue vector over muscle
+groups: the load of what they trained recently, read from the
+`user_daily_load` aggregates and decayed per day. Selection scores every candidate against that vector with matrix products and
+greedily picks the least loaded exercise, adding its row to the session load
+so the remaining picks spread over other muscle groups.
+"""
+import random
+import threading
+import time as pytime
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Sequence
+import numpy as np
+from ..database import db_session
+from ..models_db import UserDailyLoadModel
+from ..models_dto import Exercise, MuscleGroup
+
+PRIMARY_LOAD = 1.0
+SECONDARY_LOAD = 0.5
+# Fraction of a day's load still felt the next day
+FATIGUE_DECAY = 0.6
+FATIGUE_WINDOW_DAYS = 7
+# Random spread added to scores so equally rested exercises rotate
+SCORE_JITTER = 0.25
+# Fatigue vectors are reloaded after this long so workers that did not see a
+# history write catch up
+FATIGUE_TTL_SECONDS = 300
+MAX_TRACKED_USERS = 10000
+
+
+class IncidenceMatrix:
+    """
+    Exercise x muscle group load matrix for the WOD candidates of a catalog
+    """
+
+    def __init__(self, exercises: Sequence[Exercise], muscle_groups: Sequence[MuscleGroup]):
+        self.column_by_muscle_group = {mg.id: column for column, mg in enumerate(muscle_groups)}
+        self.row_by_exercise = {exercise.id: row for row, exercise in enumerate(exercises)}
+        self.matrix = np.zeros((len(exercises), len(muscle_groups)), dtype=np.float64)
+        for row, exercise in enumerate(exercises):
+            for mg in exercise.muscle_groups:
+                load = PRIMARY_LOAD if mg.is_primary else SECONDARY_LOAD
+                self.matrix[row, self.column_by_muscle_group[mg.id]] = load
+        row_sums = self.matrix.sum(axis=1)
+        self.row_sums = np.where(row_sums > 0, row_sums, 1.0)
+
+    def rows(self, exercise_ids: Sequence[int]) -> np.ndarray:
+        return np.fromiter((self.row_by_exercise[eid] for eid in exercise_ids), dtype=np.intp, count=len(exercise_ids))
+
+    def muscle_group_vector(self, muscle_group_ids: Sequence[int], values: Sequence[float]) -> np.ndarray:
+        """
+        Vector over muscle groups with the given values summed into their columns
+        """
+        vector = np.zeros(self.matrix.shape[1], dtype=np.float64)
+        known = [(self.column_by_muscle_group[mg_id], value) for mg_id, value in zip(muscle_group_ids, values) if mg_id in self.column_by_muscle_group]
+        if known:
+            columns, column_values = zip(*known)
+            np.add.at(vector, np.array(columns, dtype=np.intp), np.array(column_values, dtype=np.float64))
+        return vector
+
+    def load_vector(self, exercise_ids: Sequence[int], weights: Sequence[float]) -> np.ndarray:
+        """
+        Sum of the weighted incidence rows of the given exercises
+        """
+        per_row = np.zeros(self.matrix.shape[0], dtype=np.float64)
+        known = [(self.row_by_exercise[eid], weight) for eid, weight in zip(exercise_ids, weights) if eid in self.row_by_exercise]
+        if known:
+            rows, row_weights = zip(*known)
+            np.add.at(per_row, np.array(rows, dtype=np.intp), np.array(row_weights, dtype=np.float64))
+        return per_row @ self.matrix
+
+
+def select_exercises(
+    incidence: IncidenceMatrix,
+    candidate_ids: Sequence[int],
+    fatigue: np.ndarray,
+    count: int,
+    rng: random.Random
+) -> List[int]:
+    """
+    Pick `count` candidates, preferring rested muscle groups and spreading the
+    session's primary/secondary load across the body
+    """
+    if len(candidate_ids) <= count:
+        return list(candidate_ids)
+
+    rows = incidence.rows(candidate_ids)
+    loads = incidence.matrix[rows]
+    row_sums = incidence.row_sums[rows]
+    jitter = np.random.default_rng(rng.getrandbits(64)).random(len(candidate_ids)) * SCORE_JITTER
+
+    session_load = np.zeros_like(fatigue)
+    available = np.ones(len(candidate_ids), dtype=bool)
+    selected = []
+    for _ in range(count):
+        scores = loads @ (fatigue + session_load) / row_sums + jitter
+        scores[~available] = np.inf
+        pick = int(np.argmin(scores))
+        available[pick] = False
+        session_load += loads[pick]
+        selected.append(candidate_ids[pick])
+    return selected
+
+
+@dataclass
+class _FatigueState:
+    vector: np.ndarray
+    day: date
+    catalog_version: str
+    loaded_at: float
+
+
+class FatigueStore:
+    """
+    Per-user fatigue vectors, loaded from the last week of daily load
+    aggregates on first use and updated incrementally as new history rows are recorded
+    """
+
+    def __init__(self, max_users: int = MAX_TRACKED_USERS, ttl_seconds: float = FATIGUE_TTL_SECONDS):
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        self._states: "OrderedDict[str, _FatigueState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _decay(state: _FatigueState, day: date):
+        if day > state.day:
+            state.vector *= FATIGUE_DECAY ** (day - state.day).days
+            state.day = day
+
+    def _load(self, user_email: str, today: date, incidence: IncidenceMatrix, catalog_version: str) -> _FatigueState:
+        # Reads the per day aggregates, O(days x muscle groups) rows whatever
+        # the size of the user's history
+        db = db_session()
+        try:
+            rows = db.query(
+                UserDailyLoadModel.day,
+                UserDailyLoadModel.muscle_group_id,
+                UserDailyLoadModel.exercise_count,
+                UserDailyLoadModel.primary_count
+            ).filter(
+                UserDailyLoadModel.user_email == user_email,
+                UserDailyLoadModel.day >= today - timedelta(days=FATIGUE_WINDOW_DAYS)
+            ).all()
+        finally:
+            db.close()
+
+        vector = incidence.muscle_group_vector(
+            [muscle_group_id for _, muscle_group_id, _, _ in rows],
+            [
+                FATIGUE_DECAY ** max((today - day).days, 0)
+                * (primary_count * PRIMARY_LOAD + (exercise_count - primary_count) * SECONDARY_LOAD)
+                for day, _, exercise_count, primary_count in rows
+            ]
+        )
+        return _FatigueState(vector, today, catalog_version, pytime.monotonic())
+
+    def get(self, user_email: str, incidence: IncidenceMatrix, catalog_version: str, today: Optional[date] = None) -> np.ndarray:
+        """
+        Return a copy of the user's fatigue vector as of `today`
+        """
+        today = today or date.today()
+        with self._lock:
+            state = self._states.get(user_email)
+            if state is not None:
+                self._states.move_to_end(user_email)
+        if (
+            state is None
+            or state.catalog_version != catalog_version
+            or pytime.monotonic() - state.loaded_at > self.ttl_seconds
+        ):
+            state = self._load(user_email, today, incidence, catalog_version)
+            with self._lock:
+                self._states[user_email] = state
+                while len(self._states) > self.max_users:
+                    self._states.popitem(last=False)
+
+        with self._lock:
+            self._decay(state, today)
+            return state.vector.copy()
+
+    def record(self, user_email: str, exercise_id: int, performed_at: datetime, incidence: IncidenceMatrix, catalog_version: str):
+        """
+        Add a newly logged exercise to the user's fatigue vector, if it is tracked
+        """
+        with self._lock:
+            state = self._states.get(user_email)
+            if state is None or state.catalog_version != catalog_version:
+                return
+            # A future date (client clock) counts as today: it must neither
+            # decay the vector ahead of time nor weigh more than a fresh entry
+            day = min(performed_at.date(), date.today())
+            self._decay(state, day)
+            age = (state.day - day).days
+            if age <= FATIGUE_WINDOW_DAYS:
+                state.vector += incidence.load_vector([exercise_id], [FATIGUE_DECAY ** age])
+
+    def invalidate(self, user_email: str):
+        with self._lock:
+            self._states.pop(user_email, None)
+
+
+fatigue_store = FatigueStore()
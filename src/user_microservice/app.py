@@ -1,9 +1,13 @@
 from flask import Flask, request, jsonify
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
 import os
+import time
 from pydantic import ValidationError
 from models_dto import UserSchema, LoginSchema
 from services.user_service import create_user, authenticate_user
+from services.health_checks import HealthMonitor
+from sqlalchemy import text
+from database import db_session
 
 app = Flask(__name__)
 app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY", "default-secret")
@@ -13,10 +17,26 @@ app.config["JWT_TOKEN_LOCATION"] = ["headers"]
 
 jwt = JWTManager(app)
 
-@app.route("/health")
-def health():
+def check_database():
+    db = db_session()
+    start = time.perf_counter()
+    try:
+        db.execute(text("SELECT 1"))
+        return {"status": "UP", "latency_ms": round((time.perf_counter() - start) * 1000, 2)}
+    finally:
+        db.close()
+
+health_monitor = HealthMonitor({"database": check_database})
+
+@app.route("/health/live")
+def health_live():
     return {"status": "UP"}
 
+@app.route("/health")
+@app.route("/health/ready")
+def health_ready():
+    return health_monitor.readiness()
+
 @app.route("/users", methods=["POST"])
 def create_user_route():
     try:
@@ -47,4 +67,5 @@ def login():
         return jsonify({"error": "Error logging in", "details": str(e)}), 500
 
 if __name__ == "__main__":
+    health_monitor.start()
     app.run(host="0.0.0.0", port=5002, debug=True) 
\ No newline at end of file
@@ -0,0 +1,104 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import json
+import statistics
+import subprocess
+import time
+from datetime import datetime, UTC
+
+import pytest
+from src.fit.database import init_db, db_session
+from src.fit.models_db import Base
+from src.fit.services.catalog_service import invalidate_catalog
+from datagen import DatasetSize, generate_dataset
+
+BENCH_ROUNDS = int(os.getenv("BENCH_ROUNDS", "20"))
+# Results are only recorded on request, so plain test runs write nothing
+BENCH_SAVE = os.getenv("BENCH_SAVE", "").lower() in ("1", "true", "yes")
+BENCH_OUTPUT = os.getenv("BENCH_OUTPUT", os.path.join(".benchmarks", "history.jsonl"))
+
+_results = {}
+
+
+class Benchmark:
+    """
+    Minimal timing helper: one warm-up call, then `rounds` timed calls.
+    Results are collected per test, reported at the end of the session and,
+    with BENCH_SAVE set, appended to BENCH_OUTPUT so runs can be compared
+    over time.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __call__(self, fn, *args, rounds: int = None, label: str = None, **kwargs):
+        rounds = rounds or BENCH_ROUNDS
+        result = fn(*args, **kwargs)
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter_ns()
+            fn(*args, **kwargs)
+            timings.append(time.perf_counter_ns() - start)
+
+        name = f"{self.name}[{label}]" if label else self.name
+        _results[name] = {
+            "rounds": rounds,
+            "min_us": min(timings) / 1000,
+            "median_us": statistics.median(timings) / 1000,
+            "mean_us": statistics.fmean(timings) / 1000,
+            "max_us": max(timings) / 1000,
+        }
+        return result
+
+
+@pytest.fixture
+def bench(request):
+    return Benchmark(request.node.name)
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    init_db()
+    invalidate_catalog()
+    db = db_session()
+    try:
+        yield generate_dataset(db, DatasetSize.from_env())
+    finally:
+        invalidate_catalog()
+        db.close()
+        db_session.remove()
+        Base.metadata.drop_all(bind=db.get_bind())
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not _results:
+        return
+
+    terminalreporter.section("benchmarks")
+    for name, stats in _results.items():
+        terminalreporter.write_line(
+            f"{name:<60} median {stats['median_us']:>12.1f} us   min {stats['min_us']:>12.1f} us"
+        )
+
+    if not BENCH_SAVE:
+        return
+    record = {
+        "timestamp": datetime.now(UTC).isoformat(),
+        "revision": _git_revision(),
+        "dataset": vars(DatasetSize.from_env()),
+        "results": _results,
+    }
+    os.makedirs(os.path.dirname(BENCH_OUTPUT) or ".", exist_ok=True)
+    with open(BENCH_OUTPUT, "a") as file:
+        file.write(json.dumps(record) + "\n")
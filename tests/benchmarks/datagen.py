@@ -0,0 +1,136 @@
+"""
+Synthetic data generators for the service-layer benchmarks.
+
+Dataset sizes are read from environment variables so the same benchmarks can
+run quickly in CI and against production-sized data locally:
+
+    BENCH_USERS, BENCH_MUSCLE_GROUPS, BENCH_EXERCISES, BENCH_HISTORY
+"""
+import os
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List
+
+from sqlalchemy import insert
+
+from src.fit.models_db import UserModel, MuscleGroupModel, ExerciseModel, ExerciseHistoryModel, exercise_muscle_groups
+from src.fit.services.user_service import hash_password
+
+BODY_PARTS = ["Chest", "Back", "Shoulders", "Arms", "Core", "Legs", "Glutes", "Hips"]
+EQUIPMENT = ["None", "Barbell", "Dumbbells", "Barbell, Bench", "Cable machine", "Pull-up bar", "Dumbbells (optional)"]
+
+
+@dataclass
+class DatasetSize:
+    users: int = 200
+    muscle_groups: int = 20
+    exercises: int = 200
+    history: int = 2000
+
+    @classmethod
+    def from_env(cls) -> "DatasetSize":
+        return cls(
+            users=int(os.getenv("BENCH_USERS", cls.users)),
+            muscle_groups=int(os.getenv("BENCH_MUSCLE_GROUPS", cls.muscle_groups)),
+            exercises=int(os.getenv("BENCH_EXERCISES", cls.exercises)),
+            history=int(os.getenv("BENCH_HISTORY", cls.history)),
+        )
+
+
+@dataclass
+class Dataset:
+    size: DatasetSize
+    user_emails: List[str] = field(default_factory=list)
+    muscle_group_ids: List[int] = field(default_factory=list)
+    exercise_ids: List[int] = field(default_factory=list)
+
+
+def generate_muscle_groups(db, count: int) -> List[int]:
+    rows = [
+        {
+            "id": i,
+            "name": f"Muscle Group {i}",
+            "body_part": BODY_PARTS[i % len(BODY_PARTS)],
+            "description": f"Synthetic muscle group number {i}",
+        }
+        for i in range(1, count + 1)
+    ]
+    db.execute(insert(MuscleGroupModel), rows)
+    return [row["id"] for row in rows]
+
+
+def generate_exercises(db, count: int, muscle_group_ids: List[int], rng: random.Random) -> List[int]:
+    rows = [
+        {
+            "id": i,
+            "name": f"Exercise {i}",
+            "description": f"Synthetic exercise number {i} for benchmarking",
+            "difficulty": rng.randint(1, 5),
+            "equipment": rng.choice(EQUIPMENT),
+            "instructions": "Lift, hold for a second, lower slowly and repeat",
+        }
+        for i in range(1, count + 1)
+    ]
+    db.execute(insert(ExerciseModel), rows)
+
+    links = []
+    for row in rows:
+        targeted = rng.sample(muscle_group_ids, min(len(muscle_group_ids), rng.randint(1, 4)))
+        links.extend(
+            {"exercise_id": row["id"], "muscle_group_id": mg_id, "is_primary": index == 0}
+            for index, mg_id in enumerate(targeted)
+        )
+    db.execute(insert(exercise_muscle_groups), links)
+    return [row["id"] for row in rows]
+
+
+def generate_users(db, count: int) -> List[str]:
+    password_hash = hash_password("benchmark")
+    rows = [
+        {
+            "email": f"user{i}@bench.fit",
+            "name": f"Bench User {i}",
+            "role": "admin" if i == 0 else "user",
+            "password_hash": password_hash,
+            "onboarded": "true",
+        }
+        for i in range(count)
+    ]
+    db.execute(insert(UserModel), rows)
+    return [row["email"] for row in rows]
+
+
+def generate_history(db, count: int, user_emails: List[str], exercise_ids: List[int], rng: random.Random):
+    """
+    Spread history rows over the last 90 days; the first user always gets
+    rows for yesterday so the WOD exclusion path is exercised.
+    """
+    now = datetime.now()
+    rows = []
+    for i in range(count):
+        user_email = user_emails[0] if i % 10 == 0 else rng.choice(user_emails)
+        days_ago = 1 if i % 10 == 0 else rng.randint(0, 90)
+        rows.append({
+            "user_email": user_email,
+            "exercise_id": rng.choice(exercise_ids),
+            "performed_at": now - timedelta(days=days_ago, minutes=rng.randint(0, 600)),
+            "duration_minutes": round(rng.uniform(1.0, 20.0), 1),
+            "reps": rng.randint(5, 20),
+        })
+    if rows:
+        db.execute(insert(ExerciseHistoryModel), rows)
+
+
+def generate_dataset(db, size: DatasetSize, seed: int = 42) -> Dataset:
+    """
+    Populate an empty database with a reproducible synthetic dataset
+    """
+    rng = random.Random(seed)
+    dataset = Dataset(size=size)
+    dataset.muscle_group_ids = generate_muscle_groups(db, size.muscle_groups)
+    dataset.exercise_ids = generate_exercises(db, size.exercises, dataset.muscle_group_ids, rng)
+    dataset.user_emails = generate_users(db, size.users)
+    generate_history(db, size.history, dataset.user_emails, dataset.exercise_ids, rng)
+    db.commit()
+    return dataset
@@ -0,0 +1,60 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'src', 'coach_microservice')))
+
+import json
+
+import pytest
+from src.fit.services import catalog_service
+from src.fit.services.catalog_snapshot import export_catalog_snapshot
+from models.models_dto import WODRequest
+from services.batch_service import BatchWODService
+from services.catalog_store import CatalogStore
+from services.wod_service import WODService
+
+BATCH_SIZE = 256
+
+
+@pytest.fixture(scope="module")
+def coach(dataset, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("catalog") / "catalog.bin")
+    export_catalog_snapshot(path, catalog_service.load_catalog())
+    service = WODService(CatalogStore(path))
+    batch_service = BatchWODService(service, path)
+    yield service, batch_service
+    batch_service.close()
+
+
+def _requests(dataset):
+    return [
+        WODRequest(user_id=dataset.user_emails[i % len(dataset.user_emails)], equipment_available=["dumbbells", "bench"])
+        for i in range(BATCH_SIZE)
+    ]
+
+
+def test_coach_wod_single(bench, dataset, coach):
+    # Time per WOD, generation and serialization to the response body
+    service, _ = coach
+    wod_request = WODRequest(user_id=dataset.user_emails[0], equipment_available=["dumbbells", "bench"])
+
+    body = bench(lambda: service.generate_wod(wod_request).model_dump_json(), rounds=200)
+    assert '"exercises"' in body
+
+
+def test_coach_wod_batch_sequential(bench, dataset, coach):
+    service, _ = coach
+    requests = _requests(dataset)
+
+    def sequential():
+        return [service.generate_wod(wod_request).model_dump_json() for wod_request in requests]
+
+    bodies = bench(sequential, rounds=5)
+    assert len(bodies) == BATCH_SIZE
+
+
+def test_coach_wod_batch_pool(bench, dataset, coach):
+    _, batch_service = coach
+    requests = _requests(dataset)
+
+    lines = bench(lambda: list(batch_service.generate(requests)), rounds=5)
+    assert [json.loads(line)["index"] for line in lines] == list(range(BATCH_SIZE))
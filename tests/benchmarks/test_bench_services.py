@@ -0,0 +1,114 @@
+import json
+import random
+import datetime
+
+from src.fit.services import fitness_service, fitness_coach_service, user_service, auth_service, catalog_service, wod_selector, wod_response, wod_cache
+from src.fit.models_dto import Exercise, MuscleGroupImpact, WodExerciseSchema, WodResponseSchema
+
+
+def test_get_all_exercises(bench, dataset):
+    exercises = bench(fitness_service.get_all_exercises)
+    assert len(exercises) == dataset.size.exercises
+
+
+def test_request_wod(bench, dataset, monkeypatch):
+    # heavy_computation is a fixed synthetic delay; leave it out so the
+    # benchmark measures the selection and query work only.
+    monkeypatch.setattr(fitness_coach_service, "heavy_computation", lambda duration_seconds=3: None)
+    wod = bench(fitness_coach_service.request_wod, dataset.user_emails[0])
+    assert len(wod) == 6
+
+
+def test_request_wod_with_equipment(bench, dataset, monkeypatch):
+    monkeypatch.setattr(fitness_coach_service, "heavy_computation", lambda duration_seconds=3: None)
+    wod = bench(fitness_coach_service.request_wod, dataset.user_emails[0], ["dumbbells", "bench"])
+    assert len(wod) == 6
+
+
+def test_get_wod_cached(bench, dataset, monkeypatch):
+    monkeypatch.setattr(fitness_coach_service, "heavy_computation", lambda duration_seconds=3: None)
+    wod_cache.wod_cache.clear()
+    body = bench(wod_cache.get_wod, dataset.user_emails[0], rounds=1000)
+    assert len(json.loads(body)["exercises"]) == 6
+    wod_cache.wod_cache.clear()
+
+
+def test_get_all_users(bench, dataset):
+    users = bench(user_service.get_all_users)
+    assert len(users) == dataset.size.users
+
+
+def test_decode_token(bench):
+    token = auth_service.create_access_token(
+        data={"sub": "user0@bench.fit", "role": "user", "iat": datetime.datetime.now(datetime.UTC)},
+        expires_delta=datetime.timedelta(minutes=30),
+    )
+    payload = bench(auth_service.decode_token, token, rounds=1000)
+    assert payload["sub"] == "user0@bench.fit"
+
+
+def test_exercise_dto_serialization(bench, dataset):
+    exercises = fitness_service.get_all_exercises()
+
+    def serialize(items: list[Exercise]) -> str:
+        return json.dumps([ex.model_dump() for ex in items])
+
+    body = bench(serialize, exercises)
+    assert len(json.loads(body)) == dataset.size.exercises
+
+
+def test_load_catalog(bench, dataset):
+    catalog = bench(catalog_service.load_catalog)
+    assert len(catalog.exercises) == dataset.size.exercises
+
+
+def test_catalog_exercises_payload(bench, dataset):
+    catalog_service.invalidate_catalog()
+    payload = bench(lambda: catalog_service.get_catalog().exercises_payload(), rounds=1000)
+    assert len(json.loads(payload.variants["identity"])) == dataset.size.exercises
+    catalog_service.invalidate_catalog()
+
+
+def test_catalog_search(bench, dataset):
+    index = catalog_service.load_catalog().search_index
+    results = bench(index.search, q="synthetic exer", difficulty=[2, 3], equipment=["dumbbells"], rounds=1000)
+    assert all(ex.difficulty in (2, 3) for ex in results)
+
+
+def test_select_exercises(bench, dataset):
+    catalog = catalog_service.load_catalog()
+    candidate_ids = catalog.equipment_index.candidate_ids(fitness_coach_service.ALL_EQUIPMENT)
+    fatigue = wod_selector.fatigue_store.get(dataset.user_emails[0], catalog.incidence, catalog.version)
+    selected = bench(wod_selector.select_exercises, catalog.incidence, candidate_ids, fatigue, 6, random.Random(0))
+    assert len(selected) == 6
+
+
+def test_wod_response_assembly(bench, dataset):
+    catalog = catalog_service.load_catalog()
+    candidate_ids = catalog.equipment_index.candidate_ids(fitness_coach_service.ALL_EQUIPMENT)
+    picks = [(catalog.exercises_by_id[eid], 20.0, 10) for eid in random.Random(0).sample(candidate_ids, 6)]
+    generated_at = datetime.datetime.now()
+
+    def with_models():
+        # Previous assembly: one Pydantic model per exercise and muscle group
+        exercises = [
+            WodExerciseSchema(
+                id=exercise.id, name=exercise.name, description=exercise.description, difficulty=exercise.difficulty,
+                muscle_groups=[
+                    MuscleGroupImpact(
+                        id=mg.id, name=mg.name, body_part=mg.body_part, is_primary=mg.is_primary,
+                        intensity=fitness_coach_service.calculate_intensity(exercise.difficulty)
+                        * (fitness_coach_service.PRIMARY_INTENSITY_FACTOR if mg.is_primary else fitness_coach_service.SECONDARY_INTENSITY_FACTOR)
+                    )
+                    for mg in exercise.muscle_groups
+                ],
+                suggested_weight=weight, suggested_reps=reps
+            )
+            for exercise, weight, reps in picks
+        ]
+        return WodResponseSchema(exercises=exercises, generated_at=generated_at).model_dump_json().encode()
+
+    renderer = wod_response.WodRenderer(catalog)
+    before = bench(with_models, rounds=1000, label="models")
+    after = bench(renderer.render, picks, generated_at, rounds=1000, label="fragments")
+    assert json.loads(after) == json.loads(before)
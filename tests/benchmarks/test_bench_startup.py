@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+
+# Imported on first use only (database driver on first query, numpy with
+# the catalog), never by importing or creating the app
+LAZY_MODULES = {"numpy", "psycopg", "psycopg2"}
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+def _cold_start(statement: str) -> str:
+    """
+    Run `statement` in a fresh interpreter with -X importtime and return the report
+    """
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stderr
+
+
+def _imported(report: str) -> set:
+    return {line.rsplit("|", 1)[1].strip() for line in report.splitlines() if line.startswith("import time:")}
+
+
+def test_import_app(bench):
+    report = bench(_cold_start, "import src.fit.app", rounds=3)
+    assert not LAZY_MODULES & _imported(report)
+
+
+def test_create_app(bench):
+    report = bench(_cold_start, "from src.fit.app import create_app; create_app()", rounds=3)
+    assert "src.fit.blueprints.fitness" in _imported(report)
+    assert not LAZY_MODULES & _imported(report)
@@ -0,0 +1,36 @@
+#!/bin/sh
+# Load test the current nginx configuration against the baseline one (before
+# upstream keepalive, multiple workers and gzip), with the same k6 scenario.
+#
+#   ACCESS_TOKEN=<token> tests/load/nginx/compare.sh
+#
+# Run from the repository root with the stack up (docker compose up -d).
+set -e
+
+mkdir -p tests/load/nginx/results
+
+run() {
+    label=$1
+    shift
+    docker compose "$@" up -d --force-recreate --no-deps nginx
+    sleep 3
+    k6 run -e LABEL="$label" -e ACCESS_TOKEN="$ACCESS_TOKEN" tests/load/nginx/nginx-compare-k6.js
+}
+
+run baseline -f docker-compose.yml -f tests/load/nginx/docker-compose.baseline.yml
+run current -f docker-compose.yml
+
+python3 - <<'PY'
+import json
+
+def load(label):
+    with open(f"tests/load/nginx/results/{label}.json") as file:
+        return json.load(file)["metrics"]
+
+baseline, current = load("baseline"), load("current")
+print(f"{'metric':<28}{'baseline':>12}{'current':>12}")
+for metric, stat in [("http_req_duration", "med"), ("http_req_duration", "p(95)"),
+                     ("http_req_failed", "rate"), ("http_reqs", "rate")]:
+    name = f"{metric} {stat}"
+    print(f"{name:<28}{baseline[metric]['values'][stat]:>12.3f}{current[metric]['values'][stat]:>12.3f}")
+PY
@@ -0,0 +1,61 @@
+import http from 'k6/http';
+import { check } from 'k6';
+import { textSummary } from 'https://jslib.k6.io/k6-summary/0.0.2/index.js';
+
+// Same open-model load against each nginx configuration (see compare.sh):
+// requests keep arriving at a fixed rate whatever the latency, so the
+// connection setup cost shows up in the latencies instead of being hidden
+// by slower virtual users.
+const LABEL = __ENV.LABEL || 'current';
+const RATE = parseInt(__ENV.RATE || '200');
+const DURATION = __ENV.DURATION || '2m';
+const BASE_URL = __ENV.BASE_URL || 'http://localhost:8080';
+const token = __ENV.ACCESS_TOKEN?.trim();
+
+function scenario(exec, rate) {
+  return {
+    executor: 'constant-arrival-rate',
+    exec,
+    rate,
+    timeUnit: '1s',
+    duration: DURATION,
+    preAllocatedVUs: rate,
+    maxVUs: rate * 4,
+  };
+}
+
+export const options = {
+  discardResponseBodies: true,
+  scenarios: {
+    // Cheap upstream requests, where connection setup dominates
+    health: scenario('health', Math.round(RATE * 0.4)),
+    search: scenario('search', Math.round(RATE * 0.4)),
+    wod: scenario('wod', Math.round(RATE * 0.2)),
+  },
+};
+
+const params = {
+  headers: { 'Authorization': `Bearer ${token}`, 'Accept-Encoding': 'gzip' },
+};
+
+export function health() {
+  check(http.get(`${BASE_URL}/health`, { tags: { route: 'health' } }), { 'status is 200': (r) => r.status === 200 });
+}
+
+export function search() {
+  const res = http.get(`${BASE_URL}/fitness/exercises/search?equipment=dumbbells`, { tags: { route: 'search' } });
+  check(res, { 'status is 200': (r) => r.status === 200 });
+}
+
+export function wod() {
+  check(http.get(`${BASE_URL}/fitness/wod`, Object.assign({ tags: { route: 'wod' } }, params)), {
+    'status is 200': (r) => r.status === 200,
+  });
+}
+
+export function handleSummary(data) {
+  return {
+    stdout: textSummary(data, { indent: ' ', enableColors: true }),
+    [`tests/load/nginx/results/${LABEL}.json`]: JSON.stringify(data),
+  };
+}
@@ -0,0 +1,94 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import unittest
+import json
+import threading
+import datetime
+from unittest.mock import patch
+from src.fit.app import app
+from src.fit.database import init_db, db_session
+from src.fit.models_db import Base
+from src.fit.services.admission_service import ConcurrencyLimiter, wod_limiter
+from src.fit.services.auth_service import create_access_token
+from src.fit.services.catalog_service import invalidate_catalog
+from src.fit.services.wod_cache import wod_cache
+
+class TestConcurrencyLimiter(unittest.TestCase):
+    def test_admits_up_to_limit(self):
+        limiter = ConcurrencyLimiter("test", max_concurrent=2, max_queue=0, queue_timeout=0.01, retry_after=1)
+
+        self.assertTrue(limiter.acquire())
+        self.assertTrue(limiter.acquire())
+        self.assertFalse(limiter.acquire())
+        limiter.release()
+        self.assertTrue(limiter.acquire())
+        self.assertEqual((limiter.admitted, limiter.rejected), (3, 1))
+
+    def test_queued_request_times_out(self):
+        limiter = ConcurrencyLimiter("test", max_concurrent=1, max_queue=1, queue_timeout=0.01, retry_after=1)
+        limiter.acquire()
+
+        self.assertFalse(limiter.acquire())
+        self.assertEqual((limiter.timed_out, limiter.waiting), (1, 0))
+
+    def test_queued_request_gets_released_slot(self):
+        limiter = ConcurrencyLimiter("test", max_concurrent=1, max_queue=1, queue_timeout=5, retry_after=1)
+        limiter.acquire()
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(limiter.acquire()))
+        waiter.start()
+        while limiter.stats()["waiting"] == 0:
+            threading.Event().wait(0.001)
+
+        limiter.release()
+        waiter.join()
+
+        self.assertEqual(results, [True])
+        self.assertEqual(limiter.active, 1)
+
+class TestAdmissionAPI(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+        init_db()
+        invalidate_catalog()
+        self.headers = {'Authorization': 'Bearer ' + create_access_token(
+            data={"sub": "user@test.com", "role": "user"},
+            expires_delta=datetime.timedelta(minutes=30)
+        )}
+
+    def tearDown(self):
+        invalidate_catalog()
+        wod_cache.clear()
+        db_session.remove()
+        Base.metadata.drop_all(bind=db_session().get_bind())
+
+    @patch('src.fit.services.fitness_coach_service.heavy_computation')
+    def test_wod_shed_when_saturated(self, heavy_computation):
+        with patch.multiple(wod_limiter, max_concurrent=0, max_queue=0):
+            response = self.client.get('/fitness/wod', headers=self.headers)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], str(wod_limiter.retry_after))
+        self.assertEqual(json.loads(response.data)['pool'], "wod")
+        heavy_computation.assert_not_called()
+
+    def test_catalog_not_affected_by_wod_saturation(self):
+        with patch.multiple(wod_limiter, max_concurrent=0, max_queue=0):
+            response = self.client.get('/fitness/muscle-groups')
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_metrics(self):
+        response = self.client.get('/metrics')
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(set(data['admission']), {"wod", "catalog", "auth"})
+        self.assertIn("max_concurrent", data['admission']['wod'])
+        self.assertIn("hits", data['wod_cache'])
+        self.assertEqual(set(data['wod_routing']['backends']), {"coach", "monolith"})
+
+if __name__ == '__main__':
+    unittest.main()
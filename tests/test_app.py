@@ -0,0 +1,21 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import unittest
+from src.fit import app as app_module
+from src.fit.app import create_app
+
+class TestCreateApp(unittest.TestCase):
+    def test_config_overrides(self):
+        app = create_app({"TESTING": True, "JWT_SECRET_KEY": "other-secret"})
+
+        self.assertTrue(app.config["TESTING"])
+        self.assertEqual(app.config["JWT_SECRET_KEY"], "other-secret")
+        self.assertIn("fitness", app.blueprints)
+
+    def test_independent_apps(self):
+        self.assertIsNot(create_app(), create_app())
+        self.assertIs(app_module.app, app_module.app)
+
+if __name__ == '__main__':
+    unittest.main()
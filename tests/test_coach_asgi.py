@@ -0,0 +1,128 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'coach_microservice')))
+import unittest
+import asyncio
+import json
+import tempfile
+import datetime
+import jwt
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import patch
+from src.fit.services.catalog_snapshot import export_catalog_snapshot
+from tests.test_coach_wod import make_catalog
+import asgi
+from services.batch_service import create_pool
+
+def call(method, path, body=b"", token=None, query=b""):
+    """
+    Run one request through the ASGI app and return (status, headers, body)
+    """
+    headers = [(b"content-type", b"application/json")]
+    if token:
+        headers.append((b"authorization", b"Bearer " + token.encode()))
+    scope = {"type": "http", "method": method, "path": path, "headers": headers, "query_string": query}
+    incoming = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return incoming.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi.app(scope, receive, send))
+    return sent[0]["status"], dict(sent[0]["headers"]), json.loads(sent[1]["body"])
+
+class TestCoachAsgi(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(cls.tmp.name, "catalog.bin")
+        export_catalog_snapshot(path, make_catalog())
+        cls.pool = create_pool(path, 1)
+        cls.patcher = patch.multiple(asgi, _pool=cls.pool, CATALOG_SNAPSHOT_PATH=path)
+        cls.patcher.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.patcher.stop()
+        cls.pool.shutdown()
+        cls.tmp.cleanup()
+
+    def token(self, **claims):
+        payload = {"sub": "user@test.com", "exp": datetime.datetime.now(datetime.UTC) + datetime.timedelta(minutes=5), **claims}
+        return jwt.encode(payload, asgi.JWT_SECRET_KEY, algorithm="HS256")
+
+    def test_health(self):
+        self.assertEqual(call("GET", "/health/live")[::2], (200, {"status": "UP"}))
+        with patch.object(asgi, "_checks", {"catalog": asgi._check_catalog()}):
+            status, _, body = call("GET", "/health/ready")
+
+        self.assertEqual((status, body["status"]), (200, "UP"))
+        self.assertEqual(body["checks"]["workers"]["pending_requests"], 0)
+
+    def test_not_ready_without_snapshot(self):
+        with patch.object(asgi, "CATALOG_SNAPSHOT_PATH", os.path.join(self.tmp.name, "missing.bin")):
+            with patch.object(asgi, "_checks", {"catalog": asgi._check_catalog()}):
+                status, _, body = call("GET", "/health/ready")
+
+        self.assertEqual((status, body["checks"]["catalog"]["status"]), (503, "DOWN"))
+
+    def test_starting_until_first_checks(self):
+        with patch.object(asgi, "_checks", None), patch.object(asgi, "_check_catalog") as check_catalog:
+            status, _, body = call("GET", "/health/ready")
+
+        self.assertEqual((status, body), (503, {"status": "STARTING"}))
+        check_catalog.assert_not_called()
+
+    def test_generate_wod(self):
+        status, headers, body = call("POST", "/wod", json.dumps({"excluded_exercise_ids": [1, 2]}).encode(), self.token())
+
+        self.assertEqual(status, 200)
+        self.assertEqual(headers[b"content-type"], b"application/json")
+        ids = [exercise["id"] for exercise in body["exercises"]]
+        self.assertEqual(len(ids), 6)
+        self.assertFalse({1, 2} & set(ids))
+
+    def test_equipment_from_query(self):
+        status, _, body = call("GET", "/fitness/wod", token=self.token(), query=b"equipment=none")
+
+        self.assertEqual(status, 200)
+        self.assertNotIn(100, [exercise["id"] for exercise in body["exercises"]])
+
+    def test_requires_valid_token(self):
+        self.assertEqual(call("POST", "/wod")[0], 401)
+        self.assertEqual(call("POST", "/wod", token="not-a-token")[0], 401)
+        expired = self.token(exp=datetime.datetime.now(datetime.UTC) - datetime.timedelta(minutes=1))
+        self.assertEqual(call("POST", "/wod", token=expired)[2], {"msg": "Token has expired"})
+
+    def test_invalid_request(self):
+        status, _, _ = call("POST", "/wod", json.dumps({"excluded_exercise_ids": "all"}).encode(), self.token())
+
+        self.assertEqual(status, 400)
+
+    def test_generation_error(self):
+        with patch.object(asgi, "generate_wod_json", side_effect=RuntimeError("secret internals")), \
+                patch.object(asgi, "_pool", ThreadPoolExecutor(1)):
+            status, _, body = call("POST", "/wod", b"{}", self.token())
+
+        self.assertEqual((status, body), (500, {"error": "WOD generation failed"}))
+
+    def test_broken_pool(self):
+        with patch.object(asgi, "generate_wod_json", side_effect=BrokenProcessPool("worker died")), \
+                patch.object(asgi, "_pool", ThreadPoolExecutor(1)):
+            status, _, body = call("POST", "/wod", b"{}", self.token())
+            # Replaced on the next request
+            self.assertIsNone(asgi._pool)
+
+        self.assertEqual((status, body), (503, {"error": "WOD workers unavailable"}))
+
+    def test_unknown_route(self):
+        self.assertEqual(call("GET", "/nope")[0], 404)
+        self.assertEqual(call("GET", "/wod")[0], 405)
+
+if __name__ == '__main__':
+    unittest.main()
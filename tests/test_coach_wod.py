@@ -0,0 +1,348 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'coach_microservice')))
+import unittest
+import json
+import hashlib
+import random
+import struct
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from unittest import mock
+from src.fit.models_dto import Exercise, MuscleGroup, MuscleGroupWithPrimary
+from src.fit.services.catalog_service import Catalog
+from src.fit.services.catalog_snapshot import export_catalog_snapshot, snapshot_document
+from src.fit.services import catalog_snapshot_format as fit_format
+from src.fit.services.catalog_snapshot_format import SnapshotReader, SnapshotFormatError
+from pydantic import ValidationError
+from models.models_dto import WODRequest, WODResponse
+from services import catalog_snapshot_format as coach_format
+from services.catalog_store import CatalogStore
+from services.wod_service import CatalogUnavailable, WODService, WOD_SIZE
+from services.batch_service import BatchWODService, render_lines
+from services.health_checks import HealthMonitor
+
+MUSCLE_GROUPS = [
+    MuscleGroup(id=1, name="Pectoralis Major", body_part="Chest"),
+    MuscleGroup(id=2, name="Triceps Brachii", body_part="Arms"),
+    MuscleGroup(id=3, name="Quadriceps", body_part="Legs"),
+    MuscleGroup(id=4, name="Latissimus Dorsi", body_part="Back"),
+]
+
+def make_exercise(exercise_id, primary, equipment="None", difficulty=3):
+    mg = MUSCLE_GROUPS[primary - 1]
+    return Exercise(
+        id=exercise_id, name=f"Exercise {exercise_id}", description="", difficulty=difficulty, equipment=equipment,
+        muscle_groups=[MuscleGroupWithPrimary(**mg.model_dump(), is_primary=True)]
+    )
+
+def make_catalog(count=8):
+    exercises = [make_exercise(i, primary=i % 4 + 1) for i in range(1, count + 1)]
+    exercises.append(make_exercise(100, primary=1, equipment="Barbell, Bench"))
+    exercises.append(Exercise(id=101, name="Stretching", difficulty=1, equipment="None"))
+    return Catalog(MUSCLE_GROUPS, exercises)
+
+class TestCoachWod(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "catalog.bin")
+        export_catalog_snapshot(self.path, make_catalog())
+        self.store = CatalogStore(self.path, check_interval=0)
+        self.service = WODService(self.store)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def wod_ids(self, **kwargs):
+        wod = self.service.generate_wod(WODRequest(user_id="user@test.com", **kwargs), random.Random(0))
+        return [exercise.id for exercise in wod.exercises]
+
+    def test_snapshot_contents(self):
+        with SnapshotReader(self.path) as reader:
+            document = reader.to_document()
+
+        barbell = next(exercise for exercise in document["exercises"] if exercise["id"] == 100)
+        self.assertEqual(barbell["requirements"], [["barbell"], ["bench"]])
+        self.assertAlmostEqual(barbell["muscle_groups"][0]["intensity"], 0.6)
+
+    def test_binary_snapshot_roundtrip(self):
+        expected = snapshot_document(make_catalog())
+        with SnapshotReader(self.path) as reader:
+            document = reader.to_document()
+
+        self.assertEqual(document["version"], expected["version"])
+        self.assertEqual(document["muscle_groups"], expected["muscle_groups"])
+        self.assertEqual(document["exercises"], expected["exercises"])
+
+    def test_json_snapshot(self):
+        path = os.path.join(self.tmp.name, "catalog.json")
+        export_catalog_snapshot(path, make_catalog())
+        with open(path) as file:
+            self.assertEqual(json.load(file)["version"], self.store.get().version)
+
+        index = CatalogStore(path, check_interval=0).get()
+        self.assertEqual(list(index.names), list(self.store.get().names))
+
+    def test_rejects_other_files(self):
+        path = os.path.join(self.tmp.name, "garbage.bin")
+        with open(path, "wb") as file:
+            file.write(b"NOPE" + bytes(100))
+
+        with self.assertRaises(SnapshotFormatError):
+            SnapshotReader(path)
+
+    def test_always_returns_full_wod(self):
+        for seed in range(20):
+            wod = self.service.generate_wod(WODRequest(user_id="user@test.com"), random.Random(seed))
+            ids = [exercise.id for exercise in wod.exercises]
+            self.assertEqual(len(set(ids)), WOD_SIZE)
+            self.assertNotIn(101, ids)
+
+    def test_excluded_exercises(self):
+        ids = self.wod_ids(excluded_exercise_ids=[1, 2, 3])
+
+        self.assertFalse({1, 2, 3} & set(ids))
+
+    def test_excluded_fallback_when_too_few_remain(self):
+        ids = self.wod_ids(excluded_exercise_ids=list(range(1, 9)))
+
+        self.assertEqual(len(ids), WOD_SIZE)
+
+    def test_equipment_filter(self):
+        self.assertNotIn(100, self.wod_ids(equipment_available=[], excluded_exercise_ids=list(range(1, 5))))
+        self.assertIn(100, self.wod_ids(equipment_available=["Barbell", "bench"], excluded_exercise_ids=list(range(1, 5))))
+
+    def test_response_matches_validated_model(self):
+        body = self.service.generate_wod(WODRequest(user_id="user@test.com"), random.Random(0)).model_dump_json()
+
+        self.assertEqual(WODResponse.model_validate_json(body).model_dump_json(), body)
+
+    def test_muscle_group_impacts_shared_and_frozen(self):
+        first = self.service.generate_wod(WODRequest(user_id="user@test.com", excluded_exercise_ids=[1, 2]), random.Random(0))
+        second = self.service.generate_wod(WODRequest(user_id="user@test.com", excluded_exercise_ids=[1, 2]), random.Random(0))
+
+        self.assertIs(first.exercises[0].muscle_groups[0], second.exercises[0].muscle_groups[0])
+        with self.assertRaises(ValidationError):
+            first.exercises[0].muscle_groups[0].intensity = 0.0
+
+    def test_templates_follow_the_request_index(self):
+        # Requests straddling a snapshot reload hold different indexes
+        path = os.path.join(self.tmp.name, "other.bin")
+        export_catalog_snapshot(path, make_catalog(count=12))
+        old, new = self.store.get(), CatalogStore(path, check_interval=0).get()
+
+        for index in (old, new, old, new):
+            templates = self.service._get_templates(index)
+            self.assertEqual(len(templates), len(index.impacts))
+            self.assertEqual([[mg.id for mg in impacts] for impacts in templates], [[mg_id for mg_id, _, _ in impacts] for impacts in index.impacts])
+
+    def test_spreads_primary_muscle_groups(self):
+        wod = self.service.generate_wod(WODRequest(user_id="user@test.com"), random.Random(3))
+
+        primaries = [mg.id for exercise in wod.exercises[:4] for mg in exercise.muscle_groups if mg.is_primary]
+        self.assertEqual(sorted(primaries), [1, 2, 3, 4])
+
+    def test_reloads_changed_snapshot(self):
+        old_version = self.store.get().version
+        export_catalog_snapshot(self.path, make_catalog(count=12))
+        os.utime(self.path, ns=(0, os.stat(self.path).st_mtime_ns + 1_000_000))
+
+        index = self.store.get()
+        self.assertNotEqual(index.version, old_version)
+        self.assertEqual(len(index.ids), 13)
+        wod = self.service.generate_wod(WODRequest(user_id="user@test.com", excluded_exercise_ids=list(range(1, 9))), random.Random(0))
+        self.assertTrue({9, 10, 11, 12} & {exercise.id for exercise in wod.exercises})
+
+    def test_missing_snapshot(self):
+        service = WODService(CatalogStore(os.path.join(self.tmp.name, "missing.json"), check_interval=0))
+
+        with self.assertRaises(CatalogUnavailable):
+            service.generate_wod(WODRequest(user_id="user@test.com"))
+
+class TestSnapshotFormatCompatibility(unittest.TestCase):
+    """
+    The fit app writes snapshots with its copy of the format module, the
+    coach service reads them with its vendored copy
+    """
+    VERSION = "0123456789abcdef"
+    MUSCLE_GROUPS = [(1, "Pectoralis Major", "Chest"), (2, "Triceps Brachii", "Arms")]
+    EXERCISES = [
+        {"id": 1, "name": "Push-ups", "description": None, "difficulty": 2, "requirements": [],
+         "muscle_groups": [{"id": 1, "is_primary": True, "intensity": 0.48}, {"id": 2, "is_primary": False, "intensity": 0.32}]},
+        {"id": 2, "name": "Bench Press", "description": "Barbell press", "difficulty": 3, "requirements": [["barbell", "dumbbells"], ["bench"]],
+         "muscle_groups": [{"id": 1, "is_primary": True, "intensity": 0.72}]},
+    ]
+    # Digest of the encoding of the catalog above. A layout change must bump
+    # FORMAT_VERSION in both copies, then update this digest.
+    FORMAT_VERSION = 1
+    DIGEST = "b91d7d1108b4792e9e59487d3d4e329f30784ef88db9e2bbba46cb7e678b5409"
+
+    def roundtrip(self, encoder, reader_class):
+        body = encoder.encode_snapshot(self.VERSION, self.MUSCLE_GROUPS, self.EXERCISES)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "catalog.bin")
+            with open(path, "wb") as file:
+                file.write(body)
+            with reader_class(path) as reader:
+                return reader.to_document()
+
+    def test_pinned_format(self):
+        for module in (fit_format, coach_format):
+            body = module.encode_snapshot(self.VERSION, self.MUSCLE_GROUPS, self.EXERCISES)
+            self.assertEqual(module.FORMAT_VERSION, self.FORMAT_VERSION)
+            self.assertEqual(hashlib.sha256(body).hexdigest(), self.DIGEST)
+
+    def test_cross_roundtrip(self):
+        expected = {
+            "version": self.VERSION,
+            "muscle_groups": [dict(zip(("id", "name", "body_part"), mg)) for mg in self.MUSCLE_GROUPS],
+            "exercises": self.EXERCISES,
+        }
+        for encoder, reader in ((fit_format, coach_format), (coach_format, fit_format)):
+            self.assertEqual(self.roundtrip(encoder, reader.SnapshotReader), expected)
+
+    def test_copies_in_sync(self):
+        root = os.path.join(os.path.dirname(__file__), '..', 'src')
+        with open(os.path.join(root, 'fit', 'services', 'catalog_snapshot_format.py')) as fit_copy:
+            with open(os.path.join(root, 'coach_microservice', 'services', 'catalog_snapshot_format.py')) as coach_copy:
+                self.assertEqual(fit_copy.read(), coach_copy.read())
+
+    def test_readers_reject_other_format_versions(self):
+        body = bytearray(fit_format.encode_snapshot(self.VERSION, self.MUSCLE_GROUPS, self.EXERCISES))
+        struct.pack_into("<H", body, 4, self.FORMAT_VERSION + 1)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "catalog.bin")
+            with open(path, "wb") as file:
+                file.write(body)
+            for module in (fit_format, coach_format):
+                with self.assertRaises(module.SnapshotFormatError):
+                    module.SnapshotReader(path)
+
+class TestCoachWodBatch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmp.name, "catalog.bin")
+        export_catalog_snapshot(cls.path, make_catalog())
+        cls.service = WODService(CatalogStore(cls.path, check_interval=0))
+        cls.batch_service = BatchWODService(cls.service, cls.path, workers=2, chunk_size=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.batch_service.close()
+        cls.tmp.cleanup()
+
+    def requests(self, count):
+        return [WODRequest(user_id=f"member{i}@gym.com", excluded_exercise_ids=[i % 8 + 1]) for i in range(count)]
+
+    def test_batch_across_workers_keeps_order(self):
+        lines = [json.loads(line) for line in self.batch_service.generate(self.requests(7))]
+
+        self.assertEqual([line["index"] for line in lines], list(range(7)))
+        for i, line in enumerate(lines):
+            ids = [exercise["id"] for exercise in line["wod"]["exercises"]]
+            self.assertEqual(len(ids), WOD_SIZE)
+            self.assertNotIn(i % 8 + 1, ids)
+
+    def test_small_batch_runs_inline(self):
+        lines = list(BatchWODService(self.service, self.path, workers=2, chunk_size=16).generate(self.requests(3)))
+
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(all(line.endswith(b"\n") for line in lines))
+
+    def test_pending_requests(self):
+        lines = self.batch_service.generate(self.requests(7))
+        next(lines)
+
+        # The first chunk (2 requests) is done
+        self.assertEqual(self.batch_service.stats()["pending_requests"], 5)
+        lines.close()
+        self.assertEqual(self.batch_service.stats()["pending_requests"], 0)
+
+    def test_failing_request_gets_error_line(self):
+        def generate_wod(wod_request):
+            if wod_request.user_id == "member1@gym.com":
+                raise ValueError("bad request")
+            return self.service.generate_wod(wod_request)
+
+        service = mock.Mock(generate_wod=generate_wod)
+
+        lines = [json.loads(line) for line in render_lines(service, 0, self.requests(3))]
+
+        self.assertEqual([line["index"] for line in lines], [0, 1, 2])
+        self.assertIn("wod", lines[0])
+        self.assertEqual(lines[1]["error"], "ValueError: bad request")
+        self.assertIn("wod", lines[2])
+
+    def test_failing_chunk_gets_error_lines(self):
+        def generate_chunk(start, requests):
+            if start == 2:
+                raise BrokenProcessPool("worker died")
+            return render_lines(self.service, start, requests)
+
+        batch_service = BatchWODService(self.service, self.path, workers=2, chunk_size=2)
+        batch_service._pool = ThreadPoolExecutor(2)
+        with mock.patch("services.batch_service._generate_chunk", generate_chunk):
+            lines = [json.loads(line) for line in batch_service.generate(self.requests(7))]
+        batch_service.close()
+
+        self.assertEqual([line["index"] for line in lines], list(range(7)))
+        self.assertEqual([line["index"] for line in lines if "error" in line], [2, 3])
+        self.assertEqual(lines[2]["error"], "BrokenProcessPool: worker died")
+        self.assertEqual(batch_service.stats()["pending_requests"], 0)
+
+class TestCoachHealthMonitor(unittest.TestCase):
+    def test_ready_when_all_checks_up(self):
+        monitor = HealthMonitor({"catalog": lambda: {"status": "UP"}}, interval=60)
+        self.assertEqual(monitor.readiness(), ({"status": "STARTING"}, 503))
+
+        monitor.refresh()
+        body, status = monitor.readiness()
+
+        self.assertEqual((status, body["status"]), (200, "UP"))
+
+    def test_failing_check(self):
+        def check_catalog():
+            raise OSError("volume not mounted")
+        monitor = HealthMonitor({"catalog": check_catalog, "workers": lambda: {"status": "UP"}}, interval=60)
+        monitor.refresh()
+        body, status = monitor.readiness()
+
+        self.assertEqual((status, body["status"]), (503, "DOWN"))
+        self.assertEqual(body["checks"]["catalog"]["error"], "volume not mounted")
+
+    def test_stale_results(self):
+        monitor = HealthMonitor({"catalog": lambda: {"status": "UP"}}, interval=1)
+        monitor.refresh()
+        monitor.checked_at -= 10
+
+        self.assertEqual(monitor.readiness()[0]["status"], "STALE")
+
+class TestCoachFlaskApp(unittest.TestCase):
+    def setUp(self):
+        import app as coach_app
+        from flask_jwt_extended import create_access_token
+        self.coach_app = coach_app
+        self.client = coach_app.app.test_client()
+        with coach_app.app.app_context():
+            self.headers = {"Authorization": f"Bearer {create_access_token(identity='user@test.com')}"}
+
+    def test_invalid_request(self):
+        response = self.client.post('/wod', json={"goals": "strength"}, headers=self.headers)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()["error"], "Invalid WOD request")
+        response = self.client.post('/wod', json=[1, 2], headers=self.headers)
+        self.assertEqual((response.status_code, response.get_json()), (400, {"error": "Expected a JSON object"}))
+
+    def test_internal_error(self):
+        with mock.patch.object(self.coach_app.wod_service, "generate_wod", side_effect=KeyError("exercise 42")):
+            response = self.client.post('/wod', json={}, headers=self.headers)
+
+        # A server error, without the internal message
+        self.assertEqual((response.status_code, response.get_json()), (500, {"error": "WOD generation failed"}))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,345 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import unittest
+import gzip
+import json
+import datetime
+from unittest.mock import patch
+from sqlalchemy import event
+from src.fit.app import app
+from src.fit.database import init_db, db_session
+from src.fit.models_db import Base, MuscleGroupModel, ExerciseModel, ExerciseHistoryModel, exercise_muscle_groups
+from src.fit.services import fitness_service
+from src.fit.services.catalog_service import get_catalog, invalidate_catalog
+from src.fit.services.auth_service import create_access_token
+from src.fit.services.fitness_coach_service import muscle_group_intensity, calculate_intensity, wod_rng, PRIMARY_INTENSITY_FACTOR
+from src.fit.models_dto import WodResponseSchema
+from src.fit.services.wod_cache import wod_cache
+from src.fit.services.wod_selector import fatigue_store
+
+class TestFitnessAPI(unittest.TestCase):
+    def setUp(self):
+        # Configure the app for testing
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+
+        # Set up test database with a small catalog
+        init_db()
+        self.db = db_session()
+        self.db.add_all([
+            MuscleGroupModel(id=1, name="Pectoralis Major", body_part="Chest", description="Chest muscle"),
+            MuscleGroupModel(id=2, name="Triceps Brachii", body_part="Arms", description="Back of the arm"),
+            MuscleGroupModel(id=3, name="Quadriceps", body_part="Legs", description="Front of the thigh"),
+            ExerciseModel(id=1, name="Push-ups", description="Bodyweight push", difficulty=2,
+                          equipment="None", instructions="Lower your chest to the floor and push back up"),
+            ExerciseModel(id=2, name="Bench Press", description="Barbell press on a bench", difficulty=3,
+                          equipment="Barbell, Bench", instructions="Lower the barbell to your chest and press"),
+            ExerciseModel(id=3, name="Squats", description="Knee dominant leg exercise", difficulty=3,
+                          equipment="Barbell (optional)", instructions="Bend your knees and stand back up"),
+        ])
+        self.db.flush()
+        self.db.execute(exercise_muscle_groups.insert(), [
+            {"exercise_id": 1, "muscle_group_id": 1, "is_primary": True},
+            {"exercise_id": 1, "muscle_group_id": 2, "is_primary": False},
+            {"exercise_id": 2, "muscle_group_id": 1, "is_primary": True},
+            {"exercise_id": 2, "muscle_group_id": 2, "is_primary": False},
+            {"exercise_id": 3, "muscle_group_id": 3, "is_primary": True},
+        ])
+        self.db.commit()
+        invalidate_catalog()
+
+        self.user_token = create_access_token(
+            data={"sub": "user@test.com", "role": "user"},
+            expires_delta=datetime.timedelta(minutes=30)
+        )
+
+    def tearDown(self):
+        # Clean up the database after each test
+        invalidate_catalog()
+        wod_cache.clear()
+        fatigue_store.invalidate("user@test.com")
+        self.db.close()
+        Base.metadata.drop_all(bind=self.db.get_bind())
+
+    def test_get_exercises(self):
+        response = self.client.get('/fitness/exercises')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content_type, 'application/json')
+        self.assertIsNotNone(response.headers.get('ETag'))
+        data = json.loads(response.data)
+        self.assertEqual([ex['name'] for ex in data], ["Push-ups", "Bench Press", "Squats"])
+        self.assertEqual(data[0]['muscle_groups'][0]['name'], "Pectoralis Major")
+        self.assertTrue(data[0]['muscle_groups'][0]['is_primary'])
+
+    def test_get_exercises_gzip(self):
+        plain = self.client.get('/fitness/exercises')
+        response = self.client.get('/fitness/exercises', headers={'Accept-Encoding': 'gzip'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers.get('Content-Encoding'), 'gzip')
+        self.assertNotEqual(response.headers['ETag'], plain.headers['ETag'])
+        self.assertEqual(gzip.decompress(response.data), plain.data)
+
+    def test_get_exercises_cache_headers(self):
+        response = self.client.get('/fitness/exercises')
+
+        self.assertIn('public', response.headers['Cache-Control'])
+        self.assertIn('max-age=', response.headers['Cache-Control'])
+        self.assertTrue(response.headers['ETag'].strip('"').startswith(response.headers['X-Catalog-Version']))
+
+    def test_get_exercise_not_modified(self):
+        first = self.client.get('/fitness/exercises/1')
+        response = self.client.get('/fitness/exercises/1', headers={'If-None-Match': first.headers['ETag']})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        self.assertEqual(response.headers['ETag'], first.headers['ETag'])
+
+    def test_get_exercise_not_modified_weak_etag(self):
+        first = self.client.get('/fitness/exercises/1')
+        response = self.client.get('/fitness/exercises/1', headers={'If-None-Match': 'W/' + first.headers['ETag']})
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_get_exercise_modified_after_catalog_change(self):
+        first = self.client.get('/fitness/exercises/1')
+        self.db.query(ExerciseModel).filter(ExerciseModel.id == 3).update({"difficulty": 4})
+        self.db.commit()
+        invalidate_catalog()
+
+        response = self.client.get('/fitness/exercises/1', headers={'If-None-Match': first.headers['ETag']})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], first.headers['ETag'])
+
+    def test_get_exercises_by_muscle_group(self):
+        response = self.client.get('/fitness/exercises?muscle_group_id=2')
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual([ex['id'] for ex in data], [1, 2])
+
+    def test_get_exercises_by_unknown_muscle_group(self):
+        response = self.client.get('/fitness/exercises?muscle_group_id=42')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn("exercises-mg-42", get_catalog()._payloads)
+
+    def test_get_exercise_gzip(self):
+        # Large enough to be precompressed
+        self.db.query(ExerciseModel).filter(ExerciseModel.id == 1).update({"instructions": "Keep a straight line. " * 40})
+        self.db.commit()
+        invalidate_catalog()
+
+        plain = self.client.get('/fitness/exercises/1')
+        response = self.client.get('/fitness/exercises/1', headers={'Accept-Encoding': 'gzip'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers.get('Content-Encoding'), 'gzip')
+        self.assertEqual(gzip.decompress(response.data), plain.data)
+
+    def test_get_exercise(self):
+        response = self.client.get('/fitness/exercises/2')
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(data['name'], "Bench Press")
+        self.assertEqual(len(data['muscle_groups']), 2)
+
+    def test_get_exercise_not_found(self):
+        response = self.client.get('/fitness/exercises/42')
+
+        self.assertEqual(response.status_code, 404)
+        data = json.loads(response.data)
+        self.assertIn('error', data)
+
+    def test_search_exercises_by_text(self):
+        response = self.client.get('/fitness/exercises/search?q=chest pre')
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual([ex['name'] for ex in data], ["Bench Press"])
+
+    def test_search_exercises_by_facets(self):
+        response = self.client.get('/fitness/exercises/search?difficulty=3&equipment=barbell&body_part=chest,legs')
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual([ex['name'] for ex in data], ["Bench Press", "Squats"])
+
+    def test_search_exercises_by_muscle_group_name(self):
+        response = self.client.get('/fitness/exercises/search?muscle_group=Triceps Brachii&equipment=none')
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual([ex['name'] for ex in data], ["Push-ups"])
+
+    def test_search_exercises_list_with_blanks(self):
+        response = self.client.get('/fitness/exercises/search?muscle_group=Triceps Brachii, Quadriceps,&difficulty= 3')
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual([ex['name'] for ex in data], ["Bench Press", "Squats"])
+
+    def test_search_exercises_invalid_difficulty(self):
+        response = self.client.get('/fitness/exercises/search?difficulty=hard')
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_exercise_lookups_read_the_catalog(self):
+        catalog = get_catalog()
+        statements = []
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = self.db.get_bind()
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            exercises = fitness_service.get_all_exercises()
+            exercise = fitness_service.get_exercise_by_id(2)
+            missing = fitness_service.get_exercise_by_id(42)
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+
+        self.assertEqual(statements, [])
+        self.assertEqual(exercises, list(catalog.exercises))
+        self.assertIs(exercise, catalog.exercises_by_id[2])
+        self.assertEqual([mg.name for mg in exercise.muscle_groups], ["Pectoralis Major", "Triceps Brachii"])
+        self.assertIsNone(missing)
+
+    def test_get_muscle_groups(self):
+        response = self.client.get('/fitness/muscle-groups')
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual([mg['name'] for mg in data], ["Pectoralis Major", "Triceps Brachii", "Quadriceps"])
+
+    def test_get_muscle_group(self):
+        response = self.client.get('/fitness/muscle-groups/3')
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(data['body_part'], "Legs")
+        self.assertNotIn('exercises', data)
+
+    def test_get_muscle_group_with_exercises(self):
+        response = self.client.get('/fitness/muscle-groups/1?include=exercises')
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(data['name'], "Pectoralis Major")
+        self.assertEqual([ex['name'] for ex in data['exercises']], ["Push-ups", "Bench Press"])
+
+    def test_get_muscle_group_not_found(self):
+        response = self.client.get('/fitness/muscle-groups/42')
+
+        self.assertEqual(response.status_code, 404)
+
+    @patch('src.fit.services.fitness_coach_service.heavy_computation')
+    def test_get_wod(self, heavy_computation):
+        response = self.client.get('/fitness/wod', headers={'Authorization': f'Bearer {self.user_token}'})
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(sorted(ex['id'] for ex in data['exercises']), [1, 2, 3])
+        # The response is assembled from cached fragments; it must still match the schema
+        wod = WodResponseSchema.model_validate(data)
+        for exercise in wod.exercises:
+            self.assertTrue(5.0 <= exercise.suggested_weight <= 50.0)
+            self.assertTrue(8 <= exercise.suggested_reps <= 15)
+            for mg in exercise.muscle_groups:
+                self.assertAlmostEqual(mg.intensity, muscle_group_intensity(exercise.difficulty, mg.is_primary))
+
+    @patch('src.fit.services.fitness_coach_service.heavy_computation')
+    def test_get_wod_with_equipment(self, heavy_computation):
+        response = self.client.get(
+            '/fitness/wod?equipment=none',
+            headers={'Authorization': f'Bearer {self.user_token}'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        # Bench Press needs a barbell and a bench, the barbell is optional for squats
+        self.assertEqual(sorted(ex['id'] for ex in data['exercises']), [1, 3])
+
+    @patch('src.fit.services.fitness_coach_service.WOD_MODE', "deterministic")
+    @patch('src.fit.services.fitness_coach_service.WOD_SIZE', 1)
+    @patch('src.fit.services.fitness_coach_service.heavy_computation')
+    def test_get_wod_deterministic(self, heavy_computation):
+        headers = {'Authorization': f'Bearer {self.user_token}'}
+        first = json.loads(self.client.get('/fitness/wod', headers=headers).data)
+        second = json.loads(self.client.get('/fitness/wod', headers=headers).data)
+
+        self.assertEqual([ex['id'] for ex in first['exercises']], [1])
+        self.assertEqual(first['exercises'], second['exercises'])
+
+        # Push-ups three days ago: the chest is fatigued, the legs are rested
+        performed_at = datetime.datetime.now() - datetime.timedelta(days=3)
+        self.client.post('/fitness/exercises/history', headers=headers, json={
+            "exercise_id": 1, "performed_at": performed_at.isoformat(), "duration_minutes": 10, "reps": 20
+        })
+        # Only yesterday's history is part of the cache key
+        wod_cache.clear()
+        data = json.loads(self.client.get('/fitness/wod', headers=headers).data)
+
+        self.assertEqual([ex['id'] for ex in data['exercises']], [3])
+
+    @patch('src.fit.services.fitness_coach_service.heavy_computation')
+    def test_get_wod_cached_until_history_changes_exclusions(self, heavy_computation):
+        headers = {'Authorization': f'Bearer {self.user_token}'}
+        first = self.client.get('/fitness/wod', headers=headers).data
+        self.client.post('/fitness/exercises/history', headers=headers, json={
+            "exercise_id": 1, "performed_at": datetime.datetime.now().isoformat(), "duration_minutes": 1.0, "reps": 5
+        })
+        second = self.client.get('/fitness/wod', headers=headers).data
+
+        self.assertEqual(first, second)
+        self.assertEqual(heavy_computation.call_count, 1)
+
+        yesterday = datetime.datetime.now() - datetime.timedelta(days=1)
+        self.client.post('/fitness/exercises/history', headers=headers, json={
+            "exercise_id": 1, "performed_at": yesterday.isoformat(), "duration_minutes": 1.0, "reps": 5
+        })
+        self.client.get('/fitness/wod', headers=headers)
+
+        self.assertEqual(heavy_computation.call_count, 2)
+
+    @patch('src.fit.services.fitness_coach_service.heavy_computation')
+    def test_get_wod_not_stale_after_history_logged_elsewhere(self, heavy_computation):
+        headers = {'Authorization': f'Bearer {self.user_token}'}
+        self.client.get('/fitness/wod', headers=headers)
+
+        # Written by another worker: this process's cache is not invalidated
+        self.db.add(ExerciseHistoryModel(
+            user_email="user@test.com", exercise_id=1, performed_at=datetime.datetime.now() - datetime.timedelta(days=1), reps=5
+        ))
+        self.db.commit()
+        self.client.get('/fitness/wod', headers=headers)
+        self.client.get('/fitness/wod', headers=headers)
+
+        self.assertEqual(heavy_computation.call_count, 2)
+
+    def test_wod_rng(self):
+        day = datetime.date(2026, 3, 2)
+        same = [wod_rng("user@test.com", day, "v1", mode="deterministic").random() for _ in range(2)]
+
+        self.assertEqual(same[0], same[1])
+        self.assertNotEqual(same[0], wod_rng("user@test.com", day + datetime.timedelta(days=1), "v1", mode="deterministic").random())
+        self.assertNotEqual(same[0], wod_rng("user@test.com", day, "v2", mode="deterministic").random())
+        with self.assertRaises(ValueError):
+            wod_rng("user@test.com", day, "v1", mode="replay")
+
+    def test_intensity_table(self):
+        for difficulty in range(1, 6):
+            self.assertAlmostEqual(muscle_group_intensity(difficulty, True), calculate_intensity(difficulty) * PRIMARY_INTENSITY_FACTOR)
+
+    def test_get_wod_unauthorized(self):
+        response = self.client.get('/fitness/wod')
+
+        self.assertEqual(response.status_code, 401)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import unittest
+import json
+import threading
+import time
+from unittest.mock import Mock, patch
+from src.fit.app import app
+from src.fit.database import init_db, db_session
+from src.fit.models_db import Base
+from src.fit.services.admission_service import ConcurrencyLimiter, wod_limiter
+from src.fit.services.catalog_service import get_catalog, invalidate_catalog
+from src.fit.services import health_checks
+from src.fit.services.health_service import HealthMonitor, health_monitor
+
+class TestHealth(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+        init_db()
+        get_catalog()
+        health_monitor.refresh()
+
+    def tearDown(self):
+        invalidate_catalog()
+        db_session.remove()
+        Base.metadata.drop_all(bind=db_session().get_bind())
+
+    def test_live(self):
+        response = self.client.get('/health/live')
+
+        self.assertEqual((response.status_code, json.loads(response.data)), (200, {"status": "UP"}))
+
+    def test_ready(self):
+        response = self.client.get('/health/ready')
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(data['status'], "UP")
+        self.assertEqual(data['checks']['database']['status'], "UP")
+        self.assertEqual(data['checks']['catalog']['status'], "WARM")
+        self.assertEqual(set(data['checks']['pools']), {"wod", "catalog", "auth"})
+        self.assertEqual(data['wod_backlog'], {"active": 0, "waiting": 0})
+        self.assertEqual(self.client.get('/health').status_code, 200)
+
+    def test_probes_read_cached_checks(self):
+        with patch.dict(health_monitor.checks, database=Mock()) as checks:
+            self.client.get('/health/ready')
+            check_database = checks["database"]
+
+        check_database.assert_not_called()
+
+    def test_saturated_replica_is_drained(self):
+        with patch.multiple(wod_limiter, active=wod_limiter.max_concurrent, waiting=wod_limiter.max_queue):
+            response = self.client.get('/health/ready')
+
+        self.assertEqual(response.status_code, 503)
+        data = json.loads(response.data)
+        self.assertEqual(data['status'], "SATURATED")
+        self.assertTrue(data['checks']['pools']['wod']['saturated'])
+
+    def test_database_unreachable(self):
+        with patch('src.fit.services.health_service.db_session') as session:
+            session.return_value.execute.side_effect = RuntimeError("connection refused")
+            health_monitor.refresh()
+        response = self.client.get('/health/ready')
+
+        self.assertEqual(response.status_code, 503)
+        data = json.loads(response.data)
+        self.assertEqual(data['status'], "DOWN")
+        self.assertIn("connection refused", data['checks']['database']['error'])
+        self.assertEqual(self.client.get('/health/live').status_code, 200)
+
+    def test_cold_catalog(self):
+        invalidate_catalog()
+        health_monitor.refresh()
+
+        self.assertEqual(json.loads(self.client.get('/health/ready').data)['status'], "COLD")
+
+    def test_stale_checks(self):
+        monitor = HealthMonitor(interval=5)
+        monitor.refresh()
+        monitor.checked_at -= 60
+
+        with patch.object(monitor, 'start'):
+            self.assertEqual(monitor.readiness()[0]['status'], "STALE")
+
+    def test_starting_until_first_checks(self):
+        monitor = HealthMonitor(interval=5)
+
+        with patch.dict(monitor.checks, database=Mock()) as checks:
+            body, status = monitor.readiness()
+            check_database = checks["database"]
+
+        self.assertEqual((status, body['status']), (503, "STARTING"))
+        check_database.assert_not_called()
+        self.assertIsNone(monitor._thread)
+
+    def test_start_runs_checks_in_background(self):
+        checked = threading.Event()
+        release = threading.Event()
+
+        def check():
+            checked.set()
+            release.wait(5)
+            return {"status": "UP"}
+
+        monitor = health_checks.HealthMonitor({"dependency": check}, interval=60)
+        monitor.start()
+        try:
+            # start() returned while the first checks are still running
+            self.assertTrue(checked.wait(5))
+            self.assertEqual(monitor.readiness(), ({"status": "STARTING"}, 503))
+        finally:
+            release.set()
+        deadline = time.monotonic() + 5
+        while monitor.last_results()[0] is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(monitor.readiness()[1], 200)
+
+    def test_copies_in_sync(self):
+        # The microservices vendor the monitor, see health_checks
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        with open(health_checks.__file__, "rb") as file:
+            canonical = file.read()
+        for service in ("user_microservice", "coach_microservice"):
+            with open(os.path.join(root, "src", service, "services", "health_checks.py"), "rb") as file:
+                self.assertEqual(file.read(), canonical, service)
+
+    def test_utilization(self):
+        limiter = ConcurrencyLimiter("test", max_concurrent=2, max_queue=2, queue_timeout=0.01, retry_after=1)
+        limiter.acquire()
+
+        self.assertEqual(limiter.utilization(), 0.25)
+
+if __name__ == '__main__':
+    unittest.main()
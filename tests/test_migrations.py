@@ -0,0 +1,122 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import unittest
+import shutil
+import tempfile
+from sqlalchemy import inspect, text
+from src.fit.database import init_db, db_session, get_engine
+from src.fit.models_db import Base
+from src.fit.services.migration_service import (
+    MIGRATIONS_DIR, discover_migrations, migration_status, run_migrations, schema_version, sql_statements
+)
+
+class TestMigrations(unittest.TestCase):
+    def setUp(self):
+        self.engine = get_engine()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        db_session.remove()
+        with self.engine.begin() as connection:
+            connection.execute(text("DROP TABLE IF EXISTS migration_test"))
+        schema_version.drop(self.engine, checkfirst=True)
+        Base.metadata.drop_all(bind=self.engine)
+
+    def count(self, table):
+        with self.engine.connect() as connection:
+            return connection.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+
+    def write_migration(self, filename, content):
+        with open(os.path.join(self.directory, filename), "w") as file:
+            file.write(content)
+
+    def test_fresh_database(self):
+        applied = run_migrations(self.engine)
+
+        self.assertEqual([migration.version for migration in applied], [1, 2, 3])
+        self.assertGreater(self.count("exercises"), 0)
+        self.assertGreater(self.count("muscle_groups"), 0)
+        indexes = [index["name"] for index in inspect(self.engine).get_indexes("exercise_history")]
+        self.assertIn("ix_exercise_history_user_performed_at", indexes)
+        self.assertTrue(all(migration["applied"] for migration in migration_status(self.engine)))
+
+    def test_schema_matches_models(self):
+        run_migrations(self.engine)
+
+        # A model change without its migration fails here
+        inspector = inspect(self.engine)
+        for table in Base.metadata.sorted_tables:
+            columns = {column["name"]: column for column in inspector.get_columns(table.name)}
+            self.assertEqual(set(columns), set(table.columns.keys()), table.name)
+            for column in table.columns:
+                self.assertEqual(columns[column.name]["nullable"], column.nullable, f"{table.name}.{column.name}")
+
+    def test_baseline_is_frozen(self):
+        shutil.copy(os.path.join(MIGRATIONS_DIR, "0001_initial_schema.py"), self.directory)
+
+        run_migrations(self.engine, self.directory)
+
+        # The history index belongs to migration 0003 only
+        indexes = [index["name"] for index in inspect(self.engine).get_indexes("exercise_history")]
+        self.assertNotIn("ix_exercise_history_user_performed_at", indexes)
+
+    def test_applied_once(self):
+        run_migrations(self.engine)
+        exercises = self.count("exercises")
+
+        self.assertEqual(run_migrations(self.engine), [])
+        self.assertEqual(self.count("exercises"), exercises)
+        self.assertEqual(self.count("schema_version"), 3)
+
+    def test_adopts_existing_database(self):
+        # Database created by create_all before the migrations existed
+        init_db()
+
+        applied = run_migrations(self.engine)
+
+        self.assertEqual([migration.version for migration in applied], [1, 2, 3])
+        self.assertGreater(self.count("exercises"), 0)
+
+    def test_sql_migrations(self):
+        self.write_migration("0001_create.sql", "-- Test table\nCREATE TABLE migration_test (id INTEGER PRIMARY KEY, name TEXT);\nINSERT INTO migration_test (name) VALUES ('a;b');\n")
+        self.write_migration("0002_index.sql", "-- migrate: no-transaction\nCREATE INDEX IF NOT EXISTS ix_migration_test_name ON migration_test (name);\n")
+        self.write_migration("README.md", "Not a migration")
+
+        migrations = discover_migrations(self.directory)
+        applied = run_migrations(self.engine, self.directory)
+
+        self.assertEqual([(migration.version, migration.name) for migration in applied], [(1, "create"), (2, "index")])
+        self.assertTrue(migrations[0].transactional)
+        self.assertFalse(migrations[1].transactional)
+        with self.engine.connect() as connection:
+            self.assertEqual(connection.execute(text("SELECT name FROM migration_test")).scalar(), "a;b")
+        indexes = [index["name"] for index in inspect(self.engine).get_indexes("migration_test")]
+        self.assertEqual(indexes, ["ix_migration_test_name"])
+
+    def test_failed_migration_not_recorded(self):
+        self.write_migration("0001_create.sql", "CREATE TABLE migration_test (id INTEGER PRIMARY KEY);\n")
+        self.write_migration("0002_broken.sql", "INSERT INTO migration_test (id) VALUES (1);\nINSERT INTO missing_table (id) VALUES (1);\n")
+
+        with self.assertRaises(Exception):
+            run_migrations(self.engine, self.directory)
+
+        self.assertEqual([migration["applied"] for migration in migration_status(self.engine, self.directory)], [True, False])
+        # The failed migration was rolled back as a whole
+        self.assertEqual(self.count("migration_test"), 0)
+
+    def test_duplicate_versions(self):
+        self.write_migration("0001_create.sql", "SELECT 1;\n")
+        self.write_migration("1_other.sql", "SELECT 1;\n")
+
+        with self.assertRaises(ValueError):
+            discover_migrations(self.directory)
+
+    def test_sql_statements(self):
+        sql = "-- Comment; not a statement\nCREATE TABLE t (\n    id INTEGER\n);\n\nINSERT INTO t VALUES (1);  \n"
+
+        self.assertEqual(sql_statements(sql), ["CREATE TABLE t (\n    id INTEGER\n)", "INSERT INTO t VALUES (1)"])
+
+if __name__ == '__main__':
+    unittest.main()
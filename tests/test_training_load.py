@@ -0,0 +1,275 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import unittest
+import json
+import datetime
+import threading
+from unittest import mock
+from sqlalchemy import event
+from src.fit.app import app
+from src.fit.database import init_db, db_session
+from src.fit.models_db import Base, MuscleGroupModel, ExerciseModel, UserDailyLoadModel, UserDailySummaryModel, exercise_muscle_groups
+from src.fit.services.catalog_service import invalidate_catalog
+from src.fit.services.auth_service import create_access_token
+from src.fit.services import training_load_service
+from src.fit.services.training_load_service import rebuild_user_daily_load, get_training_stats, period_bounds
+
+class TestTrainingLoad(unittest.TestCase):
+    def setUp(self):
+        # Configure the app for testing
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+
+        # Set up test database with two exercises over three muscle groups
+        init_db()
+        self.db = db_session()
+        self.db.add_all([
+            MuscleGroupModel(id=1, name="Pectoralis Major", body_part="Chest"),
+            MuscleGroupModel(id=2, name="Triceps Brachii", body_part="Arms"),
+            MuscleGroupModel(id=3, name="Quadriceps", body_part="Legs"),
+            ExerciseModel(id=1, name="Push-ups", description="Bodyweight push", difficulty=3, equipment="None"),
+            ExerciseModel(id=2, name="Squats", description="Knee dominant", difficulty=5, equipment="None"),
+        ])
+        self.db.flush()
+        self.db.execute(exercise_muscle_groups.insert(), [
+            {"exercise_id": 1, "muscle_group_id": 1, "is_primary": True},
+            {"exercise_id": 1, "muscle_group_id": 2, "is_primary": False},
+            {"exercise_id": 2, "muscle_group_id": 3, "is_primary": True},
+        ])
+        self.db.commit()
+        invalidate_catalog()
+
+        self.headers = {'Authorization': 'Bearer ' + create_access_token(
+            data={"sub": "user@test.com", "role": "user"},
+            expires_delta=datetime.timedelta(minutes=30)
+        )}
+
+    def tearDown(self):
+        # Clean up the database after each test
+        invalidate_catalog()
+        self.db.close()
+        db_session.remove()
+        Base.metadata.drop_all(bind=self.db.get_bind())
+
+    def daily_load(self):
+        self.db.expire_all()
+        return {
+            (row.day, row.muscle_group_id): row
+            for row in self.db.query(UserDailyLoadModel).filter(UserDailyLoadModel.user_email == "user@test.com")
+        }
+
+    def daily_summary(self):
+        self.db.expire_all()
+        return {
+            row.day: row
+            for row in self.db.query(UserDailySummaryModel).filter(UserDailySummaryModel.user_email == "user@test.com")
+        }
+
+    def log(self, exercise_id, day, reps=10):
+        response = self.client.post('/fitness/exercises/history', headers=self.headers, json={
+            "exercise_id": exercise_id, "performed_at": f"{day.isoformat()}T08:00:00",
+            "duration_minutes": 2.0, "reps": reps
+        })
+        self.assertEqual(response.status_code, 201)
+
+    def test_add_history_updates_daily_load(self):
+        entry = {"exercise_id": 1, "performed_at": "2026-03-02T10:00:00", "duration_minutes": 5.0, "reps": 10}
+        for _ in range(2):
+            response = self.client.post('/fitness/exercises/history', json=entry, headers=self.headers)
+            self.assertEqual(response.status_code, 201)
+
+        load = self.daily_load()
+        chest = load[(datetime.date(2026, 3, 2), 1)]
+        triceps = load[(datetime.date(2026, 3, 2), 2)]
+        self.assertEqual((chest.exercise_count, chest.primary_count, chest.reps, chest.minutes), (2, 2, 20, 10.0))
+        self.assertAlmostEqual(chest.volume, 20 * 0.5 * 1.2)
+        self.assertEqual((triceps.exercise_count, triceps.primary_count), (2, 0))
+        self.assertAlmostEqual(triceps.volume, 20 * 0.5 * 0.8)
+
+    def test_add_history_batch(self):
+        entries = [
+            {"exercise_id": 1, "performed_at": "2026-03-02T10:00:00", "duration_minutes": None, "reps": 10},
+            {"exercise_id": 2, "performed_at": "2026-03-03T10:00:00", "duration_minutes": 3.0, "reps": 8},
+        ]
+        response = self.client.post('/fitness/exercises/history/batch', json=entries, headers=self.headers)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([entry['exercise_id'] for entry in json.loads(response.data)], [1, 2])
+        self.assertEqual(sorted(self.daily_load()), [
+            (datetime.date(2026, 3, 2), 1), (datetime.date(2026, 3, 2), 2), (datetime.date(2026, 3, 3), 3)
+        ])
+
+    def test_add_history_batch_invalid(self):
+        response = self.client.post('/fitness/exercises/history/batch', json=[{"reps": 3}], headers=self.headers)
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_rebuild_matches_incremental(self):
+        for day in (1, 1, 2, 3):
+            self.client.post('/fitness/exercises/history', headers=self.headers, json={
+                "exercise_id": day % 2 + 1, "performed_at": f"2026-03-0{day}T08:00:00",
+                "duration_minutes": 2.5, "reps": day * 4
+            })
+        before = {key: (row.exercise_count, row.reps, row.minutes, row.volume) for key, row in self.daily_load().items()}
+
+        processed = rebuild_user_daily_load(chunk_size=3)
+
+        after = {key: (row.exercise_count, row.reps, row.minutes, row.volume) for key, row in self.daily_load().items()}
+        self.assertEqual(processed, 4)
+        self.assertEqual(after, before)
+
+    def test_writes_during_rebuild(self):
+        for day in (1, 2, 3):
+            self.log(1, datetime.date(2026, 3, day))
+        engine = self.db.get_bind()
+        writers = []
+
+        def log_concurrently(day):
+            writer = threading.Thread(target=self.log, args=(2, datetime.date(2026, 3, day)))
+            writers.append(writer)
+            writer.start()
+            # Blocked by the rebuild, or done
+            writer.join(timeout=0.5)
+
+        def before_delete(conn, cursor, statement, parameters, context, executemany):
+            # One write lands as the rebuild starts clearing the rollups...
+            if statement.startswith("DELETE FROM user_daily_load") and not writers:
+                log_concurrently(2)
+
+        compute_load_deltas = training_load_service.compute_load_deltas
+
+        def during_replay(rows, catalog):
+            # ...and one while it replays the history
+            if len(writers) == 1:
+                log_concurrently(3)
+            return compute_load_deltas(rows, catalog)
+
+        event.listen(engine, "before_cursor_execute", before_delete)
+        try:
+            with mock.patch.object(training_load_service, "compute_load_deltas", during_replay):
+                rebuild_user_daily_load(chunk_size=2)
+        finally:
+            event.remove(engine, "before_cursor_execute", before_delete)
+        for writer in writers:
+            writer.join()
+
+        # Each write is counted exactly once
+        self.assertEqual(len(writers), 2)
+        summary = self.daily_summary()
+        self.assertEqual([summary[datetime.date(2026, 3, day)].exercise_count for day in (1, 2, 3)], [1, 2, 2])
+        load = self.daily_load()
+        self.assertEqual([load[(datetime.date(2026, 3, day), 3)].exercise_count for day in (2, 3)], [1, 1])
+        self.assertEqual([summary[datetime.date(2026, 3, day)].streak for day in (1, 2, 3)], [1, 2, 3])
+
+    def test_concurrent_writes_for_same_user(self):
+        for day in (1, 3):
+            self.log(1, datetime.date(2026, 3, day))
+        writers = []
+        refresh_streaks = training_load_service.refresh_streaks
+
+        def during_refresh(db, user_email, day):
+            # Day 4 is logged while filling the gap on day 2 moves day 3 on
+            if not writers:
+                writer = threading.Thread(target=self.log, args=(2, datetime.date(2026, 3, 4)))
+                writers.append(writer)
+                writer.start()
+                writer.join(timeout=0.5)
+            refresh_streaks(db, user_email, day)
+
+        with mock.patch.object(training_load_service, "refresh_streaks", during_refresh):
+            self.log(1, datetime.date(2026, 3, 2))
+        for writer in writers:
+            writer.join()
+
+        summary = self.daily_summary()
+        self.assertEqual([summary[datetime.date(2026, 3, day)].streak for day in range(1, 5)], [1, 2, 3, 4])
+        self.assertEqual([summary[datetime.date(2026, 3, day)].exercise_count for day in range(1, 5)], [1, 1, 1, 1])
+
+    def test_rollup_locks(self):
+        db = mock.Mock()
+        db.get_bind.return_value.dialect.name = "postgresql"
+
+        def locks(*args, **kwargs):
+            db.execute.reset_mock()
+            training_load_service.lock_rollups(db, *args, **kwargs)
+            return [(str(call.args[0]), call.args[1]) for call in db.execute.call_args_list]
+
+        user_lock = ("SELECT pg_advisory_xact_lock(:class_id, hashtext(:user_email))", {"class_id": training_load_service.USER_ROLLUP_LOCK_CLASS, "user_email": "user@test.com"})
+        # Writers exclude each other per user and only wait for full rebuilds
+        self.assertEqual(locks("user@test.com"), [
+            ("SELECT pg_advisory_xact_lock_shared(:id)", {"id": training_load_service.ROLLUP_LOCK_ID}), user_lock
+        ])
+        self.assertEqual(locks("user@test.com", rebuild=True), [user_lock])
+        self.assertEqual(locks(None, rebuild=True), [("SELECT pg_advisory_xact_lock(:id)", {"id": training_load_service.ROLLUP_LOCK_ID})])
+
+    def test_streaks_follow_backdated_entries(self):
+        for day in (1, 2, 4, 5, 3):
+            self.log(1, datetime.date(2026, 3, day))
+
+        summary = self.daily_summary()
+        self.assertEqual([summary[datetime.date(2026, 3, day)].streak for day in range(1, 6)], [1, 2, 3, 4, 5])
+
+        rebuild_user_daily_load(chunk_size=2)
+        self.assertEqual([row.streak for _, row in sorted(self.daily_summary().items())], [1, 2, 3, 4, 5])
+
+    def test_streaks_of_batch_filling_gaps(self):
+        for day in (2, 4, 7, 8):
+            self.log(1, datetime.date(2026, 3, day))
+        entries = [
+            {"exercise_id": 1, "performed_at": f"2026-03-0{day}T08:00:00", "duration_minutes": 1.0, "reps": 5}
+            for day in (6, 3, 1, 5)
+        ]
+        response = self.client.post('/fitness/exercises/history/batch', json=entries, headers=self.headers)
+        self.assertEqual(response.status_code, 201)
+
+        incremental = [row.streak for _, row in sorted(self.daily_summary().items())]
+        self.assertEqual(incremental, [1, 2, 3, 4, 5, 6, 7, 8])
+        rebuild_user_daily_load(chunk_size=3)
+        self.assertEqual([row.streak for _, row in sorted(self.daily_summary().items())], incremental)
+
+    def test_period_bounds(self):
+        today = datetime.date(2026, 3, 12)  # a Thursday
+
+        self.assertEqual(period_bounds("week", today), (datetime.date(2026, 3, 9), today))
+        self.assertEqual(period_bounds("month", today), (datetime.date(2026, 3, 1), today))
+        with self.assertRaises(ValueError):
+            period_bounds("year", today)
+
+    def test_training_stats(self):
+        today = datetime.date(2026, 3, 12)
+        self.log(2, datetime.date(2026, 3, 2), reps=5)
+        self.log(1, datetime.date(2026, 3, 10), reps=10)
+        self.log(2, datetime.date(2026, 3, 11), reps=8)
+        self.log(1, datetime.date(2026, 3, 11), reps=4)
+
+        week = get_training_stats("user@test.com", "week", today=today)
+        month = get_training_stats("user@test.com", "month", today=today)
+
+        self.assertEqual((week.totals.exercise_count, week.totals.reps, week.totals.active_days), (3, 22, 2))
+        self.assertAlmostEqual(week.totals.volume, 14 * 0.5 + 8 * 1.0)
+        self.assertEqual(week.streaks.model_dump(), {"current": 2, "longest": 2})
+        self.assertEqual([mg.id for mg in week.muscle_groups], [3, 1, 2])
+        self.assertEqual(week.muscle_groups[1].reps, 14)
+        self.assertEqual((month.totals.exercise_count, month.totals.active_days), (4, 3))
+        self.assertEqual(get_training_stats("user@test.com", "week", today=datetime.date(2026, 3, 14)).streaks.current, 0)
+
+    def test_stats_endpoint(self):
+        self.log(1, datetime.date.today())
+
+        response = self.client.get('/fitness/stats?period=month', headers=self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(data['period'], "month")
+        self.assertEqual(data['end'], datetime.date.today().isoformat())
+        self.assertEqual(data['totals']['exercise_count'], 1)
+        self.assertEqual(data['streaks'], {"current": 1, "longest": 1})
+
+    def test_stats_endpoint_invalid_period(self):
+        response = self.client.get('/fitness/stats?period=year', headers=self.headers)
+
+        self.assertEqual(response.status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
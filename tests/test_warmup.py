@@ -0,0 +1,49 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import unittest
+import json
+from src.fit.app import app
+from src.fit.database import init_db, db_session
+from src.fit.models_db import Base
+from src.fit.services import warmup_service
+from src.fit.services.catalog_service import invalidate_catalog, loaded_catalog
+from src.fit.services.wod_response import get_wod_renderer
+
+class TestWarmup(unittest.TestCase):
+    def setUp(self):
+        init_db()
+        invalidate_catalog()
+
+    def tearDown(self):
+        invalidate_catalog()
+        db_session.remove()
+        Base.metadata.drop_all(bind=db_session().get_bind())
+
+    def test_warm_up(self):
+        report = warmup_service.warm_up()
+
+        self.assertEqual(set(report), {"connections_ms", "mappers_ms", "catalog_ms", "serializers_ms", "total_ms"})
+        self.assertIsNotNone(loaded_catalog())
+        catalog = loaded_catalog()
+        wod_candidates = [exercise for exercise in catalog.exercises if exercise.muscle_groups]
+        self.assertEqual(len(get_wod_renderer()._fragments), len(wod_candidates))
+
+    def test_selected_steps(self):
+        report = warmup_service.warm_up(["mappers"])
+
+        self.assertEqual(set(report), {"mappers_ms", "total_ms"})
+        self.assertIsNone(loaded_catalog())
+
+    def test_unknown_step(self):
+        with self.assertRaises(ValueError):
+            warmup_service.warm_up(["caches"])
+
+    def test_reported_in_metrics(self):
+        report = warmup_service.warm_up(["mappers"])
+
+        data = json.loads(app.test_client().get('/metrics').data)
+        self.assertEqual(data['warmup'], report)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import unittest
+import threading
+import datetime
+from unittest.mock import patch
+from src.fit.services.wod_cache import WodCache, ENTRY_OVERHEAD, history_logged
+
+DAY = datetime.date(2026, 3, 2)
+
+def key(user_email, mask=-1, history=0):
+    return (user_email, DAY, "v1", mask, history)
+
+class TestWodCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = WodCache(max_bytes=10 * (ENTRY_OVERHEAD + 100))
+
+    def test_hit(self):
+        calls = []
+        generate = lambda: calls.append(1) or b"wod"
+
+        self.assertEqual(self.cache.get_or_generate(key("a"), generate), b"wod")
+        self.assertEqual(self.cache.get_or_generate(key("a"), generate), b"wod")
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((self.cache.stats()["hits"], self.cache.stats()["misses"]), (1, 1))
+
+    def test_concurrent_requests_share_one_generation(self):
+        release = threading.Event()
+        calls = []
+
+        def generate():
+            calls.append(1)
+            release.wait(5)
+            return b"wod"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.cache.get_or_generate(key("a"), generate))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        while self.cache.stats()["coalesced"] < 7:
+            threading.Event().wait(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [b"wod"] * 8)
+
+    def test_errors_are_not_cached(self):
+        def fail():
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            self.cache.get_or_generate(key("a"), fail)
+        self.assertEqual(self.cache.get_or_generate(key("a"), lambda: b"wod"), b"wod")
+
+    def test_evicts_least_recently_used_within_budget(self):
+        for i in range(20):
+            self.cache.get_or_generate(key(f"user{i}"), lambda: b"x" * 60)
+
+        stats = self.cache.stats()
+        self.assertLessEqual(stats["size_bytes"], stats["max_bytes"])
+        self.assertGreater(stats["evictions"], 0)
+        self.assertEqual(self.cache.get_or_generate(key("user19"), lambda: b"new"), b"x" * 60)
+        self.assertEqual(self.cache.get_or_generate(key("user0"), lambda: b"new"), b"new")
+
+    def test_invalidate_user(self):
+        self.cache.get_or_generate(key("a"), lambda: b"old")
+        self.cache.get_or_generate(key("a", mask=3), lambda: b"old")
+        self.cache.get_or_generate(key("b"), lambda: b"old")
+
+        self.cache.invalidate("a")
+
+        self.assertEqual(self.cache.get_or_generate(key("a"), lambda: b"new"), b"new")
+        self.assertEqual(self.cache.get_or_generate(key("a", mask=3), lambda: b"new"), b"new")
+        self.assertEqual(self.cache.get_or_generate(key("b"), lambda: b"new"), b"old")
+
+    def test_history_version_misses(self):
+        self.cache.get_or_generate(key("a"), lambda: b"old")
+
+        # History logged through another worker
+        self.assertEqual(self.cache.get_or_generate(key("a", history=7), lambda: b"new"), b"new")
+        self.assertEqual(self.cache.get_or_generate(key("a", history=7), lambda: b"newer"), b"new")
+
+    def test_invalidate_leaves_no_state(self):
+        for i in range(5):
+            self.cache.get_or_generate(key(f"user{i}"), lambda: b"wod")
+            self.cache.invalidate(f"user{i}")
+
+        self.assertEqual((self.cache._entries, self.cache._keys_by_user, self.cache._inflight), ({}, {}, {}))
+
+    @patch('src.fit.services.wod_cache.wod_cache')
+    def test_history_logged_only_invalidates_on_exclusion_changes(self, wod_cache):
+        today = datetime.date(2026, 3, 2)
+
+        history_logged("a", [datetime.datetime(2026, 3, 2, 9), datetime.datetime(2026, 2, 20, 9)], today=today)
+        wod_cache.invalidate.assert_not_called()
+
+        history_logged("a", [datetime.datetime(2026, 3, 1, 9)], today=today)
+        wod_cache.invalidate.assert_called_once_with("a")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,177 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import unittest
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest.mock import patch
+from src.fit.models_dto import WodResponseSchema
+from src.fit.services.wod_router import CircuitBreaker, WodRouter
+
+COACH_WOD = {
+    "exercises": [{
+        "id": 7, "name": "Push-up", "description": None, "difficulty": 2, "sets": 3, "reps": 12, "weight": 10.5,
+        "duration": None,
+        "muscle_groups": [{"id": 1, "name": "Pectoralis Major", "body_part": "Chest", "is_primary": True, "intensity": 0.6}]
+    }],
+    "total_duration": 1, "difficulty": "beginner", "calories_burned": 10, "catalog_version": "v1",
+    "generated_at": "2026-10-19T08:00:00"
+}
+
+class FakeCoach(BaseHTTPRequestHandler):
+    status = 200
+    delay = 0.0
+    received = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        FakeCoach.received.append((self.path, self.headers.get("Authorization"), json.loads(body)))
+        time.sleep(FakeCoach.delay)
+        payload = json.dumps(COACH_WOD).encode()
+        self.send_response(FakeCoach.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+        self.assertEqual(breaker.stats()["opened"], 1)
+
+    def test_half_open_trial(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())  # only one trial call
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual((breaker.state, breaker.failures), ("closed", 0))
+
+    def test_released_trial_lets_the_next_call_through(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+
+        breaker.release()
+
+        self.assertTrue(breaker.allow())
+
+class TestWodRouter(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeCoach)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.coach_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        FakeCoach.status, FakeCoach.delay, FakeCoach.received = 200, 0.0, []
+        patchers = [
+            patch('src.fit.services.wod_router.get_exercises_performed_yesterday', return_value=[SimpleNamespace(id=3)]),
+            patch('src.fit.services.wod_router.get_wod', return_value=b'{"local":true}'),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def router(self, **kwargs):
+        options = {"coach_url": self.coach_url, "traffic_percent": 100, "timeout": 0.5, "breaker": CircuitBreaker(2, 60)}
+        options.update(kwargs)
+        return WodRouter(**options)
+
+    def test_traffic_split(self):
+        users = [f"member{i}@gym.com" for i in range(1000)]
+
+        self.assertFalse(any(self.router(traffic_percent=0).routes_to_coach(user) for user in users))
+        self.assertTrue(all(self.router(traffic_percent=100).routes_to_coach(user) for user in users))
+        routed = [user for user in users if self.router(traffic_percent=30).routes_to_coach(user)]
+        self.assertTrue(250 < len(routed) < 350)
+        self.assertTrue(all(self.router(traffic_percent=60).routes_to_coach(user) for user in routed))
+        self.assertFalse(self.router(coach_url=None).routes_to_coach(users[0]))
+
+    def test_coach_response_in_monolith_schema(self):
+        router = self.router()
+
+        body = router.get_wod("user@test.com", ["dumbbells"], "Bearer token")
+
+        wod = WodResponseSchema.model_validate_json(body)
+        self.assertEqual((wod.exercises[0].suggested_reps, wod.exercises[0].suggested_weight), (12, 10.5))
+        self.assertEqual(wod.exercises[0].description, "")
+        self.assertEqual(FakeCoach.received, [(
+            "/wod", "Bearer token", {"equipment_available": ["dumbbells"], "excluded_exercise_ids": [3]}
+        )])
+        self.assertEqual(router.stats()["backends"]["coach"]["requests"], 1)
+
+    def test_falls_back_on_error_status(self):
+        FakeCoach.status = 500
+        router = self.router()
+
+        self.assertEqual(router.get_wod("user@test.com"), b'{"local":true}')
+        stats = router.stats()
+        self.assertEqual((stats["fallbacks"], stats["backends"]["coach"]["errors"]), (1, 1))
+        self.assertEqual(stats["backends"]["monolith"]["requests"], 1)
+
+    def test_falls_back_on_timeout(self):
+        FakeCoach.delay = 0.3
+        router = self.router(timeout=0.05)
+
+        self.assertEqual(router.get_wod("user@test.com"), b'{"local":true}')
+        self.assertEqual(router.fallbacks, 1)
+
+    def test_open_circuit_skips_coach(self):
+        router = self.router(coach_url="http://127.0.0.1:1")
+
+        for _ in range(3):
+            self.assertEqual(router.get_wod("user@test.com"), b'{"local":true}')
+
+        self.assertEqual(router.stats()["circuit"]["state"], "open")
+        self.assertEqual(router.stats()["backends"]["coach"]["requests"], 2)
+        self.assertEqual(router.stats()["backends"]["monolith"]["requests"], 3)
+
+    def test_coach_latency_excludes_history_query(self):
+        router = self.router()
+
+        def slow_history(user_email):
+            time.sleep(0.2)
+            return [SimpleNamespace(id=3)]
+
+        with patch('src.fit.services.wod_router.get_exercises_performed_yesterday', side_effect=slow_history):
+            router.get_wod("user@test.com")
+
+        self.assertLess(router.stats()["backends"]["coach"]["p50_ms"], 150)
+
+    def test_history_query_error_releases_trial_call(self):
+        router = self.router(breaker=CircuitBreaker(1, 0))
+        router.breaker.record_failure()
+
+        with patch('src.fit.services.wod_router.get_exercises_performed_yesterday', side_effect=RuntimeError("db down")):
+            with self.assertRaises(RuntimeError):
+                router.get_wod("user@test.com")
+
+        # The trial call is not lost: the next request reaches the coach
+        router.get_wod("user@test.com")
+        self.assertEqual(len(FakeCoach.received), 1)
+        self.assertEqual(router.stats()["circuit"]["state"], "closed")
+
+if __name__ == '__main__':
+    unittest.main()
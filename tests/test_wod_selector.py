@@ -0,0 +1,91 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import unittest
+import random
+import datetime
+import time
+from unittest import mock
+import numpy as np
+from src.fit.models_dto import Exercise, MuscleGroup, MuscleGroupWithPrimary
+from src.fit.services.wod_selector import _FatigueState, FatigueStore, IncidenceMatrix, select_exercises
+from src.fit.services.fitness_coach_service import wod_rng
+
+MUSCLE_GROUPS = [
+    MuscleGroup(id=1, name="Pectoralis Major", body_part="Chest"),
+    MuscleGroup(id=2, name="Triceps Brachii", body_part="Arms"),
+    MuscleGroup(id=3, name="Quadriceps", body_part="Legs"),
+    MuscleGroup(id=4, name="Latissimus Dorsi", body_part="Back"),
+]
+
+def make_exercise(exercise_id, primary, secondary=()):
+    muscle_groups = [
+        MuscleGroupWithPrimary(**MUSCLE_GROUPS[mg_id - 1].model_dump(), is_primary=mg_id == primary)
+        for mg_id in (primary, *secondary)
+    ]
+    return Exercise(id=exercise_id, name=f"Exercise {exercise_id}", difficulty=3, muscle_groups=muscle_groups)
+
+class TestWodSelector(unittest.TestCase):
+    def setUp(self):
+        self.exercises = [
+            make_exercise(1, primary=1, secondary=(2,)),
+            make_exercise(2, primary=1, secondary=(2,)),
+            make_exercise(3, primary=2),
+            make_exercise(4, primary=3),
+            make_exercise(5, primary=3),
+            make_exercise(6, primary=4, secondary=(2,)),
+            make_exercise(7, primary=4),
+        ]
+        self.incidence = IncidenceMatrix(self.exercises, MUSCLE_GROUPS)
+
+    def test_incidence_matrix(self):
+        row = self.incidence.matrix[self.incidence.row_by_exercise[1]]
+        np.testing.assert_array_equal(row, [1.0, 0.5, 0.0, 0.0])
+
+    def test_load_vector(self):
+        vector = self.incidence.load_vector([1, 4, 42], [1.0, 0.5, 1.0])
+        np.testing.assert_array_equal(vector, [1.0, 0.5, 0.5, 0.0])
+
+    def test_select_spreads_load(self):
+        fatigue = np.zeros(len(MUSCLE_GROUPS))
+        selected = select_exercises(self.incidence, [1, 2, 3, 4, 5, 6, 7], fatigue, 4, random.Random(1))
+
+        primaries = {next(mg.id for mg in self.exercises[eid - 1].muscle_groups if mg.is_primary) for eid in selected}
+        self.assertEqual(primaries, {1, 2, 3, 4})
+
+    def test_select_avoids_fatigued_muscle_groups(self):
+        fatigue = np.array([5.0, 5.0, 0.0, 0.0])
+        selected = select_exercises(self.incidence, [1, 2, 3, 4, 5, 6, 7], fatigue, 3, random.Random(1))
+
+        self.assertEqual(sorted(selected), [4, 5, 7])
+
+    def test_deterministic_selection(self):
+        def select(fatigue, day=datetime.date(2026, 3, 2)):
+            rng = wod_rng("user@test.com", day, "v1", mode="deterministic")
+            return select_exercises(self.incidence, [1, 2, 3, 4, 5, 6, 7], np.array(fatigue), 3, rng)
+
+        # Pinned: a change to the seeding or the scoring shows up here
+        self.assertEqual(select([0.0, 0.0, 0.0, 0.0]), [6, 5, 2])
+        self.assertEqual(select([0.0, 0.0, 0.0, 0.0], datetime.date(2026, 3, 3)), [7, 5, 3])
+        self.assertEqual(select([5.0, 5.0, 0.0, 0.0]), [7, 5, 4])
+        self.assertEqual(select([0.0, 0.0, 5.0, 5.0]), [2, 3, 1])
+
+    def test_record_future_entry_counts_as_today(self):
+        today = datetime.date.today()
+        recorded = []
+        for performed_at in (today, today + datetime.timedelta(days=30)):
+            store = FatigueStore()
+            with mock.patch.object(store, "_load", return_value=_FatigueState(np.array([1.0, 0.0, 0.0, 0.0]), today, "v1", time.monotonic())):
+                store.get("user@test.com", self.incidence, "v1", today)
+            store.record("user@test.com", 3, datetime.datetime.combine(performed_at, datetime.time(8)), self.incidence, "v1")
+            recorded.append(store.get("user@test.com", self.incidence, "v1", today))
+
+        np.testing.assert_array_equal(recorded[1], recorded[0])
+        np.testing.assert_array_equal(recorded[0], [1.0, 1.0, 0.0, 0.0])
+
+    def test_select_returns_all_when_few_candidates(self):
+        fatigue = np.zeros(len(MUSCLE_GROUPS))
+        self.assertEqual(select_exercises(self.incidence, [3, 4], fatigue, 6, random.Random(1)), [3, 4])
+
+if __name__ == '__main__':
+    unittest.main()